@@ -8,14 +8,34 @@ def create_app(config=None):
     if config:
         app.config.update(config)
 
+    # Bring older databases up to the current columns before any query runs
+    from models.database import engine
+    from models.migrations import ensure_schema
+    ensure_schema(engine)
+
+    # Optional read snapshot of the registry; loaded here so gunicorn workers share the master's copy
+    from services.registry_service import REGISTRY_SNAPSHOT, load_snapshot
+    if REGISTRY_SNAPSHOT:
+        load_snapshot()
+
     # Import and register blueprints here to avoid circular imports at module import time
     from routes.farmer_routes import farmer_bp
     from routes.land_routes import land_bp
     from routes.stats_routes import stats_bp
+    from routes.job_routes import job_bp
+    from routes.suggest_routes import suggest_bp
+    from routes.event_routes import event_bp
 
     app.register_blueprint(farmer_bp)
     app.register_blueprint(land_bp)
     app.register_blueprint(stats_bp)
+    app.register_blueprint(job_bp)
+    app.register_blueprint(suggest_bp)
+    app.register_blueprint(event_bp)
+
+    # Fingerprinted, precompressed static files and compressed API / page responses
+    from assets import init_assets
+    init_assets(app)
 
     @app.route('/')
     def index():
@@ -0,0 +1,16 @@
+"""
+Optional ASGI entry point, for deployments that front everything with an ASGI server.
+
+    pip install asgiref uvicorn
+    uvicorn asgi:application --workers 4
+
+The Flask app stays synchronous; asgiref runs each request in a thread pool.
+"""
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # optional dependency
+    raise ImportError("asgi.py needs asgiref: pip install asgiref uvicorn") from None
+
+from wsgi import application as wsgi_application
+
+application = WsgiToAsgi(wsgi_application)
@@ -0,0 +1,165 @@
+"""
+Response compression and static asset caching.
+
+* Every file under static/ is read and hashed at startup. url_for('static', ...)
+  appends ?v=<content hash>, and requests carrying the current hash are served
+  with a one-year immutable Cache-Control. Unversioned URLs (such as the
+  relative imports inside ES modules) are served with no-cache and revalidate
+  by ETag. Files edited after startup are picked up only in debug mode (or
+  with TEMPLATES_AUTO_RELOAD); otherwise a deploy restarts the app.
+* Compressible static files are precompressed once at startup: gzip always,
+  brotli when the optional brotli package is installed.
+* Other responses (JSON, HTML pages) of at least COMPRESS_MIN_SIZE bytes are
+  compressed on the fly for clients that accept it.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))  # bytes
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))  # dynamic responses
+STATIC_MAX_AGE = 365 * 24 * 3600
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={STATIC_MAX_AGE}, immutable"
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+    'application/json', 'image/svg+xml',
+}
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data, encoding, static=False):
+    if encoding == 'br':
+        # Static assets are compressed once, so they get the slowest, smallest setting
+        return brotli.compress(data, quality=11 if static else COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if static else COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def choose_encoding(available):
+    """Pick the preferred content encoding from available that the request accepts, or None."""
+    accept = request.accept_encodings
+    for encoding in ENCODINGS:
+        if encoding in available and accept[encoding] > 0:
+            return encoding
+    return None
+
+
+class StaticAsset:
+    """A static file held in memory with its content hash and precompressed variants."""
+
+    def __init__(self, path):
+        self.path = path
+        stat = path.stat()
+        self.mtime = stat.st_mtime_ns
+        self.data = path.read_bytes()
+        self.hash = hashlib.sha256(self.data).hexdigest()[:12]
+        self.mimetype = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        self.encoded = {}
+        if self.mimetype in COMPRESSIBLE_MIMETYPES and len(self.data) >= COMPRESS_MIN_SIZE:
+            for encoding in ENCODINGS:
+                body = compress(self.data, encoding, static=True)
+                if len(body) < len(self.data):
+                    self.encoded[encoding] = body
+
+    def is_stale(self):
+        try:
+            return self.path.stat().st_mtime_ns != self.mtime
+        except OSError:
+            return True
+
+
+class StaticAssets:
+    """Fingerprint, precompress and serve the files of a Flask app's static folder."""
+
+    def __init__(self, app):
+        self.app = app
+        self.folder = Path(app.static_folder)
+        self.assets = {}
+        self.original_bytes = 0
+        self.compressed_bytes = 0
+        for path in sorted(self.folder.rglob('*')):
+            if path.is_file():
+                self._load(path.relative_to(self.folder).as_posix())
+
+    def _load(self, filename):
+        asset = StaticAsset(self.folder / filename)
+        self.assets[filename] = asset
+        self.original_bytes += len(asset.data)
+        self.compressed_bytes += min([len(body) for body in asset.encoded.values()] + [len(asset.data)])
+        return asset
+
+    def get(self, filename):
+        asset = self.assets.get(filename)
+        # Only in development are files checked for edits (a stat per call); production serves from memory
+        if asset is not None and self._reload_edits() and asset.is_stale():
+            # Reload so the fingerprint changes too
+            asset = self._load(filename) if (self.folder / filename).is_file() else None
+        return asset
+
+    def _reload_edits(self):
+        return self.app.debug or bool(self.app.config.get('TEMPLATES_AUTO_RELOAD'))
+
+    def url_defaults(self, endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            asset = self.get(values['filename'])
+            if asset is not None:
+                values['v'] = asset.hash
+
+    def serve(self, filename):
+        asset = self.get(filename)
+        if asset is None:
+            return self.app.send_static_file(filename)
+        encoding = choose_encoding(asset.encoded)
+        response = self.app.response_class(asset.encoded[encoding] if encoding else asset.data,
+                                           mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if asset.encoded:
+            response.vary.add('Accept-Encoding')
+        response.set_etag(f"{asset.hash}-{encoding or 'identity'}")
+        if request.args.get('v') == asset.hash:
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+
+def compress_response(response):
+    """after_request hook compressing large text responses for clients that accept it."""
+    if (request.endpoint == 'static'
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(ENCODINGS)
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_assets(app):
+    """Install fingerprinted static serving and response compression on app."""
+    assets = StaticAssets(app)
+    app.extensions['static_assets'] = assets
+    app.url_defaults(assets.url_defaults)
+    app.view_functions['static'] = assets.serve
+    app.after_request(compress_response)
+    return assets
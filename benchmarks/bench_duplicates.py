@@ -0,0 +1,152 @@
+"""
+Duplicate farmer detection benchmark.
+
+Loads the farmers of a synthetic database, adds --duplicate-rate perturbed
+copies (another source and FarmerId, the name in Gurmukhi or respelled, the
+mobile number reformatted, the Aadhaar number sometimes missing) and times
+services.duplicate_service.find_duplicate_clusters. Reports rows per second
+and recall, i.e. the share of planted copies found in the same cluster as
+their original. The comparison count an all-pairs check would need is
+printed for scale.
+
+Usage:
+    python -m benchmarks.bench_duplicates --scale 100k --duplicate-rate 0.05
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_services import REPO_ROOT, git_revision
+from benchmarks.synthetic_data import SCALES, SOURCE_APIS, generate_database
+
+DEFAULT_RESULTS = REPO_ROOT / 'benchmarks' / 'duplicate_results.jsonl'
+
+# Gurmukhi spellings of the synthetic Latin first names, and common Latin respellings
+GURMUKHI_NAMES = {
+    'Amarjit': 'ਅਮਰਜੀਤ', 'Gurpreet': 'ਗੁਰਪ੍ਰੀਤ', 'Harcharan': 'ਹਰਚਰਨ', 'Balwinder': 'ਬਲਵਿੰਦਰ',
+    'Sukhdev': 'ਸੁਖਦੇਵ', 'Kuldeep': 'ਕੁਲਦੀਪ', 'Manjit': 'ਮਨਜੀਤ', 'Paramjit': 'ਪਰਮਜੀਤ',
+    'Darshan': 'ਦਰਸ਼ਨ', 'Thakur': 'ਠਾਕੁਰ', 'Kehar': 'ਕੇਹਰ', 'Jagjit': 'ਜਗਜੀਤ', 'Jarnail': 'ਜਰਨੈਲ',
+}
+RESPELLINGS = (('ee', 'i'), ('w', 'v'), ('jit', 'jeet'), ('sh', 's'), ('ar', 'aar'))
+
+
+def perturb(rng, row, new_id, new_farmer_id):
+    copy = dict(row, id=new_id, farmer_id=new_farmer_id)
+    copy['source_api'] = rng.choice([source for source in SOURCE_APIS if source != row['source_api']])
+    first, _, rest = (row['farmer_name'] or '').partition(' ')
+    if first in GURMUKHI_NAMES and rng.random() < 0.5:
+        copy['farmer_name'] = f"{GURMUKHI_NAMES[first]} ਸਿੰਘ"
+    else:
+        for old, new in rng.sample(RESPELLINGS, 2):
+            first = first.replace(old, new)
+        copy['farmer_name'] = f"{first} {rest}".upper()
+    if row['mobile_number'] and rng.random() < 0.5:
+        copy['mobile_number'] = f"+91 {row['mobile_number'][:5]}-{row['mobile_number'][5:]}"
+    if rng.random() < 0.3:
+        copy['aadhar_number'] = None
+    return copy
+
+
+def load_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute("""
+            SELECT id, farmer_id, farmer_name, father_name, grandfather_name,
+                   (SELECT name FROM places WHERE id = village_id) AS village_name,
+                   (SELECT name FROM places WHERE id = district_id) AS district_name,
+                   mobile_number, aadhar_number, source_api
+            FROM farmers ORDER BY id
+        """)]
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time duplicate farmer clustering on synthetic data.")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='10k')
+    parser.add_argument('--lands-per-farmer', type=float, default=2.5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--duplicate-rate', type=float, default=0.05, help="Planted copies per farmer")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--db', help="Use this database instead of a generated one")
+    parser.add_argument('--output', default=str(DEFAULT_RESULTS), help="JSON Lines file to append results to")
+    args = parser.parse_args()
+
+    farmers = SCALES[args.scale]
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        db_path = REPO_ROOT / 'data' / 'benchmarks' / f"synthetic_{farmers}_{args.lands_per_farmer}_{args.seed}.db"
+    os.environ['FARMER_DB_PATH'] = str(db_path)
+    if not args.db and not db_path.exists():
+        print(f"Generating synthetic database with {farmers:,} farmers at {db_path} ...")
+        generate_database(db_path, farmers=farmers, lands_per_farmer=args.lands_per_farmer, seed=args.seed)
+
+    from services.duplicate_service import find_duplicate_clusters
+
+    rows = load_rows(db_path)
+    rng = random.Random(args.seed)
+    next_id = max(row['id'] for row in rows) + 1
+    next_farmer_id = max(row['farmer_id'] or 0 for row in rows) + 1
+    planted = []
+    for original in rng.sample(rows, int(len(rows) * args.duplicate_rate)):
+        rows.append(perturb(rng, original, next_id + len(planted), next_farmer_id + len(planted)))
+        planted.append((original['id'], rows[-1]['id']))
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        clusters = find_duplicate_clusters(rows)
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+
+    cluster_of = {member: index for index, (ids, _) in enumerate(clusters) for member in ids}
+    found = sum(1 for original, copy in planted
+                if original in cluster_of and cluster_of.get(copy) == cluster_of[original])
+    recall = found / len(planted) if planted else None
+    reasons = {}
+    for _, rules in clusters:
+        for rule in rules:
+            reasons[rule] = reasons.get(rule, 0) + 1
+    sizes = [len(ids) for ids, _ in clusters]
+
+    print(f"\nDuplicate clustering: {len(rows):,} rows ({len(planted):,} planted copies), best of {args.repeat}")
+    print(f"  time              {seconds * 1000:>10.1f} ms  ({len(rows) / seconds:,.0f} rows/s)")
+    print(f"  all-pairs checks  {len(rows) * (len(rows) - 1) // 2:>10,}  (avoided)")
+    print(f"  clusters          {len(clusters):>10,}  (largest {max(sizes, default=0)}, by rule {reasons})")
+    if recall is not None:
+        print(f"  recall            {recall:>10.1%}  ({found:,} of {len(planted):,} planted copies)")
+
+    commit, dirty = git_revision()
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'rows': len(rows),
+        'planted': len(planted),
+        'seconds': round(seconds, 4),
+        'rows_per_s': round(len(rows) / seconds, 1),
+        'clusters': len(clusters),
+        'largest_cluster': max(sizes, default=0),
+        'clusters_by_rule': reasons,
+        'recall': round(recall, 4) if recall is not None else None,
+    }
+    results_path = Path(args.output)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"\nResults appended to {results_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Ingestion throughput benchmark against the bundled mock upstream server.
+
+Starts benchmarks/mock_upstream.py in a subprocess, points fetch_farmer_data.py
+at it through the base URL environment variables and a scratch database, then
+times each ingestion phase and appends the results to a JSON Lines file.
+
+Usage:
+    python -m benchmarks.bench_ingest --farmers-per-source 500 --latency-ms 20
+    python -m benchmarks.bench_ingest --farmers-per-source 500 --error-rate 0.05 --rps 200
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_services import REPO_ROOT, git_revision
+
+DEFAULT_RESULTS = REPO_ROOT / 'benchmarks' / 'ingest_results.jsonl'
+
+
+def start_mock_server(args):
+    command = [
+        sys.executable, '-m', 'benchmarks.mock_upstream',
+        '--port', str(args.port),
+        '--farmers-per-source', str(args.farmers_per_source),
+        '--lands-per-farmer', str(args.lands_per_farmer),
+        '--latency-ms', str(args.latency_ms),
+        '--jitter-ms', str(args.jitter_ms),
+        '--error-rate', str(args.error_rate),
+        '--rps', str(args.rps),
+        '--seed', str(args.seed),
+    ]
+    if args.etags:
+        command.append('--etags')
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+    stats_url = f"http://127.0.0.1:{args.port}/__stats"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(stats_url, timeout=1).read()
+            return process, stats_url
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("Mock upstream server exited during startup")
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Mock upstream server did not start")
+
+
+def timed(phase_times, name, func, *args, quiet=False):
+    start = time.perf_counter()
+    if quiet:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = func(*args)
+    else:
+        result = func(*args)
+    phase_times[name] = round(time.perf_counter() - start, 3)
+    print(f"  {name:<14} {phase_times[name]:>9.2f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion throughput against the mock upstream.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--farmers-per-source', type=int, default=200)
+    parser.add_argument('--lands-per-farmer', type=float, default=2.5)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rps', type=float, default=0.0)
+    parser.add_argument('--etags', action='store_true', help="Have the mock send ETags / honour If-None-Match")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=8, help="Ingestion fetch threads")
+    parser.add_argument('--processes', type=int, default=1,
+                        help="Shard processes for land records and bank details (see fetch_farmer_data --processes)")
+    parser.add_argument('--shard-by', choices=('source', 'id'), default='source')
+    parser.add_argument('--db', default=str(REPO_ROOT / 'data' / 'benchmarks' / 'ingest.db'))
+    parser.add_argument('--cache', metavar='DIR', help="Enable the on-disk HTTP response cache in DIR")
+    parser.add_argument('--cache-ttl', type=float, help="HTTP cache TTL in seconds")
+    parser.add_argument('--verbose', action='store_true', help="Keep per-record ingestion output")
+    parser.add_argument('--output', default=str(DEFAULT_RESULTS), help="JSON Lines file to append results to")
+    args = parser.parse_args()
+
+    db_path = Path(args.db)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    if db_path.exists():
+        os.remove(db_path)
+
+    # Must be set before fetch_farmer_data / models.database are imported
+    base = f"http://127.0.0.1:{args.port}/api"
+    os.environ['FARMER_DB_PATH'] = str(db_path)
+    os.environ['FARMER_API_BASE_URL'] = f"{base}/EMandiKaranIntegrationApi"
+    os.environ['PAYMENT_API_BASE_URL'] = f"{base}/FarmerRegistrationApi"
+    if args.cache:
+        os.environ['HTTP_CACHE_DIR'] = args.cache
+        if args.cache_ttl is not None:
+            os.environ['HTTP_CACHE_TTL'] = str(args.cache_ttl)
+
+    import fetch_farmer_data as ingest
+
+    process, stats_url = start_mock_server(args)
+    try:
+        ingest.rebuild_database()
+        quiet = not args.verbose
+        phase_times = {}
+        print(f"\nIngesting from mock upstream ({args.farmers_per_source} farmers/source, "
+              f"latency {args.latency_ms} ms, error rate {args.error_rate}, rps {args.rps or 'unlimited'})")
+        start = time.perf_counter()
+        farmers = timed(phase_times, 'fetch_farmers', ingest.fetch_all_farmers, quiet=quiet)
+        if args.processes > 1:
+            shard_paths = timed(phase_times, 'shards', ingest.run_shards, farmers, args.processes, args.shard_by,
+                                args.workers, quiet=quiet)
+            timed(phase_times, 'merge', ingest.merge_shards, shard_paths, quiet=quiet)
+        else:
+            timed(phase_times, 'save_farmers', ingest.save_farmers_to_db, farmers, quiet=quiet)
+            timed(phase_times, 'land_mapping', ingest.process_farmer_mapping_details, args.workers, quiet=quiet)
+            timed(phase_times, 'bank_details', ingest.process_all_farmer_bank_details, args.workers, quiet=quiet)
+        total_seconds = time.perf_counter() - start
+        upstream_stats = json.loads(urllib.request.urlopen(stats_url, timeout=5).read())
+        client = ingest.client_stats()
+        ingest.publish_database()
+    finally:
+        process.terminate()
+        process.wait()
+        ingest.engine.dispose()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ('farmers', 'land_records', 'farmer_bank_details')}
+    finally:
+        conn.close()
+
+    throughput = {
+        'farmers_per_s': round(counts['farmers'] / total_seconds, 2),
+        'land_records_per_s': round(counts['land_records'] / total_seconds, 2),
+        'requests_per_s': round(upstream_stats.get('requests', 0) / total_seconds, 2),
+    }
+    print(f"  {'total':<14} {total_seconds:>9.2f} s")
+    print(f"\nRows: {counts}")
+    print(f"Upstream: {upstream_stats}")
+    print(f"Client: {client}")
+    print(f"Throughput: {throughput}")
+
+    commit, dirty = git_revision()
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'mock': {
+            'farmers_per_source': args.farmers_per_source,
+            'lands_per_farmer': args.lands_per_farmer,
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'error_rate': args.error_rate,
+            'rps': args.rps,
+            'etags': args.etags,
+            'seed': args.seed,
+        },
+        'workers': args.workers,
+        'processes': args.processes,
+        'shard_by': args.shard_by if args.processes > 1 else None,
+        'cache': {'dir': args.cache, 'ttl': args.cache_ttl} if args.cache else None,
+        'client': client,
+        'phases_s': phase_times,
+        'total_s': round(total_seconds, 3),
+        'rows': counts,
+        'upstream': upstream_stats,
+        'throughput': throughput,
+    }
+    results_path = Path(args.output)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"\nResults appended to {results_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
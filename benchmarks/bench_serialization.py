@@ -0,0 +1,279 @@
+"""
+Serialization benchmark for the list APIs.
+
+Times the query, the row-to-dict mapping and the JSON encoding of /api/lands
+and /api/farmers payloads separately, for the legacy per-field builders with
+Flask's jsonify (kept here as the reference implementation) and for the
+projected-SQL + services.serialization path, and reports milliseconds per
+1,000 rows.
+
+Usage:
+    python -m benchmarks.bench_serialization --scale 10k --rows 1000
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_services import REPO_ROOT, git_revision, time_case
+from benchmarks.synthetic_data import SCALES, generate_database
+
+DEFAULT_RESULTS = REPO_ROOT / 'benchmarks' / 'serialization_results.jsonl'
+
+
+def legacy_format_datetime(dt_value):
+    if dt_value is None:
+        return None
+    if isinstance(dt_value, str):
+        try:
+            return datetime.strptime(dt_value, '%Y-%m-%d %H:%M:%S.%f').strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return dt_value
+    return dt_value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+LEGACY_LANDS_QUERY = """
+    SELECT lr.id, lr.farmer_id, lr.sr_no, {district_name}, {city_name}, {village_name},
+           lr.owner_name, lr.khewat_no, lr.kanal, lr.marle, lr.sarsai, lr.type, lr.min_land,
+           lr.land_owner_area_k, lr.land_owner_area_m, lr.land_owner_area_sarsai,
+           lr.verify_status as status, lr.version, lr.created_at, lr.updated_at,
+           f.farmer_name, f.mobile_number as farmer_phone
+    FROM land_records lr
+    LEFT JOIN farmers f ON lr.farmer_id = f.farmer_id
+    ORDER BY lr.id LIMIT {rows}
+"""
+
+LEGACY_FARMERS_QUERY = """
+    SELECT f.id, f.farmer_id, f.farmer_name, f.father_name, f.grandfather_name,
+           f.mobile_number, f.aadhar_number, {village_name}, f.source_api,
+           f.created_at, f.updated_at, {owner_area}, {final_owner_area},
+           (SELECT COUNT(*) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) as total_land_records,
+           (SELECT COALESCE(SUM(lr.kanal), 0) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) as total_kanal,
+           (SELECT COALESCE(SUM(lr.marle), 0) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) as total_marle,
+           (SELECT COALESCE(SUM(lr.sarsai), 0) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) as total_sarsai,
+           fbd.bank_id, fbd.account_holder_name, fbd.account_no_encrypted, fbd.ifsc_code, fbd.branch_name
+    FROM farmers f
+    LEFT JOIN farmer_bank_details fbd ON f.farmer_id = fbd.farmer_id
+    GROUP BY f.id ORDER BY f.id LIMIT {rows}
+"""
+
+
+def legacy_lands(rows):
+    lands = []
+    for row in rows:
+        lands.append({
+            'id': getattr(row, 'id', None),
+            'farmer_id': getattr(row, 'farmer_id', None),
+            'farmer_name': getattr(row, 'farmer_name', None) or 'Unknown Farmer',
+            'farmer_phone': getattr(row, 'farmer_phone', None),
+            'sr_no': getattr(row, 'sr_no', None),
+            'owner_name': getattr(row, 'owner_name', None),
+            'district_name': getattr(row, 'district_name', None),
+            'city_name': getattr(row, 'city_name', None),
+            'village_name': getattr(row, 'village_name', None),
+            'khewat_no': getattr(row, 'khewat_no', None),
+            'kanal': float(getattr(row, 'kanal', 0) or 0),
+            'marle': float(getattr(row, 'marle', 0) or 0),
+            'sarsai': float(getattr(row, 'sarsai', 0) or 0),
+            'land_owner_area_k': float(getattr(row, 'land_owner_area_k', 0) or 0),
+            'land_owner_area_m': float(getattr(row, 'land_owner_area_m', 0) or 0),
+            'land_owner_area_sarsai': float(getattr(row, 'land_owner_area_sarsai', 0) or 0),
+            'type': getattr(row, 'type', None),
+            'min_land': getattr(row, 'min_land', None),
+            'status': getattr(row, 'status', None),
+            'version': getattr(row, 'version', None),
+            'created_at': legacy_format_datetime(getattr(row, 'created_at', None)),
+            'updated_at': legacy_format_datetime(getattr(row, 'updated_at', None)),
+        })
+    return lands
+
+
+def legacy_farmers(rows, decrypt, bank_names):
+    farmers = []
+    for row in rows:
+        farmer = {
+            'id': row.id,
+            'farmer_id': row.farmer_id,
+            'farmer_name': row.farmer_name,
+            'father_name': row.father_name,
+            'grandfather_name': row.grandfather_name,
+            'mobile_number': row.mobile_number,
+            'aadhar_number': row.aadhar_number,
+            'village_name': row.village_name,
+            'source_api': row.source_api,
+            'created_at': legacy_format_datetime(row.created_at),
+            'updated_at': legacy_format_datetime(row.updated_at),
+            'total_land_records': row.total_land_records or 0,
+            'total_land': row.owner_area,
+            'area_under_cultivation': row.final_owner_area,
+            'bank_detail': None,
+        }
+        if row.account_no_encrypted:
+            farmer['bank_detail'] = {
+                'bank_id': row.bank_id,
+                'account_holder_name': row.account_holder_name,
+                'account_no': decrypt(row.account_no_encrypted),
+                'ifsc_code': row.ifsc_code,
+                'branch_name': row.branch_name,
+                'bank_name': bank_names.get(row.bank_id, 'Unknown Bank'),
+            }
+        farmers.append(farmer)
+    return farmers
+
+
+def fast_farmers(rows, farmer_service):
+    # Same row handling as get_farmers_api
+    keys = farmer_service.FARMER_LIST_KEYS
+    bank_start = len(keys)
+    farmers = []
+    for row in rows:
+        farmer = dict(zip(keys, row))
+        bank_id, holder, encrypted, ifsc, branch = row[bank_start:]
+        farmer['bank_detail'] = None
+        if encrypted:
+            farmer['bank_detail'] = {
+                'bank_id': bank_id, 'account_holder_name': holder,
+                'account_no': farmer_service.decrypt_account_no(encrypted),
+                'ifsc_code': ifsc, 'branch_name': branch,
+                'bank_name': farmer_service.bank_name(bank_id),
+            }
+        farmers.append(farmer)
+    return farmers
+
+
+def build_cases(rows):
+    """
+    Return the app (for Flask's jsonify provider) and, per dataset, the legacy and fast
+    queries plus mapping functions over already fetched rows.
+    """
+    from app import create_app
+    from services import farmer_service, land_service
+    from services.banks import bank_id_to_name_map
+    from services.serialization import sql_area_kms, sql_place_name
+
+    app = create_app({'TESTING': True})
+    fast_lands_query = (f"SELECT {land_service.LAND_LIST_COLUMNS} FROM land_records lr "
+                        f"{land_service.LAND_FARMER_JOIN} ORDER BY lr.id LIMIT {rows}")
+    fast_farmers_query = (f"SELECT {farmer_service.FARMER_LIST_COLUMNS}, {farmer_service.FARMER_LIST_BANK_COLUMNS} "
+                          f"FROM farmers f LEFT JOIN farmer_bank_details fbd ON f.farmer_id = fbd.farmer_id "
+                          f"GROUP BY f.id ORDER BY f.id LIMIT {rows}")
+    datasets = {
+        'lands': {
+            'legacy_query': LEGACY_LANDS_QUERY.format(
+                rows=rows, district_name=sql_place_name('lr.district_id'), city_name=sql_place_name('lr.city_id'),
+                village_name=sql_place_name('lr.village_id')),
+            'fast_query': fast_lands_query,
+            'legacy_map': legacy_lands,
+            'fast_map': lambda keys, fetched: [dict(zip(keys, row)) for row in fetched],
+        },
+        'farmers': {
+            'legacy_query': LEGACY_FARMERS_QUERY.format(
+                rows=rows, village_name=sql_place_name('f.village_id'), owner_area=sql_area_kms('f.owner_area'),
+                final_owner_area=sql_area_kms('f.final_owner_area')),
+            'fast_query': fast_farmers_query,
+            'legacy_map': lambda fetched: legacy_farmers(
+                fetched, farmer_service.decrypt_account_no, bank_id_to_name_map()),
+            'fast_map': lambda keys, fetched: fast_farmers(fetched, farmer_service),
+        },
+    }
+    return app, datasets
+
+
+def fetch(query):
+    """Run query once; return (elapsed ms, keys, rows)."""
+    import time
+    from sqlalchemy import text
+    from models.database import engine
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        result = conn.execute(text(query))
+        keys = tuple(result.keys())
+        rows = result.fetchall()
+    return (time.perf_counter() - start) * 1000, keys, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row mapping and JSON encoding for the list APIs.")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='10k')
+    parser.add_argument('--lands-per-farmer', type=float, default=2.5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rows', type=int, default=1000, help="Rows per payload")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db', help="Use this database instead of a generated one")
+    parser.add_argument('--output', default=str(DEFAULT_RESULTS), help="JSON Lines file to append results to")
+    args = parser.parse_args()
+
+    farmers = SCALES[args.scale]
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        db_path = REPO_ROOT / 'data' / 'benchmarks' / f"synthetic_{farmers}_{args.lands_per_farmer}_{args.seed}.db"
+    os.environ['FARMER_DB_PATH'] = str(db_path)
+    if not args.db and not db_path.exists():
+        print(f"Generating synthetic database with {farmers:,} farmers at {db_path} ...")
+        generate_database(db_path, farmers=farmers, lands_per_farmer=args.lands_per_farmer, seed=args.seed)
+
+    from services import serialization
+
+    app, datasets = build_cases(args.rows)
+    per_1k = 1000 / args.rows
+    encoder = 'orjson' if serialization.orjson is not None else 'json'
+    print(f"\nSerialization per 1,000 rows ({args.rows} rows per payload, {args.repeat} runs, encoder: {encoder})")
+
+    results = {}
+    with app.app_context():
+        for name, case in datasets.items():
+            # Queries run once: the farmers list is dominated by its per-row COUNT subquery
+            legacy_query_ms, _, legacy_fetched = fetch(case['legacy_query'])
+            fast_query_ms, keys, fast_fetched = fetch(case['fast_query'])
+            legacy_payload = {'data': case['legacy_map'](legacy_fetched), 'total': len(legacy_fetched)}
+            fast_payload = {'data': case['fast_map'](keys, fast_fetched), 'total': len(fast_fetched)}
+            timings = {
+                'legacy_map': time_case(lambda: case['legacy_map'](legacy_fetched), args.repeat),
+                'fast_map': time_case(lambda: case['fast_map'](keys, fast_fetched), args.repeat),
+                'legacy_encode': time_case(lambda: app.json.response(legacy_payload).get_data(), args.repeat),
+                'fast_encode': time_case(lambda: serialization.json_response(fast_payload).get_data(), args.repeat),
+                'stdlib_encode': time_case(lambda: json.dumps(
+                    fast_payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), args.repeat),
+            }
+            summary = {key: round(value['median_ms'] * per_1k, 3) for key, value in timings.items()}
+            summary['legacy_query'] = round(legacy_query_ms * per_1k, 3)
+            summary['fast_query'] = round(fast_query_ms * per_1k, 3)
+            summary['legacy_serialize'] = round(summary['legacy_map'] + summary['legacy_encode'], 3)
+            summary['fast_serialize'] = round(summary['fast_map'] + summary['fast_encode'], 3)
+            summary['bytes_legacy'] = len(app.json.response(legacy_payload).get_data())
+            summary['bytes_fast'] = len(serialization.dumps(fast_payload))
+            results[name] = summary
+            print(f"\n  {name}")
+            print(f"    query      {summary['legacy_query']:>9.3f} -> {summary['fast_query']:>9.3f} ms   (single run)")
+            print(f"    map        {summary['legacy_map']:>9.3f} -> {summary['fast_map']:>9.3f} ms")
+            print(f"    encode     {summary['legacy_encode']:>9.3f} -> {summary['fast_encode']:>9.3f} ms"
+                  f"   (stdlib json {summary['stdlib_encode']:.3f} ms)")
+            print(f"    map+encode {summary['legacy_serialize']:>9.3f} -> {summary['fast_serialize']:>9.3f} ms"
+                  f"   ({summary['legacy_serialize'] / summary['fast_serialize']:.2f}x)")
+            print(f"    body size  {summary['bytes_legacy']:>9} -> {summary['bytes_fast']:>9} bytes")
+
+    commit, dirty = git_revision()
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'encoder': encoder,
+        'rows': args.rows,
+        'repeat': args.repeat,
+        'ms_per_1000_rows': results,
+    }
+    results_path = Path(args.output)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"\nResults appended to {results_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Benchmark harness for the services layer and HTTP routes.
+
+Generates (or reuses) a synthetic database, points the app at it through
+FARMER_DB_PATH, times every service function and route, and appends one JSON
+line per run to a results file so runs from different commits can be compared.
+
+Usage:
+    python -m benchmarks.bench_services --scale 10k
+    python -m benchmarks.bench_services --scale 100k --repeat 10 --compare-to <commit>
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.synthetic_data import SCALES, generate_database
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_RESULTS = REPO_ROOT / 'benchmarks' / 'results.jsonl'
+
+# Cases that walk every farmer with per-row queries; skipped above this size unless --include-slow
+# and always timed with a single run
+FULL_SCAN_LIMIT = 20_000
+FULL_SCAN_CASES = {'get_all_farmers_for_render', 'GET /farmers/all'}
+
+
+def git_revision():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                             cwd=REPO_ROOT, text=True).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def time_case(func, repeat, warmup=1):
+    """Run func warmup + repeat times; return timing summary in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'min_ms': round(samples[0], 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'max_ms': round(samples[-1], 3),
+        'runs': len(samples),
+    }
+
+
+def cycle(values):
+    """Return a zero-arg callable that yields the next value on each call."""
+    state = {'i': 0}
+
+    def next_value():
+        value = values[state['i'] % len(values)]
+        state['i'] += 1
+        return value
+    return next_value
+
+
+def sample_keys(db_path, seed, count=50):
+    """Pick realistic ids / search terms from the benchmark database."""
+    import sqlite3
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    try:
+        farmer_rows = conn.execute("SELECT id, farmer_name, mobile_number FROM farmers").fetchall()
+        land_ids = [row[0] for row in conn.execute("SELECT id FROM land_records")]
+        total_farmers = len(farmer_rows)
+        total_lands = len(land_ids)
+        picks = rng.sample(farmer_rows, min(count, len(farmer_rows)))
+        sampled_land_ids = rng.sample(land_ids, min(count, len(land_ids))) if land_ids else []
+        # (district, village, khewat) of the sampled lands, as field staff would look them up
+        locations = [(row[0], row[1], row[2].split(',')[-1]) for row in conn.execute(f"""
+            SELECT (SELECT name FROM places WHERE id = district_id), (SELECT name FROM places WHERE id = village_id),
+                   khewat_no
+            FROM land_records
+            WHERE id IN ({', '.join(str(land_id) for land_id in sampled_land_ids) or 'NULL'})
+        """)]
+    finally:
+        conn.close()
+    return {
+        'farmer_row_ids': [row[0] for row in picks],
+        'farmer_names': [row[1].split()[0].lower() for row in picks],
+        'mobile_prefixes': [row[2][:6] for row in picks],
+        'land_ids': sampled_land_ids,
+        'land_locations': locations,
+        'total_farmers': total_farmers,
+        'total_lands': total_lands,
+    }
+
+
+def build_cases(keys, include_slow):
+    """Return an ordered list of (group, name, callable). Mutating cases come last."""
+    from app import create_app
+    from services import farmer_service, land_service, suggest_service
+
+    app = create_app({'TESTING': True})
+    client = app.test_client()
+
+    farmer_ids = cycle(keys['farmer_row_ids'])
+    names = cycle(keys['farmer_names'])
+    mobiles = cycle(keys['mobile_prefixes'])
+    land_ids = cycle(keys['land_ids'] or [1])
+    land_locations = cycle(keys['land_locations'] or [('', '', '')])
+    # What a search box sends while a name is typed (the index is built on the warmup call)
+    keystrokes = cycle([name[:n] for name in keys['farmer_names'] for n in range(1, len(name) + 1)])
+    deep_farmer_page = max(1, keys['total_farmers'] // 10 // 2)
+    deep_land_page = max(1, keys['total_lands'] // 10 // 2)
+    full_scan_ok = include_slow or keys['total_farmers'] <= FULL_SCAN_LIMIT
+
+    def get_ok(url):
+        def run():
+            response = client.get(url() if callable(url) else url)
+            if response.status_code >= 400:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return run
+
+    def post_ok(url, body):
+        def run():
+            response = client.post(url, json=body)
+            if response.status_code >= 400:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return run
+
+    cases = [
+        ('service', 'get_farmers_api:first_page', lambda: farmer_service.get_farmers_api(page=1)),
+        ('service', 'get_farmers_api:deep_page', lambda: farmer_service.get_farmers_api(page=deep_farmer_page)),
+        ('service', 'get_farmers_api:search_name', lambda: farmer_service.get_farmers_api(search=names())),
+        ('service', 'get_farmers_api:search_mobile', lambda: farmer_service.get_farmers_api(search=mobiles())),
+        ('service', 'get_farmers_api:source_filter', lambda: farmer_service.get_farmers_api(source_api='PNC')),
+        ('service', 'get_farmers_api:no_land_filter', lambda: farmer_service.get_farmers_api(total_area='0')),
+        ('service', 'get_farmer_by_id', lambda: farmer_service.get_farmer_by_id(farmer_ids())),
+        ('service', 'get_farmer_for_render', lambda: farmer_service.get_farmer_for_render(farmer_ids())),
+        ('service', 'get_lands_api:first_page', lambda: land_service.get_lands_api(page=1)),
+        ('service', 'get_lands_api:deep_page', lambda: land_service.get_lands_api(page=deep_land_page)),
+        ('service', 'get_lands_api:search', lambda: land_service.get_lands_api(search=names())),
+        ('service', 'get_land_by_id', lambda: land_service.get_land_by_id(land_ids())),
+        ('service', 'lookup_lands', lambda: land_service.lookup_lands(*land_locations())),
+        ('service', 'get_farmers_batch', lambda: farmer_service.get_farmers_batch({'ids': keys['farmer_row_ids']})),
+        ('service', 'get_suggestions', lambda: suggest_service.get_suggestions(keystrokes())),
+        ('route', 'GET /api/stats', get_ok('/api/stats')),
+        ('route', 'GET /api/farmers', get_ok('/api/farmers?page=1')),
+        ('route', 'GET /api/farmers?search', get_ok(lambda: f'/api/farmers?search={names()}')),
+        ('route', 'GET /api/farmer/<id>', get_ok(lambda: f'/api/farmer/{farmer_ids()}')),
+        ('route', 'GET /farmers/<id>/profile', get_ok(lambda: f'/farmers/{farmer_ids()}/profile')),
+        ('route', 'GET /api/lands', get_ok('/api/lands?page=1')),
+        ('route', 'GET /api/lands?search', get_ok(lambda: f'/api/lands?search={names()}')),
+        ('route', 'GET /api/land/<id>', get_ok(lambda: f'/api/land/{land_ids()}')),
+        ('route', 'POST /api/farmers/lookup', post_ok('/api/farmers/lookup', {'ids': keys['farmer_row_ids']})),
+        ('route', 'GET /api/suggest', get_ok(lambda: f'/api/suggest?q={keystrokes()}')),
+    ]
+    if full_scan_ok:
+        cases += [
+            ('service', 'get_all_farmers_for_render', farmer_service.get_all_farmers_for_render),
+            ('route', 'GET /farmers/all', get_ok('/farmers/all')),
+        ]
+
+    update_payload = {'type': '1', 'land_owner_area_k': 4, 'land_owner_area_m': 10,
+                      'land_owner_area_sarsai': 0, 'khewat_no': '122'}
+
+    def post_update():
+        response = client.post(f'/api/land/update/{land_ids()}', json=update_payload)
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+    def post_batch_update():
+        updates = [dict(update_payload, id=land_ids()) for _ in range(100)]
+        response = client.post('/api/lands/update', json={'updates': updates})
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+    cases += [
+        ('service', 'update_land', lambda: land_service.update_land(land_ids(), update_payload)),
+        ('route', 'POST /api/land/update/<id>', post_update),
+        ('route', 'POST /api/lands/update (100 rows)', post_batch_update),
+    ]
+    return cases
+
+
+def run_benchmarks(cases, repeat, only=None):
+    results = {}
+    for group, name, func in cases:
+        if only and only not in name:
+            continue
+        try:
+            if name in FULL_SCAN_CASES:
+                summary = time_case(func, 1, warmup=0)
+            else:
+                summary = time_case(func, repeat)
+            summary['group'] = group
+            print(f"  {name:<40} median {summary['median_ms']:>10.3f} ms   p95 {summary['p95_ms']:>10.3f} ms")
+        except Exception as e:
+            summary = {'group': group, 'error': f"{type(e).__name__}: {e}"[:300]}
+            print(f"  {name:<40} ERROR {summary['error']}")
+        results[name] = summary
+    return results
+
+
+def load_previous(results_path, commit, farmers):
+    """Return the most recent recorded run for commit (prefix match) at the same scale."""
+    if not results_path.exists():
+        return None
+    match = None
+    with open(results_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if (run.get('commit') or '').startswith(commit) and run.get('dataset', {}).get('farmers') == farmers:
+                match = run
+    return match
+
+
+def print_comparison(current, previous):
+    print(f"\nComparison against {previous['commit'][:10]} ({previous['timestamp']}):")
+    for name, summary in current['cases'].items():
+        before = previous['cases'].get(name, {})
+        if 'median_ms' not in summary or 'median_ms' not in before:
+            continue
+        ratio = summary['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        print(f"  {name:<40} {before['median_ms']:>10.3f} -> {summary['median_ms']:>10.3f} ms  ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark service functions and routes on a synthetic database.")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='10k')
+    parser.add_argument('--farmers', type=int, help="Explicit farmer count (overrides --scale)")
+    parser.add_argument('--lands-per-farmer', type=float, default=2.5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case")
+    parser.add_argument('--db', help="Use this database instead of a generated one")
+    parser.add_argument('--regenerate', action='store_true', help="Rebuild the cached synthetic database")
+    parser.add_argument('--include-slow', action='store_true',
+                        help=f"Run whole-table render cases even above {FULL_SCAN_LIMIT:,} farmers")
+    parser.add_argument('--only', help="Only run cases whose name contains this string")
+    parser.add_argument('--output', default=str(DEFAULT_RESULTS), help="JSON Lines file to append results to")
+    parser.add_argument('--compare-to', help="Commit (or prefix) to compare against from the results file")
+    args = parser.parse_args()
+
+    farmers = args.farmers or SCALES[args.scale]
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        db_path = REPO_ROOT / 'data' / 'benchmarks' / f"synthetic_{farmers}_{args.lands_per_farmer}_{args.seed}.db"
+
+    # Must be set before anything imports models.database
+    os.environ['FARMER_DB_PATH'] = str(db_path)
+
+    if not args.db and (args.regenerate or not db_path.exists()):
+        print(f"Generating synthetic database with {farmers:,} farmers at {db_path} ...")
+        generate_database(db_path, farmers=farmers, lands_per_farmer=args.lands_per_farmer, seed=args.seed)
+
+    keys = sample_keys(db_path, args.seed)
+    print(f"\nBenchmarking {keys['total_farmers']:,} farmers / {keys['total_lands']:,} land records "
+          f"({args.repeat} runs per case)")
+    cases = build_cases(keys, args.include_slow)
+    case_results = run_benchmarks(cases, args.repeat, args.only)
+
+    commit, dirty = git_revision()
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'dataset': {
+            'farmers': keys['total_farmers'],
+            'land_records': keys['total_lands'],
+            'lands_per_farmer': args.lands_per_farmer,
+            'seed': args.seed,
+            'size_bytes': db_path.stat().st_size,
+        },
+        'repeat': args.repeat,
+        'cases': case_results,
+    }
+
+    results_path = Path(args.output)
+    previous = load_previous(results_path, args.compare_to, keys['total_farmers']) if args.compare_to else None
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    print(f"\nResults appended to {results_path}")
+
+    if args.compare_to:
+        if previous:
+            print_comparison(record, previous)
+        else:
+            print(f"No recorded run for commit {args.compare_to} at this scale.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Startup benchmark for the web app.
+
+Each sample runs in a fresh interpreter and measures:
+
+* import_ms         importing app.py
+* create_app_ms     create_app() (schema check, blueprints, static assets)
+* first_request_ms  the first request through the test client
+* fork_first_request_ms
+                    fork() after create_app() to the child's first response,
+                    i.e. what a preloaded gunicorn worker pays before serving
+* rss_kb            resident memory after the first request
+
+and lists which heavy modules (ingestion client, HTTP libraries, crypto) were
+loaded by the time the first request was served; none of them should be.
+
+Usage:
+    python -m benchmarks.bench_startup --scale 10k --repeat 10
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_services import REPO_ROOT, git_revision
+from benchmarks.synthetic_data import SCALES, generate_database
+
+DEFAULT_RESULTS = REPO_ROOT / 'benchmarks' / 'startup_results.jsonl'
+FIRST_REQUEST_URL = '/api/lands?page=1&per_page=20'
+
+# Modules only the ingestion script (or the first decryption) should load
+HEAVY_MODULES = (
+    'fetch_farmer_data', 'upstream_client', 'payload_archive', 'requests', 'urllib3',
+    'tqdm', 'dotenv', 'cryptography.hazmat.primitives.ciphers',
+)
+
+# Runs in a fresh interpreter; prints one JSON line
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+application = app_module.create_app()
+t2 = time.perf_counter()
+client = application.test_client()
+status = client.get(URL).status_code
+t3 = time.perf_counter()
+loaded = [name for name in HEAVY if name in sys.modules]
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+fork_ms = None
+if hasattr(os, 'fork'):
+    read_fd, write_fd = os.pipe()
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        application.test_client().get(URL)
+        os.write(write_fd, str((time.perf_counter() - start) * 1000).encode())
+        os._exit(0)
+    os.close(write_fd)
+    fork_ms = float(os.read(read_fd, 64).decode() or 'nan')
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'first_request_ms': (t3 - t2) * 1000,
+    'fork_first_request_ms': fork_ms,
+    'rss_kb': rss_kb(),
+    'status': status,
+    'heavy_modules': loaded,
+}))
+"""
+
+METRICS = ('import_ms', 'create_app_ms', 'first_request_ms', 'startup_ms', 'fork_first_request_ms',
+           'process_ms', 'rss_kb')
+
+
+def run_probe(url):
+    """Run one cold start in a subprocess; return its measurements plus total process time."""
+    code = f"URL = {url!r}\nHEAVY = {HEAVY_MODULES!r}\n" + PROBE
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=os.environ.copy(),
+                         capture_output=True, text=True, check=True)
+    process_ms = (time.perf_counter() - start) * 1000
+    sample = json.loads(out.stdout.strip().splitlines()[-1])
+    sample['process_ms'] = process_ms
+    sample['startup_ms'] = sample['import_ms'] + sample['create_app_ms'] + sample['first_request_ms']
+    return sample
+
+
+def interpreter_baseline(repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def summarize(samples):
+    summary = {}
+    for metric in METRICS:
+        values = sorted(s[metric] for s in samples if s.get(metric) is not None)
+        if values:
+            summary[metric] = {
+                'min': round(values[0], 3),
+                'median': round(statistics.median(values), 3),
+                'max': round(values[-1], 3),
+            }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start, first request and fork cost of the web app.")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='10k')
+    parser.add_argument('--lands-per-farmer', type=float, default=2.5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=10, help="Cold starts to sample")
+    parser.add_argument('--db', help="Use this database instead of a generated one")
+    parser.add_argument('--url', default=FIRST_REQUEST_URL, help="First request to time")
+    parser.add_argument('--output', default=str(DEFAULT_RESULTS), help="JSON Lines file to append results to")
+    args = parser.parse_args()
+
+    farmers = SCALES[args.scale]
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        db_path = REPO_ROOT / 'data' / 'benchmarks' / f"synthetic_{farmers}_{args.lands_per_farmer}_{args.seed}.db"
+    os.environ['FARMER_DB_PATH'] = str(db_path)
+    if not args.db and not db_path.exists():
+        print(f"Generating synthetic database with {farmers:,} farmers at {db_path} ...")
+        generate_database(db_path, farmers=farmers, lands_per_farmer=args.lands_per_farmer, seed=args.seed)
+
+    baseline_ms = interpreter_baseline(args.repeat)
+    # One untimed start warms the OS page cache and bytecode cache
+    run_probe(args.url)
+    samples = [run_probe(args.url) for _ in range(args.repeat)]
+    summary = summarize(samples)
+    heavy = sorted({name for s in samples for name in s['heavy_modules']})
+    statuses = sorted({s['status'] for s in samples})
+
+    print(f"\nStartup ({args.repeat} cold starts, first request {args.url} -> {statuses})")
+    print(f"  {'interpreter (python -c pass)':<30} {baseline_ms:>9.1f} ms")
+    for metric in METRICS:
+        if metric in summary:
+            unit = 'kB' if metric == 'rss_kb' else 'ms'
+            print(f"  {metric:<30} {summary[metric]['median']:>9.1f} {unit}  "
+                  f"(min {summary[metric]['min']:.1f}, max {summary[metric]['max']:.1f})")
+    if heavy:
+        print(f"  ⚠️ heavy modules loaded: {', '.join(heavy)}")
+    else:
+        print("  no heavy modules loaded")
+
+    commit, dirty = git_revision()
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'url': args.url,
+        'repeat': args.repeat,
+        'interpreter_ms': round(baseline_ms, 3),
+        'heavy_modules': heavy,
+        'metrics': summary,
+    }
+    results_path = Path(args.output)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"\nResults appended to {results_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
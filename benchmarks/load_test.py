@@ -0,0 +1,214 @@
+"""
+HTTP load test for the list APIs under concurrent clients.
+
+Starts the app (gunicorn with gunicorn.conf.py, or the Flask development
+server for comparison) against a synthetic database, or targets an already
+running server with --url, then runs --clients client processes for
+--duration seconds. Each client keeps one HTTP/1.1 connection open and
+requests random pages of /api/farmers and /api/lands. Reports requests per
+second, errors and latency percentiles per endpoint.
+
+Usage:
+    python -m benchmarks.load_test --server gunicorn --workers 4 --threads 4 --clients 16
+    python -m benchmarks.load_test --server dev --clients 16
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --clients 32 --duration 30
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_services import REPO_ROOT, git_revision
+from benchmarks.synthetic_data import SCALES, generate_database
+
+DEFAULT_RESULTS = REPO_ROOT / 'benchmarks' / 'load_results.jsonl'
+PER_PAGE = 20
+ENDPOINTS = {
+    'farmers': '/api/farmers',
+    'lands': '/api/lands',
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, db_path, workers, threads):
+    port = free_port()
+    env = os.environ.copy()
+    env['FARMER_DB_PATH'] = str(db_path)
+    if kind == 'gunicorn':
+        env.update({
+            'GUNICORN_BIND': f"127.0.0.1:{port}",
+            'WEB_CONCURRENCY': str(workers),
+            'GUNICORN_THREADS': str(threads),
+            'GUNICORN_ACCESS_LOG': '',
+            'DB_WATCH_INTERVAL': '0',
+        })
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application']
+    else:
+        # What `python app.py` runs, minus the debugger and reloader
+        command = [sys.executable, '-c',
+                   f"from app import create_app; create_app().run(host='127.0.0.1', port={port})"]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f"{base_url}/api/stats", timeout=5).read()
+            return process, base_url
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"{kind} server exited during startup")
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+def run_client(task):
+    """One client: keep-alive requests until the deadline; returns {endpoint: [latency ms, ...]} and errors."""
+    base_url, deadline, pages, seed = task
+    parsed = urllib.parse.urlsplit(base_url)
+    rng = random.Random(seed)
+    latencies = {name: [] for name in ENDPOINTS}
+    errors = {name: 0 for name in ENDPOINTS}
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=60)
+    while time.time() < deadline:
+        name = rng.choice(list(ENDPOINTS))
+        path = f"{ENDPOINTS[name]}?page={rng.randint(1, pages[name])}&per_page={PER_PAGE}"
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors[name] += 1
+                continue
+            latencies[name].append((time.perf_counter() - start) * 1000)
+        except (OSError, http.client.HTTPException):
+            errors[name] += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=60)
+    conn.close()
+    return latencies, errors
+
+
+def page_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        farmers = conn.execute("SELECT COUNT(*) FROM farmers").fetchone()[0]
+        lands = conn.execute("SELECT COUNT(*) FROM land_records").fetchone()[0]
+    finally:
+        conn.close()
+    return {'farmers': max(1, farmers // PER_PAGE), 'lands': max(1, lands // PER_PAGE)}
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /api/farmers and /api/lands with concurrent clients.")
+    parser.add_argument('--server', choices=('gunicorn', 'dev'), default='gunicorn',
+                        help="Server to start (ignored with --url)")
+    parser.add_argument('--url', help="Test an already running server instead of starting one")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count() * 2 + 1)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent client processes")
+    parser.add_argument('--duration', type=float, default=15, help="Seconds of load")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='10k')
+    parser.add_argument('--lands-per-farmer', type=float, default=2.5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help="Use this database instead of a generated one")
+    parser.add_argument('--output', default=str(DEFAULT_RESULTS), help="JSON Lines file to append results to")
+    args = parser.parse_args()
+
+    farmers = SCALES[args.scale]
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        db_path = REPO_ROOT / 'data' / 'benchmarks' / f"synthetic_{farmers}_{args.lands_per_farmer}_{args.seed}.db"
+    if not args.db and not db_path.exists():
+        print(f"Generating synthetic database with {farmers:,} farmers at {db_path} ...")
+        generate_database(db_path, farmers=farmers, lands_per_farmer=args.lands_per_farmer, seed=args.seed)
+    pages = page_counts(db_path)
+
+    process = None
+    if args.url:
+        base_url, server = args.url.rstrip('/'), 'external'
+    else:
+        process, base_url = start_server(args.server, db_path, args.workers, args.threads)
+        server = args.server
+    label = f"{server} ({args.workers} workers x {args.threads} threads)" if server == 'gunicorn' else server
+    print(f"\nLoad test: {label} at {base_url}, {args.clients} clients, {args.duration:.0f}s")
+
+    try:
+        deadline = time.time() + args.duration
+        tasks = [(base_url, deadline, pages, args.seed + i) for i in range(args.clients)]
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.clients) as pool:
+            client_results = pool.map(run_client, tasks)
+        elapsed = time.perf_counter() - start
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    results = {}
+    for name in ENDPOINTS:
+        latencies = sorted(ms for client_latencies, _ in client_results for ms in client_latencies[name])
+        errors = sum(client_errors[name] for _, client_errors in client_results)
+        summary = {'requests': len(latencies), 'errors': errors, 'rps': round(len(latencies) / elapsed, 2)}
+        if latencies:
+            summary.update({
+                'p50_ms': round(statistics.median(latencies), 2),
+                'p95_ms': round(percentile(latencies, 0.95), 2),
+                'p99_ms': round(percentile(latencies, 0.99), 2),
+            })
+        results[name] = summary
+        print(f"  {ENDPOINTS[name]:<14} {summary['rps']:>8.1f} req/s  {summary['requests']:>7} ok  {errors:>4} errors"
+              + (f"  p50 {summary['p50_ms']:.1f}  p95 {summary['p95_ms']:.1f}  p99 {summary['p99_ms']:.1f} ms"
+                 if latencies else ""))
+    total_rps = sum(summary['rps'] for summary in results.values())
+    print(f"  {'total':<14} {total_rps:>8.1f} req/s")
+
+    commit, dirty = git_revision()
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'cpus': multiprocessing.cpu_count(),
+        'server': server,
+        'workers': args.workers if server == 'gunicorn' else None,
+        'threads': args.threads if server == 'gunicorn' else None,
+        'clients': args.clients,
+        'duration_s': round(elapsed, 2),
+        'endpoints': results,
+        'total_rps': round(total_rps, 2),
+    }
+    results_path = Path(args.output)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"\nResults appended to {results_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
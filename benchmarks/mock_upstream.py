@@ -0,0 +1,325 @@
+"""
+Mock upstream server for offline ingestion testing.
+
+Serves the three upstream APIs used by fetch_farmer_data.py with the response
+shapes documented in API-DETAILS.TXT:
+
+    .../getFarmerDetailWithLicense/<a>/<b>        farmer list per license
+    .../getFarmermappingDetail/<FarmerId>         land mapping records
+    .../GetFarmerPaymentOptionsDetails/<FarmerId> bank / payment option details
+
+Data is generated deterministically from --seed, so repeated runs return the
+same payloads. Latency, error rates and throttling (HTTP 429 + Retry-After)
+can be injected to exercise the client under realistic upstream behaviour.
+GET /__stats returns request counters as JSON.
+
+Usage:
+    python -m benchmarks.mock_upstream --port 8765 --farmers-per-source 2000 --latency-ms 40 --error-rate 0.02
+    FARMER_API_BASE_URL=http://127.0.0.1:8765/api/EMandiKaranIntegrationApi \\
+    PAYMENT_API_BASE_URL=http://127.0.0.1:8765/api/FarmerRegistrationApi python fetch_farmer_data.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic_data import (
+    DISTRICTS, LATIN_FIRST_NAMES, LATIN_SURNAMES, LATIN_VILLAGES,
+    encrypt_account_no, format_kms, gurmukhi_owner_name, khasra_text, load_bank_ids,
+)
+
+# (license path segments) -> source name, in the order of FARMER_DETAILS_APIS
+LICENSES = [
+    (('159', '20185'), 'PNC'),
+    (('159', '20186'), 'PM'),
+    (('159', '8030'), 'ATC'),
+    (('159', '120637'), 'BTC'),
+    (('159', '20181'), 'STC-RPP'),
+    (('61', '20174'), 'STC-BHU'),
+]
+LICENSE_INDEX = {segments: index for index, (segments, _) in enumerate(LICENSES)}
+
+
+def envelope(response_data, success=True):
+    return {
+        "success": success,
+        "message": None,
+        "responseData": response_data,
+        "LicenseId": None,
+        "UserId": None,
+        "LoginUserId": None,
+        "UserType": None,
+        "BranchId": None,
+        "UserName": None,
+        "TotalRows": 0,
+        "BranchAssociationId": None,
+        "responseDataOnly": None,
+        "ResponseDataSet": None,
+        "IsClosed": None,
+    }
+
+
+class MockUpstream:
+    """Deterministic payload generator plus fault injection settings."""
+
+    def __init__(self, farmers_per_source=1000, lands_per_farmer=2.5, bank_ratio=0.8, overlap=0.05,
+                 latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rps=0.0, retry_after=1, etags=False, seed=42):
+        self.farmers_per_source = farmers_per_source
+        self.lands_per_farmer = lands_per_farmer
+        self.bank_ratio = bank_ratio
+        self.overlap = overlap
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rps = rps
+        self.retry_after = retry_after
+        self.etags = etags
+        self.seed = seed
+        self.bank_ids = load_bank_ids()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._tokens = rps
+        self._last_refill = time.monotonic()
+        self._fault_rng = random.Random(seed + 1)
+
+    def _rng(self, *key):
+        # String seeds are hashed with SHA-512, so payloads are stable across processes
+        return random.Random(':'.join(str(part) for part in (self.seed,) + key))
+
+    def farmer_ids_for(self, source_index):
+        ids = [10_000 + i * len(LICENSES) + source_index for i in range(self.farmers_per_source)]
+        # A slice of the previous source's farmers is also licensed here (same FarmerId, second source)
+        previous = (source_index - 1) % len(LICENSES)
+        shared = int(self.farmers_per_source * self.overlap)
+        ids += [10_000 + i * len(LICENSES) + previous for i in range(shared)]
+        return ids
+
+    def farmer_record(self, farmer_id):
+        rng = self._rng('farmer', farmer_id)
+        district, tehsils, _ = rng.choice(DISTRICTS)
+        has_area = rng.random() < 0.7
+        kanal, marle, sarsai = rng.randint(0, 130), rng.randint(0, 19), rng.choice([0.0, 2.43])
+        verified = has_area and rng.random() < 0.6
+        return {
+            "r": 1,
+            "OwnerId": 0,
+            "renvu_villageid": None,
+            "VillageId": rng.randint(30_000, 40_000),
+            "FarmerId": farmer_id,
+            "FarmerName": f"{rng.choice(LATIN_FIRST_NAMES)} {rng.choice(LATIN_SURNAMES)}",
+            "FatherName": f"{rng.choice(LATIN_FIRST_NAMES)} {rng.choice(LATIN_SURNAMES)}",
+            "GrandFatherName": f"{rng.choice(LATIN_FIRST_NAMES)} {rng.choice(LATIN_SURNAMES)}",
+            "DistrictName": district,
+            "CityName": f"{rng.choice(tehsils)} ({district})",
+            "VillageName": rng.choice(LATIN_VILLAGES),
+            "Owner_Area": format_kms(kanal, marle, sarsai) if has_area else None,
+            "finalOwner_Area": format_kms(kanal, marle, 0.0) if has_area else None,
+            "updateOwner_Area": format_kms(kanal, marle, 0.0) if has_area else None,
+            "OwnerName": "",
+            "AadharNumber": str(rng.randint(200_000_000_000, 999_999_999_999)),
+            "MobileNumber": str(rng.randint(6_000_000_000, 9_999_999_999)),
+            "ownertype": 1,
+            "verifystatus": "true" if verified else "false",
+            "auction": 1 if verified else 0,
+        }
+
+    def mapping_records(self, farmer_id):
+        rng = self._rng('mapping', farmer_id)
+        count = min(int(rng.expovariate(1 / self.lands_per_farmer)), 40) if self.lands_per_farmer else 0
+        records = []
+        for n in range(count):
+            district, tehsils, villages = rng.choice(DISTRICTS)
+            kanal, marle = rng.randint(0, 60), rng.randint(0, 19)
+            land_type = rng.choice([1, 1, 2])
+            records.append({
+                "E": 0,
+                "Srno": rng.randint(1, 1200),
+                "Id": 12_000_000 + farmer_id * 50 + n,
+                "FarmerId": farmer_id,
+                "OwnerId": rng.randint(900_000, 1_100_000),
+                "OwnerName": gurmukhi_owner_name(rng),
+                "Revenue_VillageId": "76771590-d685-dc11-838d-000e0ca469f6",
+                "AnaajKharid_Id": None,
+                "VillageName": rng.choice(villages),
+                "CityName": rng.choice(tehsils),
+                "DistrictName": district.upper(),
+                "AreaType": "ਕਨਾਲ-ਮਰਲਾ",
+                "Owner_Area": format_kms(kanal, marle, 0.0),
+                "LandOwner_Area_K": kanal,
+                "LandOwner_Area_M": marle,
+                "LandOwner_Area_Sarsai": 0.0,
+                "ownertype": land_type,
+                "Khewat_No": str(rng.randint(1, 400)),
+                "Khasra_No": khasra_text(rng, kanal),
+                "period": f"{kanal} ਕਨਾਲ {marle} ਮਰਲਾ ",
+                "Type": land_type,
+                "Kanal": float(kanal),
+                "Marle": float(marle),
+                "Sarsai": 0.0,
+                "Mappedarea": 1,
+                "LicenseId": 20186,
+                "VerifyStatus": rng.choice([0, 1, 1]),
+                "Kanal1": kanal,
+                "Marle1": float(marle),
+                "Sarsai1": 0.0,
+                "CommodityId": 0,
+                "FadLicenseId": None,
+                "ActualWeight": None,
+                "minland": 1,
+                "auction": 0,
+            })
+        return records
+
+    def payment_options(self, farmer_id):
+        rng = self._rng('bank', farmer_id)
+        if rng.random() >= self.bank_ratio:
+            return None
+        return {
+            "FarmerId": farmer_id,
+            "BankId": rng.choice(self.bank_ids),
+            "AccountHolderName": f"{rng.choice(LATIN_FIRST_NAMES)} {rng.choice(LATIN_SURNAMES)}".upper(),
+            "AccountNo": encrypt_account_no(str(rng.randint(10 ** 10, 10 ** 15))),
+            "IFSCCode": f"{rng.choice(['SBIN', 'PUNB', 'HDFC', 'UTIB'])}0{rng.randint(0, 99999):05d}",
+            "BranchName": rng.choice(['BATHINDA', 'RAMPURA PHUL', 'BALIANWALI', 'SANGRUR', 'NABHA']),
+        }
+
+    def take_token(self):
+        """Token bucket for --rps throttling. Returns False when the request should get a 429."""
+        if not self.rps:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rps, self._tokens + (now - self._last_refill) * self.rps)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._fault_rng.random() < self.error_rate
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+
+    def route(self, path):
+        """Return (status, payload) for a request path."""
+        segments = [segment for segment in path.split('?')[0].split('/') if segment]
+        if 'getFarmerDetailWithLicense' in segments:
+            index = segments.index('getFarmerDetailWithLicense')
+            license_key = tuple(segments[index + 1:index + 3])
+            if license_key not in LICENSE_INDEX:
+                return 200, envelope([])
+            farmer_ids = self.farmer_ids_for(LICENSE_INDEX[license_key])
+            return 200, envelope([self.farmer_record(farmer_id) for farmer_id in farmer_ids])
+        if 'getFarmermappingDetail' in segments or 'GetFarmerPaymentOptionsDetails' in segments:
+            try:
+                farmer_id = int(segments[-1])
+            except ValueError:
+                return 400, envelope(None, success=False)
+            if 'getFarmermappingDetail' in segments:
+                return 200, envelope(self.mapping_records(farmer_id))
+            bank = self.payment_options(farmer_id)
+            return 200, envelope(bank, success=bank is not None)
+        return 404, {"success": False, "message": "Not found"}
+
+
+def make_handler(upstream):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            headers = dict(headers or {})
+            if upstream.etags and status == 200:
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                headers['ETag'] = etag
+                if self.headers.get('If-None-Match') == etag:
+                    status, body = 304, b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            return status
+
+        def do_GET(self):
+            if self.path == '/__stats':
+                with upstream._lock:
+                    stats = dict(upstream.stats)
+                self._send(200, stats)
+                return
+
+            upstream.delay()
+            if not upstream.take_token():
+                status, payload, headers = 429, {"success": False, "message": "Too Many Requests"}, \
+                    {'Retry-After': str(upstream.retry_after)}
+            elif upstream.should_fail():
+                status, payload, headers = 503, {"success": False, "message": "Service Unavailable"}, None
+            else:
+                status, payload = upstream.route(self.path)
+                headers = None
+            status = self._send(status, payload, headers)
+            with upstream._lock:
+                upstream.stats['requests'] += 1
+                upstream.stats[f'status_{status}'] += 1
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(upstream, host='127.0.0.1', port=8765):
+    server = ThreadingHTTPServer((host, port), make_handler(upstream))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock upstream farmer / mapping / payment APIs.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--farmers-per-source', type=int, default=1000)
+    parser.add_argument('--lands-per-farmer', type=float, default=2.5)
+    parser.add_argument('--bank-ratio', type=float, default=0.8)
+    parser.add_argument('--overlap', type=float, default=0.05,
+                        help="Fraction of each source's farmers also listed under the next source")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Added latency per request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Uniform +/- jitter on the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--rps', type=float, default=0.0, help="Requests per second before answering 429 (0 = off)")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument('--etags', action='store_true', help="Send ETags and answer If-None-Match with 304")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    upstream = MockUpstream(
+        farmers_per_source=args.farmers_per_source, lands_per_farmer=args.lands_per_farmer,
+        bank_ratio=args.bank_ratio, overlap=args.overlap, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, error_rate=args.error_rate, rps=args.rps,
+        retry_after=args.retry_after, etags=args.etags, seed=args.seed,
+    )
+    server = serve(upstream, args.host, args.port)
+    print(f"Mock upstream listening on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {dict(upstream.stats)}")
+
+
+if __name__ == "__main__":
+    main()
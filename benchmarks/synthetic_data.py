@@ -0,0 +1,258 @@
+"""
+Synthetic database generator for benchmarks.
+
+Builds a SQLite database with the same schema as farmer_land_records.db and
+realistic-looking content: Latin farmer names, Gurmukhi land owner / village
+text, K/M/S areas (stored as sarsai) and AES-encrypted account numbers that
+round-trip through decrypt_account_no.
+
+Usage:
+    python -m benchmarks.synthetic_data --farmers 100000 --output data/benchmarks/bench.db
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, event
+
+from services.area import to_sarsai
+from services.crypto import encrypt_account_no
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+SOURCE_APIS = ['PNC', 'PM', 'ATC', 'BTC', 'STC-RPP', 'STC-BHU']
+
+LATIN_FIRST_NAMES = [
+    'Amarjit', 'Angrej', 'Amandeep', 'Baljit', 'Balwinder', 'Charanjit', 'Darshan',
+    'Gurpreet', 'Gurdev', 'Harcharan', 'Harjinder', 'Jagjit', 'Jarnail', 'Jaswant',
+    'Kuldeep', 'Lakhwinder', 'Manjit', 'Mohinder', 'Paramjit', 'Rattandeep',
+    'Sukhdev', 'Sukhwinder', 'Thakur', 'Utam', 'Kehar', 'Minder', 'Bachan',
+]
+LATIN_SURNAMES = ['singh', 'Singh', 'SINGH', 'Kaur', 'KAUR', 'Dhaliwal', 'Sidhu', 'Brar', 'Gill', 'Sandhu']
+
+GURMUKHI_FIRST_NAMES = [
+    'ਜਗਜੀਤ', 'ਜਰਨੈਲ', 'ਚੂਹਡ਼', 'ਅਮਰਜੀਤ', 'ਗੁਰਪ੍ਰੀਤ', 'ਹਰਚਰਨ', 'ਬਲਵਿੰਦਰ',
+    'ਸੁਖਦੇਵ', 'ਕੁਲਦੀਪ', 'ਮਨਜੀਤ', 'ਪਰਮਜੀਤ', 'ਦਰਸ਼ਨ', 'ਠਾਕੁਰ', 'ਕੇਹਰ',
+]
+GURMUKHI_RELATIONS = ['ਪੁੱਤਰ', 'ਪੁੱਤਰੀ', 'ਪਤਨੀ']
+
+DISTRICTS = [
+    # (Latin district, Gurmukhi tehsils, Gurmukhi villages)
+    ('Bathinda', ['ਬਾਲਿਆਂਵਾਲੀ', 'ਰਾਮਪੁਰਾ ਫੂਲ'], ['ਚਾਉਕੇ-1(450)', '..ਬਦਿਆਲਾ..(47)', 'ਮਹਿਰਾਜ(12)', 'ਕੋਠਾ ਗੁਰੂ(88)']),
+    ('Sangrur', ['ਧੂਰੀ', 'ਸੁਨਾਮ'], ['ਬੇਨੜਾ(21)', 'ਘਨੌਰੀ ਕਲਾਂ(7)', 'ਲਸੋਈ(64)']),
+    ('Patiala', ['ਨਾਭਾ', 'ਸਮਾਣਾ'], ['ਰੋਹਟੀ ਛੰਨਾ(3)', 'ਕਕਰਾਲਾ(19)', 'ਮੰਡੌਰ(40)']),
+    ('Ludhiana', ['ਜਗਰਾਉਂ', 'ਖੰਨਾ'], ['ਸਿੱਧਵਾਂ ਬੇਟ(5)', 'ਗਾਲਿਬ ਕਲਾਂ(33)', 'ਇਸੇਵਾਲ(71)']),
+    ('Moga', ['ਬਾਘਾ ਪੁਰਾਣਾ', 'ਨਿਹਾਲ ਸਿੰਘ ਵਾਲਾ'], ['ਸਮਾਧ ਭਾਈ(9)', 'ਰੋਡੇ(26)', 'ਦੌਧਰ(52)']),
+]
+LATIN_VILLAGES = ['Chauke', 'Chauke Patti balol', 'Badiala', 'Mehraj', 'Kotha Guru', 'Benra', 'Rohti Chhanna']
+
+
+def load_bank_ids():
+    bank_data_path = Path(__file__).resolve().parent.parent / 'static' / 'js' / 'bankId.json'
+    with open(bank_data_path, 'r') as f:
+        return [bank['BankId'] for bank in json.load(f)]
+
+
+def format_kms(kanal, marle, sarsai):
+    return f"{kanal}/{marle}/{sarsai:.2f}"
+
+
+def gurmukhi_owner_name(rng):
+    first, father, grandfather = (rng.choice(GURMUKHI_FIRST_NAMES) for _ in range(3))
+    relation = rng.choice(GURMUKHI_RELATIONS)
+    return f"{first} ਸਿੰਘ {relation} {father} ਸਿੰਘ ਪੁੱਤਰ  {grandfather} ਸਿੰਘ   ( i )"
+
+
+def khasra_text(rng, kanal):
+    parts = []
+    remaining = max(int(kanal), 1)
+    while remaining > 0:
+        piece = min(remaining, rng.randint(1, 8))
+        parts.append(f"{rng.randint(0, 1400)}//{rng.randint(1, 30)}/{rng.randint(1, 3)}"
+                     f"[{piece} ਕਨਾਲ {rng.randint(0, 19)} ਮਰਲਾ ]")
+        remaining -= piece
+    return ",".join(parts)
+
+
+def make_farmer(rng, farmer_id, created_at):
+    district, tehsils, _ = rng.choice(DISTRICTS)
+    kanal, marle, sarsai = rng.randint(0, 130), rng.randint(0, 19), rng.choice([0.0, 0.0, 2.43, 4.5])
+    has_area = rng.random() < 0.7
+    verified = has_area and rng.random() < 0.6
+    first = rng.choice(LATIN_FIRST_NAMES)
+    return {
+        'farmer_id': farmer_id,
+        'farmer_name': f"{first} {rng.choice(LATIN_SURNAMES)}",
+        'father_name': f"{rng.choice(LATIN_FIRST_NAMES)} {rng.choice(LATIN_SURNAMES)}",
+        'grandfather_name': f"{rng.choice(LATIN_FIRST_NAMES)} {rng.choice(LATIN_SURNAMES)}",
+        'mobile_number': str(rng.randint(6_000_000_000, 9_999_999_999)),
+        'aadhar_number': str(rng.randint(200_000_000_000, 999_999_999_999)),
+        'village_name': rng.choice(LATIN_VILLAGES),
+        'district_name': district,
+        'city_name': f"{rng.choice(tehsils)} ({district})",
+        'owner_area': to_sarsai(kanal, marle, sarsai) if has_area else None,
+        'final_owner_area': to_sarsai(kanal, marle, 0.0) if has_area else None,
+        'update_owner_area': to_sarsai(kanal, marle, 0.0) if has_area else None,
+        'owner_type': 1,
+        'verify_status': 1 if verified else 0,
+        'auction': 1 if verified else 0,
+        'source_api': rng.choice(SOURCE_APIS),
+        'created_at': created_at,
+        'updated_at': created_at,
+    }
+
+
+def make_land(rng, land_id, farmer_id, sr_no, created_at):
+    district, tehsils, villages = rng.choice(DISTRICTS)
+    kanal, marle = rng.randint(0, 60), rng.randint(0, 19)
+    land_type = rng.choice([1, 1, 2])
+    return {
+        'id': land_id,
+        'farmer_id': farmer_id,
+        'sr_no': str(sr_no),
+        'owner_id': rng.randint(900_000, 1_100_000),
+        'owner_name': gurmukhi_owner_name(rng),
+        'revenue_village_id': None,
+        'village_name': rng.choice(villages),
+        'city_name': rng.choice(tehsils),
+        'district_name': district.upper(),
+        'area_type': 'ਕਨਾਲ-ਮਰਲਾ',
+        'owner_area': to_sarsai(kanal, marle, 0.0),
+        'land_owner_area_k': float(kanal),
+        'land_owner_area_m': float(marle),
+        'land_owner_area_sarsai': 0.0,
+        'owner_type': land_type,
+        'khewat_no': str(rng.randint(1, 400)) if rng.random() < 0.9 else f"{rng.randint(1, 200)},{rng.randint(200, 400)}",
+        'khasra_no': khasra_text(rng, kanal),
+        'period': f"{kanal} ਕਨਾਲ {marle} ਮਰਲਾ ",
+        'type': land_type,
+        'kanal': float(kanal),
+        'marle': float(marle),
+        'sarsai': 0.0,
+        'mapped_area': 1.0,
+        'license_id': rng.choice([20185, 20186, 8030, 120637, 20181, 20174]),
+        'verify_status': rng.choice([0, 1, 1]),
+        'kanal1': float(kanal),
+        'marle1': float(marle),
+        'sarsai1': 0.0,
+        'commodity_id': 0,
+        'min_land': 1.0,
+        'auction': 0,
+        'created_at': created_at,
+        'updated_at': created_at,
+    }
+
+
+def make_bank_detail(rng, farmer_id, holder_name, bank_ids, created_at):
+    account_no = str(rng.randint(10 ** 10, 10 ** 15))
+    return {
+        'farmer_id': farmer_id,
+        'bank_id': rng.choice(bank_ids),
+        'account_holder_name': holder_name.upper(),
+        'account_no_encrypted': encrypt_account_no(account_no),
+        'ifsc_code': f"{rng.choice(['SBIN', 'PUNB', 'HDFC', 'UTIB'])}0{rng.randint(0, 99999):05d}",
+        'branch_name': rng.choice(['BATHINDA', 'RAMPURA PHUL', 'BALIANWALI', 'SANGRUR', 'NABHA']),
+        'created_at': created_at,
+        'updated_at': created_at,
+    }
+
+
+def generate_database(db_path, farmers=10_000, lands_per_farmer=2.5, bank_ratio=0.8,
+                      seed=42, chunk_size=5_000, verbose=True):
+    """
+    Create a fresh synthetic database at db_path.
+    Returns a dict with row counts and generation time.
+    """
+    # Imported here so callers can set FARMER_DB_PATH before models.database is loaded
+    from models.database import Base
+    from models.farmer_model import Farmer, FarmerBankDetail
+    from models.land_model import LandRecord
+    from models.place_model import PlaceIds
+
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    if db_path.exists():
+        os.remove(db_path)
+
+    rng = random.Random(seed)
+    bank_ids = load_bank_ids()
+    engine = create_engine(f"sqlite:///{db_path}")
+
+    @event.listens_for(engine, "connect")
+    def _fast_bulk_load(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=OFF")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+    Base.metadata.create_all(engine)
+
+    start = time.perf_counter()
+    base_time = datetime(2024, 1, 1)
+    farmer_ids = rng.sample(range(10_000, 10_000 + farmers * 4), farmers)
+    next_land_id = 12_000_000
+    counts = {'farmers': 0, 'land_records': 0, 'farmer_bank_details': 0}
+
+    with engine.begin() as conn:
+        places = PlaceIds(conn)
+        for offset in range(0, farmers, chunk_size):
+            farmer_rows, land_rows, bank_rows = [], [], []
+            for farmer_id in farmer_ids[offset:offset + chunk_size]:
+                created_at = base_time + timedelta(seconds=rng.randint(0, 180 * 24 * 3600),
+                                                   microseconds=rng.randint(0, 999_999))
+                farmer = make_farmer(rng, farmer_id, created_at)
+                farmer_rows.append(farmer)
+
+                land_count = min(int(rng.expovariate(1 / lands_per_farmer)), 40) if lands_per_farmer else 0
+                for _ in range(land_count):
+                    land_rows.append(make_land(rng, next_land_id, farmer_id, rng.randint(1, 1200), created_at))
+                    next_land_id += 1
+
+                if rng.random() < bank_ratio:
+                    bank_rows.append(make_bank_detail(rng, farmer_id, farmer['farmer_name'], bank_ids, created_at))
+
+            conn.execute(insert(Farmer.__table__), [places.encode(row) for row in farmer_rows])
+            if land_rows:
+                conn.execute(insert(LandRecord.__table__), [places.encode(row) for row in land_rows])
+            if bank_rows:
+                conn.execute(insert(FarmerBankDetail.__table__), bank_rows)
+            counts['farmers'] += len(farmer_rows)
+            counts['land_records'] += len(land_rows)
+            counts['farmer_bank_details'] += len(bank_rows)
+            if verbose:
+                print(f"  generated {counts['farmers']:,}/{farmers:,} farmers, {counts['land_records']:,} land records")
+
+    engine.dispose()
+    counts['seconds'] = round(time.perf_counter() - start, 2)
+    counts['size_bytes'] = db_path.stat().st_size
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic farmer/land database for benchmarks.")
+    parser.add_argument('--scale', choices=sorted(SCALES), help="Preset farmer count (overrides --farmers)")
+    parser.add_argument('--farmers', type=int, default=10_000)
+    parser.add_argument('--lands-per-farmer', type=float, default=2.5, help="Mean land records per farmer")
+    parser.add_argument('--bank-ratio', type=float, default=0.8, help="Fraction of farmers with bank details")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='data/benchmarks/synthetic.db')
+    args = parser.parse_args()
+
+    farmers = SCALES[args.scale] if args.scale else args.farmers
+    print(f"Generating {farmers:,} farmers into {args.output} ...")
+    counts = generate_database(args.output, farmers=farmers, lands_per_farmer=args.lands_per_farmer,
+                               bank_ratio=args.bank_ratio, seed=args.seed)
+    print(f"Done in {counts['seconds']}s: {counts['farmers']:,} farmers, {counts['land_records']:,} land records, "
+          f"{counts['farmer_bank_details']:,} bank details ({counts['size_bytes'] / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
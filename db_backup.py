@@ -0,0 +1,326 @@
+"""
+Compressed, incremental backups of the SQLite database.
+
+Each backup starts with a consistent online snapshot taken with SQLite's
+backup API, so the web app and other readers keep working meanwhile. The
+snapshot is then split into pages and stored under data/backups/:
+
+    <id>.json       manifest: kind, parent, page size and count, sizes, timings
+    <id>.pages.gz   gzip stream of (page number, page) records
+    <id>.hashes     blake2b digest of every page of the snapshot (16 bytes each)
+
+A full backup stores every page. An incremental backup stores only the pages
+whose digest differs from the previous backup's, and restoring it replays the
+chain from the last full backup. A full backup is taken every
+BACKUP_FULL_EVERY backups. One is also taken when most pages changed, which
+is the usual case after a full ingestion run, since that builds a new file.
+The newest BACKUP_KEEP_FULL chains (a full backup and its incrementals) are
+kept.
+
+    python db_backup.py backup [--full]
+    python db_backup.py list
+    python db_backup.py restore latest [--to path]
+    python db_backup.py prune
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from models.database import DATA_DIR, DB_PATH
+
+BACKUP_DIR = Path(os.getenv("BACKUP_DIR", DATA_DIR / "backups"))
+BACKUP_KEEP_FULL = int(os.getenv("BACKUP_KEEP_FULL", "3"))
+BACKUP_FULL_EVERY = int(os.getenv("BACKUP_FULL_EVERY", "7"))
+# Take a full backup anyway when more than this share of the pages changed
+BACKUP_FULL_CHANGED_RATIO = float(os.getenv("BACKUP_FULL_CHANGED_RATIO", "0.5"))
+BACKUP_COMPRESS_LEVEL = int(os.getenv("BACKUP_COMPRESS_LEVEL", "1"))
+# Pages copied per backup API step; other connections can write between steps
+BACKUP_STEP_PAGES = 4096
+
+DIGEST_SIZE = 16
+PAGE_HEADER = struct.Struct('>I')
+
+
+def _digest(page):
+    return hashlib.blake2b(page, digest_size=DIGEST_SIZE).digest()
+
+
+def _mb(size):
+    return size / (1024 * 1024)
+
+
+def snapshot(db_path, target_path):
+    """Copy db_path to target_path with the backup API; returns the snapshot's page size."""
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=BACKUP_STEP_PAGES)
+        return target.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+
+
+def iter_pages(path, page_size):
+    with open(path, 'rb') as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                return
+            yield page
+
+
+def _write_pages(snapshot_path, pages_path, page_size, compress_level, previous_hashes=None, max_changed=None):
+    """
+    Write the snapshot's pages (only those whose digest differs from previous_hashes, if given) to pages_path
+    in one pass. Returns (digests of all pages, numbers of the pages written), or None once more than
+    max_changed pages differ, as a full backup is due then.
+    """
+    hashes, changed = [], []
+    with gzip.open(pages_path, 'wb', compresslevel=compress_level) as out:
+        for number, page in enumerate(iter_pages(snapshot_path, page_size)):
+            digest = _digest(page)
+            hashes.append(digest)
+            if previous_hashes is None or number >= len(previous_hashes) or previous_hashes[number] != digest:
+                changed.append(number)
+                if max_changed is not None and len(changed) > max_changed:
+                    return None
+                out.write(PAGE_HEADER.pack(number))
+                out.write(page)
+    return hashes, changed
+
+
+def load_manifest(backup_dir, backup_id):
+    with open(Path(backup_dir) / f"{backup_id}.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def list_backups(backup_dir=BACKUP_DIR):
+    """Manifests of all backups, oldest first."""
+    manifests = []
+    for path in sorted(Path(backup_dir).glob('*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifests.append(json.load(f))
+    return manifests
+
+
+def _load_hashes(backup_dir, backup_id):
+    with open(Path(backup_dir) / f"{backup_id}.hashes", 'rb') as f:
+        data = f.read()
+    return [data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+
+def _new_backup_id(backup_dir):
+    base = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup_id, n = base, 1
+    while (Path(backup_dir) / f"{backup_id}.json").exists():
+        n += 1
+        backup_id = f"{base}_{n}"
+    return backup_id
+
+
+def create_backup(db_path=DB_PATH, backup_dir=BACKUP_DIR, full=False, compress_level=BACKUP_COMPRESS_LEVEL):
+    """
+    Back up db_path into backup_dir; incremental on top of the newest backup unless full is set,
+    that chain is already BACKUP_FULL_EVERY long or most pages changed. Returns the manifest.
+    """
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    backup_id = _new_backup_id(backup_dir)
+    snapshot_path = backup_dir / f".{backup_id}.snapshot"
+    pages_path = backup_dir / f"{backup_id}.pages.gz"
+    hashes_path = backup_dir / f"{backup_id}.hashes"
+    manifest = None
+    start = time.perf_counter()
+    try:
+        page_size = snapshot(db_path, snapshot_path)
+        snapshot_seconds = time.perf_counter() - start
+
+        parent, previous_hashes = None, None
+        backups = list_backups(backup_dir)
+        if backups and not full:
+            newest = backups[-1]
+            if (newest['source'] == str(db_path) and newest['page_size'] == page_size
+                    and newest['chain_length'] < BACKUP_FULL_EVERY):
+                parent = newest
+                previous_hashes = _load_hashes(backup_dir, newest['id'])
+
+        written = None
+        if previous_hashes is not None:
+            max_changed = BACKUP_FULL_CHANGED_RATIO * (os.path.getsize(snapshot_path) // page_size)
+            written = _write_pages(snapshot_path, pages_path, page_size, compress_level, previous_hashes, max_changed)
+        if written is None:
+            parent = None
+            written = _write_pages(snapshot_path, pages_path, page_size, compress_level)
+        hashes, changed = written
+        with open(hashes_path, 'wb') as f:
+            f.write(b''.join(hashes))
+        seconds = time.perf_counter() - start
+
+        db_bytes = len(hashes) * page_size
+        stored_bytes = os.path.getsize(pages_path)
+        manifest = {
+            'id': backup_id,
+            'kind': 'incremental' if parent else 'full',
+            'parent': parent['id'] if parent else None,
+            'chain_length': parent['chain_length'] + 1 if parent else 1,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'source': str(db_path),
+            'page_size': page_size,
+            'page_count': len(hashes),
+            'pages_stored': len(changed),
+            'db_bytes': db_bytes,
+            'stored_bytes': stored_bytes,
+            'snapshot_seconds': round(snapshot_seconds, 3),
+            'seconds': round(seconds, 3),
+            'mb_per_s': round(_mb(db_bytes) / seconds, 1) if seconds > 0 else None,
+        }
+        with open(backup_dir / f"{backup_id}.json", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    finally:
+        # A failed backup leaves no partial files behind
+        for path in (snapshot_path,) if manifest else (snapshot_path, pages_path, hashes_path):
+            if path.exists():
+                os.remove(path)
+
+    print(f"Backed up {db_path} as {manifest['kind']} backup {backup_id}: {manifest['pages_stored']:,} of "
+          f"{manifest['page_count']:,} pages, {_mb(db_bytes):.1f} MB -> {_mb(stored_bytes):.1f} MB "
+          f"in {seconds:.2f} s ({manifest['mb_per_s']} MB/s)")
+    prune_backups(backup_dir)
+    return manifest
+
+
+def resolve_backup(backup_dir, backup_id):
+    """The manifest for backup_id, or the newest one for 'latest'."""
+    backups = list_backups(backup_dir)
+    if not backups:
+        raise ValueError(f"No backups in {backup_dir}")
+    if backup_id == 'latest':
+        return backups[-1]
+    for manifest in backups:
+        if manifest['id'] == backup_id:
+            return manifest
+    raise ValueError(f"Unknown backup {backup_id!r}")
+
+
+def _chain(backup_dir, manifest):
+    chain = [manifest]
+    while chain[-1]['parent']:
+        chain.append(load_manifest(backup_dir, chain[-1]['parent']))
+    return chain[::-1]
+
+
+def restore_backup(backup_id='latest', target_path=DB_PATH, backup_dir=BACKUP_DIR, verify=True):
+    """
+    Rebuild the database as of backup_id at target_path. The file is written next to the target and
+    renamed over it once complete (and, with verify, checked against the backup's page digests).
+    Returns {'id', 'chain', 'seconds', 'mb_per_s'}.
+    """
+    backup_dir = Path(backup_dir)
+    manifest = resolve_backup(backup_dir, backup_id)
+    target_path = Path(target_path)
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = target_path.with_name(target_path.name + ".restoring")
+    page_size, record_size = manifest['page_size'], PAGE_HEADER.size + manifest['page_size']
+    start = time.perf_counter()
+    chain = _chain(backup_dir, manifest)
+    try:
+        with open(partial_path, 'wb') as out:
+            for link in chain:
+                with gzip.open(backup_dir / f"{link['id']}.pages.gz", 'rb') as pages:
+                    while True:
+                        record = pages.read(record_size)
+                        if not record:
+                            break
+                        number, = PAGE_HEADER.unpack_from(record)
+                        out.seek(number * page_size)
+                        out.write(record[PAGE_HEADER.size:])
+            out.truncate(manifest['page_count'] * page_size)
+        if verify:
+            expected = _load_hashes(backup_dir, manifest['id'])
+            for number, page in enumerate(iter_pages(partial_path, page_size)):
+                if _digest(page) != expected[number]:
+                    raise ValueError(f"Restored page {number} of backup {manifest['id']} does not match its digest")
+        os.replace(partial_path, target_path)
+    finally:
+        if partial_path.exists():
+            os.remove(partial_path)
+    seconds = time.perf_counter() - start
+    result = {
+        'id': manifest['id'],
+        'chain': [link['id'] for link in chain],
+        'seconds': round(seconds, 3),
+        'mb_per_s': round(_mb(manifest['db_bytes']) / seconds, 1) if seconds > 0 else None,
+    }
+    print(f"Restored backup {manifest['id']} ({len(chain)} file(s)) to {target_path} "
+          f"in {seconds:.2f} s ({result['mb_per_s']} MB/s)")
+    return result
+
+
+def prune_backups(backup_dir=BACKUP_DIR, keep_full=BACKUP_KEEP_FULL):
+    """Delete all but the newest keep_full chains; returns the removed backup ids."""
+    backups = list_backups(backup_dir)
+    fulls = [position for position, manifest in enumerate(backups) if manifest['kind'] == 'full']
+    if len(fulls) <= keep_full:
+        return []
+    oldest_kept = fulls[-keep_full] if keep_full > 0 else len(backups)
+    removed = []
+    for manifest in backups[:oldest_kept]:
+        for suffix in ('.json', '.pages.gz', '.hashes'):
+            path = Path(backup_dir) / f"{manifest['id']}{suffix}"
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error removing old backup file {path}: {e}")
+        removed.append(manifest['id'])
+    if removed:
+        print(f"Removed {len(removed)} old backup(s): {', '.join(removed)}")
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed, incremental SQLite backups.")
+    parser.add_argument('--dir', default=str(BACKUP_DIR), help="Backup directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    backup = commands.add_parser('backup', help="Back up the live database")
+    backup.add_argument('--db', default=str(DB_PATH))
+    backup.add_argument('--full', action='store_true', help="Take a full backup even if an incremental would do")
+    backup.add_argument('--level', type=int, default=BACKUP_COMPRESS_LEVEL, help="gzip level (1-9)")
+    commands.add_parser('list', help="List backups, oldest first")
+    restore = commands.add_parser('restore', help="Restore a backup")
+    restore.add_argument('backup_id', nargs='?', default='latest')
+    restore.add_argument('--to', default=str(DB_PATH), help="Target database file (default: the live database)")
+    restore.add_argument('--no-verify', action='store_true', help="Skip checking the page digests")
+    commands.add_parser('prune', help=f"Keep the newest {BACKUP_KEEP_FULL} full backups and their incrementals")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'backup':
+            create_backup(args.db, args.dir, full=args.full, compress_level=args.level)
+        elif args.command == 'list':
+            for manifest in list_backups(args.dir):
+                print(f"{manifest['id']:<20} {manifest['kind']:<12} {manifest['pages_stored']:>9,} pages "
+                      f"{_mb(manifest['stored_bytes']):>9.1f} MB  ({_mb(manifest['db_bytes']):.1f} MB database, "
+                      f"{manifest['seconds']} s)")
+        elif args.command == 'restore':
+            restore_backup(args.backup_id, args.to, args.dir, verify=not args.no_verify)
+        else:
+            prune_backups(args.dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,233 +1,241 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
 import os
-import shutil
+import queue
+import sqlite3
 import time
-import random # Added for exponential backoff jitter
-from datetime import datetime
-import requests
+from datetime import datetime, timedelta
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
+from sqlalchemy import create_engine, insert, func, text
+from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
-# For AES decryption
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import padding
-import base64
-
 # Import the new FarmerBankDetail model
 from models.farmer_model import Farmer, FarmerBankDetail
 from models.land_model import LandRecord
+from models.place_model import PlaceIds, PLACE_COLUMNS
 from models.database import Base # Import Base from the shared database file
+from models.migrations import ensure_schema
 
 # Load environment variables
 load_dotenv()
 
-# Import Base, engine, Session, DATA_DIR, DB_NAME, DB_PATH from the shared database file
-from models.database import engine, Session, DATA_DIR, DB_NAME, DB_PATH
+# Import DATA_DIR, DB_NAME, DB_PATH from the shared database file
+from models.database import DATA_DIR, DB_NAME, DB_PATH
+from upstream_client import get_json, client_stats, configure_cache, CircuitOpenError, HTTP_CACHE_DIR, HTTP_CACHE_TTL
+from payload_archive import PayloadArchive, resolve_run, iter_phase
+from services.duplicate_service import build_duplicate_index
+from services.area import parse_area_kms
+
+from db_backup import create_backup, BACKUP_DIR
+
+# Each run builds a staging database next to the live one and swaps it in with an
+# atomic rename once complete, so the web app never serves a half-built database
+BUILD_DB_PATH = DB_PATH.with_name(DB_PATH.name + ".building")
+engine = create_engine(f"sqlite:///{BUILD_DB_PATH}")
+Session = sessionmaker(bind=engine)
 
-# BACKUP_DIR is specific to this script
-BACKUP_DIR = DATA_DIR / "backups"
-BACKUP_DIR.mkdir(exist_ok=True)
+# Land record changes older than this are dropped from the change feed (0 keeps them all)
+CHANGE_LOG_RETENTION_DAYS = float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "90"))
+
+# Raw upstream payloads of each run, used by --from-archive
+ARCHIVE_DIR = Path(os.getenv("INGEST_ARCHIVE_DIR", DATA_DIR / "archive"))
 
 def backup_database():
-    """Create a timestamped backup of the database."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = BACKUP_DIR / f"farmer_land_records_{timestamp}.db"
-    
-    if DB_PATH.exists():
-        shutil.copy2(DB_PATH, backup_path)
-        print(f"\nDatabase backed up to: {backup_path}")
-    else:
+    """Back up the live database before it is replaced (compressed, incremental where possible; see db_backup)."""
+    if not DB_PATH.exists():
         print("\nNo existing database found, creating a new one.")
-    
-    # Keep only the last 5 backups
-    backups = sorted(BACKUP_DIR.glob("farmer_land_records_*.db"), key=os.path.getmtime)
-    for old_backup in backups[:-5]:
-        try:
-            os.remove(old_backup)
-        except Exception as e:
-            print(f"Error removing old backup {old_backup}: {e}")
+        return None
+    return create_backup(DB_PATH, BACKUP_DIR)
 
 def delete_database():
-    """Delete the existing database file."""
-    if DB_PATH.exists():
-        try:
-            os.remove(DB_PATH)
-            print(f"Existing database '{DB_NAME}' removed.")
-        except Exception as e:
-            print(f"Error removing database {DB_PATH}: {e}")
-    else:
-        print(f"No existing database '{DB_NAME}' found to remove.")
+    """Delete a leftover staging database from an earlier, unfinished run."""
+    for path in (BUILD_DB_PATH, BUILD_DB_PATH.with_name(BUILD_DB_PATH.name + "-journal")):
+        if path.exists():
+            try:
+                os.remove(path)
+                print(f"Removed leftover staging database '{path.name}'.")
+            except Exception as e:
+                print(f"Error removing staging database {path}: {e}")
+
+# API endpoints (base URLs can be overridden in .env, e.g. to point at benchmarks/mock_upstream.py)
+FARMER_API_BASE_URL = os.getenv(
+    "FARMER_API_BASE_URL", "https://apifarmerlandmapping.emandikaran-pb.in/api/EMandiKaranIntegrationApi"
+).rstrip("/")
+PAYMENT_API_BASE_URL = os.getenv(
+    "PAYMENT_API_BASE_URL", "https://farmerregistrationapi.anaajkharid.in/api/FarmerRegistrationApi"
+).rstrip("/")
 
-# API endpoints
 FARMER_DETAILS_APIS = [
-    {"name": "PNC", "url": "https://apifarmerlandmapping.emandikaran-pb.in/api/EMandiKaranIntegrationApi/getFarmerDetailWithLicense/159/20185"},
-    {"name": "PM", "url": "https://apifarmerlandmapping.emandikaran-pb.in/api/EMandiKaranIntegrationApi/getFarmerDetailWithLicense/159/20186"},
-    {"name": "ATC", "url": "https://apifarmerlandmapping.emandikaran-pb.in/api/EMandiKaranIntegrationApi/getFarmerDetailWithLicense/159/8030"},
-    {"name": "BTC", "url": "https://apifarmerlandmapping.emandikaran-pb.in/api/EMandiKaranIntegrationApi/getFarmerDetailWithLicense/159/120637"},
-    {"name": "STC-RPP", "url": "https://apifarmerlandmapping.emandikaran-pb.in/api/EMandiKaranIntegrationApi/getFarmerDetailWithLicense/159/20181"},
-    {"name": "STC-BHU", "url": "https://apifarmerlandmapping.emandikaran-pb.in/api/EMandiKaranIntegrationApi/getFarmerDetailWithLicense/61/20174"}
+    {"name": "PNC", "url": f"{FARMER_API_BASE_URL}/getFarmerDetailWithLicense/159/20185"},
+    {"name": "PM", "url": f"{FARMER_API_BASE_URL}/getFarmerDetailWithLicense/159/20186"},
+    {"name": "ATC", "url": f"{FARMER_API_BASE_URL}/getFarmerDetailWithLicense/159/8030"},
+    {"name": "BTC", "url": f"{FARMER_API_BASE_URL}/getFarmerDetailWithLicense/159/120637"},
+    {"name": "STC-RPP", "url": f"{FARMER_API_BASE_URL}/getFarmerDetailWithLicense/159/20181"},
+    {"name": "STC-BHU", "url": f"{FARMER_API_BASE_URL}/getFarmerDetailWithLicense/61/20174"}
 ]
 
-FARMER_MAPPING_BASE_URL = "https://apifarmerlandmapping.emandikaran-pb.in/api/EMandiKaranIntegrationApi/getFarmermappingDetail"
-FARMER_PAYMENT_OPTIONS_BASE_URL = "https://farmerregistrationapi.anaajkharid.in/api/FarmerRegistrationApi/GetFarmerPaymentOptionsDetails"
+FARMER_MAPPING_BASE_URL = os.getenv("FARMER_MAPPING_BASE_URL", f"{FARMER_API_BASE_URL}/getFarmermappingDetail")
+FARMER_PAYMENT_OPTIONS_BASE_URL = os.getenv(
+    "FARMER_PAYMENT_OPTIONS_BASE_URL", f"{PAYMENT_API_BASE_URL}/GetFarmerPaymentOptionsDetails"
+)
 
-# Decryption key and IV (from user's instruction)
-# let key1 = CryptoJS.enc.Utf8.parse('8080808080808080');
-# let iv1 = CryptoJS.enc.Utf8.parse('8080808080808080');
-AES_KEY = b'8080808080808080' # 16 bytes for AES-128
-AES_IV = b'8080808080808080' # 16 bytes for AES-128
+# AES key/IV and decrypt_account_no live in services.crypto (re-exported here)
+from services.crypto import AES_KEY, AES_IV, decrypt_account_no
 
-def decrypt_account_no(encrypted_account_no):
-    """Decrypts an AES-encrypted account number using the provided key and IV."""
-    try:
-        # The input is Base64 encoded, so decode it first
-        encrypted_bytes = base64.b64decode(encrypted_account_no)
+# Browser-like headers to prevent blocking
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Connection': 'keep-alive',
+    'Origin': 'https://apifarmerlandmapping.emandikaran-pb.in',
+    'Referer': 'https://apifarmerlandmapping.emandikaran-pb.in/',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-origin'
+}
 
-        # Create an AES cipher object
-        cipher = Cipher(algorithms.AES(AES_KEY), modes.CBC(AES_IV), backend=default_backend())
-        decryptor = cipher.decryptor()
+# Upper bound on concurrent fetch threads; the per-host adaptive limiter decides how many are actually in flight
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "8"))
 
-        # Decrypt the data
-        decrypted_padded_bytes = decryptor.update(encrypted_bytes) + decryptor.finalize()
+# Shard processes for full runs (1 = everything in this process)
+INGEST_PROCESSES = int(os.getenv("INGEST_PROCESSES", "1"))
 
-        # Unpad the decrypted data (PKCS7 padding)
-        unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
-        decrypted_bytes = unpadder.update(decrypted_padded_bytes) + unpadder.finalize()
+# Rows per executemany batch on the bulk write path
+BULK_CHUNK_SIZE = 5000
 
-        return decrypted_bytes.decode('utf-8')
-    except Exception as e:
-        print(f"Error decrypting account number: {e}")
+def fetch_data_from_api(api_url):
+    """Fetch data from the API with proper headers, adaptive rate limiting, retries and circuit breaking."""
+    try:
+        return get_json(api_url, headers=REQUEST_HEADERS, timeout=120)  # 2 minutes timeout
+    except CircuitOpenError as e:
+        print(f"❌ {e}, giving up on {api_url}")
         return None
 
-def fetch_data_from_api(api_url):
-    """Fetch data from the API with proper headers, retries, and error handling."""
-    max_retries = 3
-    base_delay = 1  # Initial delay in seconds
-    
-    # Browser-like headers to prevent blocking
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'application/json',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Connection': 'keep-alive',
-        'Origin': 'https://apifarmerlandmapping.emandikaran-pb.in',
-        'Referer': 'https://apifarmerlandmapping.emandikaran-pb.in/',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Site': 'same-origin'
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(
-                api_url,
-                headers=headers,
-                timeout=120,  # 2 minutes timeout
-                verify=True,
-                allow_redirects=True
-            )
-            response.raise_for_status()
-            return response.json()
-            
-        except (requests.exceptions.RequestException, 
-                requests.exceptions.Timeout,
-                requests.exceptions.SSLError,
-                requests.exceptions.ConnectionError) as e:
-            
-            if attempt == max_retries - 1:  # Last attempt
-                print(f"❌ Failed after {max_retries} attempts for {api_url}")
-                print(f"   Error: {str(e)}")
-                return None
-                
-            # Exponential backoff with jitter
-            delay = base_delay * (2 ** attempt) + (random.uniform(0, 1))
-            print(f"⚠️ Attempt {attempt + 1} failed for {api_url}")
-            print(f"   Retrying in {delay:.1f} seconds...")
-            time.sleep(delay)
-            
-    return None
+def farmer_row(farmer_data, source_name):
+    """Map an upstream farmer payload to Farmer column values."""
+    return dict(
+        farmer_id=farmer_data.get('FarmerId'),
+        farmer_name=farmer_data.get('FarmerName', ''),
+        father_name=farmer_data.get('FatherName', ''),
+        grandfather_name=farmer_data.get('GrandFatherName', ''),
+        district_name=farmer_data.get('DistrictName', ''),
+        city_name=farmer_data.get('CityName', ''),
+        village_name=farmer_data.get('VillageName', ''),
+        owner_area=parse_area_kms(farmer_data.get('Owner_Area')),
+        final_owner_area=parse_area_kms(farmer_data.get('finalOwner_Area')),
+        update_owner_area=parse_area_kms(farmer_data.get('updateOwner_Area')),
+        aadhar_number=farmer_data.get('AadharNumber'),
+        mobile_number=farmer_data.get('MobileNumber'),
+        owner_type=farmer_data.get('ownertype', 0),
+        verify_status=int(str(farmer_data.get('verifystatus', 'false')).lower() in ('true', '1')),
+        auction=farmer_data.get('auction', 0),
+        source_api=source_name
+    )
+
+def land_row(record_data, farmer_id):
+    """Map an upstream land mapping payload to LandRecord column values."""
+    row = dict(
+        id=record_data.get('Id'),
+        farmer_id=farmer_id,
+        sr_no=record_data.get('Srno'),
+        owner_id=record_data.get('OwnerId'),
+        owner_name=record_data.get('OwnerName', ''),
+        revenue_village_id=record_data.get('Revenue_VillageId'),
+        village_name=record_data.get('VillageName', ''),
+        city_name=record_data.get('CityName', ''),
+        district_name=record_data.get('DistrictName', ''),
+        area_type=record_data.get('AreaType', ''),
+        owner_area=record_data.get('Owner_Area', ''),
+        land_owner_area_k=record_data.get('LandOwner_Area_K'),
+        land_owner_area_m=record_data.get('LandOwner_Area_M'),
+        land_owner_area_sarsai=record_data.get('LandOwner_Area_Sarsai'),
+        owner_type=record_data.get('ownertype'),
+        khewat_no=record_data.get('Khewat_No', ''),
+        khasra_no=record_data.get('Khasra_No', ''),
+        period=record_data.get('period', ''),
+        type=record_data.get('Type'),
+        kanal=record_data.get('Kanal'),
+        marle=record_data.get('Marle'),
+        sarsai=record_data.get('Sarsai'),
+        mapped_area=record_data.get('Mappedarea'),
+        license_id=record_data.get('LicenseId'),
+        verify_status=record_data.get('VerifyStatus'),
+        kanal1=record_data.get('Kanal1'),
+        marle1=record_data.get('Marle1'),
+        sarsai1=record_data.get('Sarsai1'),
+        commodity_id=record_data.get('CommodityId'),
+        min_land=record_data.get('minland'),
+        auction=record_data.get('auction', 0)
+    )
+    # Hashed as received, so hashes stay comparable with databases of the text layout
+    row['content_hash'] = land_content_hash(row)
+    row['owner_area'] = parse_area_kms(row['owner_area'])
+    return row
+
+def land_content_hash(row):
+    """Short hash of a land row's upstream fields, compared across runs to detect changed records."""
+    values = [value for name, value in row.items() if name not in ('id', 'content_hash')]
+    encoded = json.dumps(values, default=str, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+def bank_row(bank_data, farmer_id):
+    """Map an upstream payment options payload to FarmerBankDetail column values."""
+    return dict(
+        farmer_id=farmer_id,
+        bank_id=bank_data.get('BankId'),
+        account_holder_name=bank_data.get('AccountHolderName', ''),
+        account_no_encrypted=bank_data.get('AccountNo', ''),
+        ifsc_code=bank_data.get('IFSCCode', ''),
+        branch_name=bank_data.get('BranchName', '')
+    )
 
 def save_farmer_data(farmer_data, source_name):
     """Save farmer data to the database."""
-    session = Session()
     try:
         # Create new record (database is recreated on each run, so no need to check for existing)
-        farmer = Farmer(
-            farmer_id=farmer_data.get('FarmerId'),
-            farmer_name=farmer_data.get('FarmerName', ''),
-            father_name=farmer_data.get('FatherName', ''),
-            grandfather_name=farmer_data.get('GrandFatherName', ''),
-            district_name=farmer_data.get('DistrictName', ''),
-            city_name=farmer_data.get('CityName', ''),
-            village_name=farmer_data.get('VillageName', ''),
-            owner_area=farmer_data.get('Owner_Area'),
-            final_owner_area=farmer_data.get('finalOwner_Area'),
-            update_owner_area=farmer_data.get('updateOwner_Area'),
-            aadhar_number=farmer_data.get('AadharNumber'),
-            mobile_number=farmer_data.get('MobileNumber'),
-            owner_type=farmer_data.get('ownertype', 0),
-            verify_status=str(farmer_data.get('verifystatus', 'false')).lower(),
-            auction=farmer_data.get('auction', 0),
-            source_api=source_name
-        )
-        session.add(farmer)
+        with engine.begin() as conn:
+            bulk_insert(conn, Farmer.__table__, [farmer_row(farmer_data, source_name)])
         print(f"Added new farmer: {farmer_data.get('FarmerName')} (ID: {farmer_data.get('FarmerId')})")
-        
-        session.commit()
     except Exception as e:
-        session.rollback()
         print(f"Error saving farmer data: {str(e)}")
-    finally:
-        session.close()
 
 def save_land_records_bulk(records_data, farmer_id):
     """Save a list of land record data to the database in bulk."""
-    session = Session()
     try:
-        for record_data in records_data:
-            # Create new record (database is recreated on each run, so no need to check for existing)
-            record = LandRecord(
-                id=record_data.get('Id'),
-                farmer_id=farmer_id,
-                sr_no=record_data.get('Srno'),
-                owner_id=record_data.get('OwnerId'),
-                owner_name=record_data.get('OwnerName', ''),
-                revenue_village_id=record_data.get('Revenue_VillageId'),
-                village_name=record_data.get('VillageName', ''),
-                city_name=record_data.get('CityName', ''),
-                district_name=record_data.get('DistrictName', ''),
-                area_type=record_data.get('AreaType', ''),
-                owner_area=record_data.get('Owner_Area', ''),
-                land_owner_area_k=record_data.get('LandOwner_Area_K'),
-                land_owner_area_m=record_data.get('LandOwner_Area_M'),
-                land_owner_area_sarsai=record_data.get('LandOwner_Area_Sarsai'),
-                owner_type=record_data.get('ownertype'),
-                khewat_no=record_data.get('Khewat_No', ''),
-                khasra_no=record_data.get('Khasra_No', ''),
-                period=record_data.get('period', ''),
-                type=record_data.get('Type'),
-                kanal=record_data.get('Kanal'),
-                marle=record_data.get('Marle'),
-                sarsai=record_data.get('Sarsai'),
-                mapped_area=record_data.get('Mappedarea'),
-                license_id=record_data.get('LicenseId'),
-                verify_status=record_data.get('VerifyStatus'),
-                kanal1=record_data.get('Kanal1'),
-                marle1=record_data.get('Marle1'),
-                sarsai1=record_data.get('Sarsai1'),
-                commodity_id=record_data.get('CommodityId'),
-                min_land=record_data.get('minland'),
-                auction=record_data.get('auction', 0)
-            )
-            session.add(record)
-        
-        session.commit()
+        # Create new records (database is recreated on each run, so no need to check for existing)
+        with engine.begin() as conn:
+            bulk_insert(conn, LandRecord.__table__, (land_row(record_data, farmer_id) for record_data in records_data))
         print(f"Saved {len(records_data)} land records for farmer ID: {farmer_id}")
     except Exception as e:
-        session.rollback()
         print(f"Error saving land records for farmer ID {farmer_id}: {str(e)}")
-    finally:
-        session.close()
+
+def bulk_insert(conn, table, rows, on_conflict=None, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Insert an iterable of row dicts with executemany in chunks on an open connection.
+    on_conflict may be 'IGNORE' or 'REPLACE' (SQLite INSERT OR ...). Returns rows written.
+    District, city and village names of farmers and land records are stored as places ids.
+    """
+    statement = insert(table)
+    if on_conflict:
+        statement = statement.prefix_with(f"OR {on_conflict}")
+    if any(column in table.columns for column in PLACE_COLUMNS):
+        rows = map(PlaceIds(conn).encode, rows)
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            total += conn.execute(statement, chunk).rowcount
+            chunk = []
+    if chunk:
+        total += conn.execute(statement, chunk).rowcount
+    return total
 
 def fetch_farmer_bank_details(farmer_id):
     """Fetch bank details for a specific farmer."""
@@ -247,23 +255,12 @@ def save_farmer_bank_details(bank_data, farmer_id):
 
         if existing_bank_detail:
             # Update existing record
-            existing_bank_detail.bank_id = bank_data.get('BankId')
-            existing_bank_detail.account_holder_name = bank_data.get('AccountHolderName', '')
-            existing_bank_detail.account_no_encrypted = bank_data.get('AccountNo', '')
-            existing_bank_detail.ifsc_code = bank_data.get('IFSCCode', '')
-            existing_bank_detail.branch_name = bank_data.get('BranchName', '')
+            for key, value in bank_row(bank_data, farmer_id).items():
+                setattr(existing_bank_detail, key, value)
             print(f"Updated bank details for farmer ID: {farmer_id}")
         else:
             # Create new record
-            bank_detail = FarmerBankDetail(
-                farmer_id=farmer_id,
-                bank_id=bank_data.get('BankId'),
-                account_holder_name=bank_data.get('AccountHolderName', ''),
-                account_no_encrypted=bank_data.get('AccountNo', ''),
-                ifsc_code=bank_data.get('IFSCCode', ''),
-                branch_name=bank_data.get('BranchName', '')
-            )
-            session.add(bank_detail)
+            session.add(FarmerBankDetail(**bank_row(bank_data, farmer_id)))
             print(f"Added bank details for farmer ID: {farmer_id}")
         
         session.commit()
@@ -277,161 +274,699 @@ def fetch_farmer_mapping_details(farmer_id):
     """Fetch land mapping details for a specific farmer."""
     url = f"{FARMER_MAPPING_BASE_URL}/{farmer_id}"
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data and data.get('success') and 'responseData' in data:
-            return data['responseData']
-        return None
-    except requests.exceptions.RequestException as e:
+        data = get_json(url, timeout=30)
+    except CircuitOpenError as e:
         print(f"Error fetching mapping details for farmer {farmer_id}: {str(e)}")
         return None
 
-def process_farmer_mapping_details():
-    """Process land mapping details for all farmers in the database."""
+    if data and data.get('success') and 'responseData' in data:
+        return data['responseData']
+    return None
+
+def fetch_concurrently(keys, fetch_func, workers=None):
+    """
+    Run fetch_func over keys on a thread pool and yield (key, result, error) as fetches complete.
+    Database writes stay on the calling thread since SQLite has a single writer.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers or INGEST_WORKERS)
+    try:
+        futures = {executor.submit(fetch_func, key): key for key in keys}
+        for future in as_completed(futures):
+            key = futures.pop(future)
+            try:
+                yield key, future.result(), None
+            except Exception as e:
+                yield key, None, e
+    finally:
+        # If the run is cancelled, drop the queued fetches instead of draining them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def process_farmer_mapping_details(workers=None, archive=None, only=None, progress=None):
+    """
+    Process land mapping details for all farmers in the database (or only the farmer IDs in `only`).
+    progress, if given, is called as progress(phase, done, total, errors) after every farmer.
+    """
     session = Session()
     try:
         # Get all unique farmer IDs with their source API
         farmers = session.query(Farmer.farmer_id, Farmer.source_api).distinct().all()
+        if only is not None:
+            farmers = [farmer for farmer in farmers if farmer.farmer_id in only]
         total_farmers = len(farmers)
+        errors = 0
         
         if total_farmers == 0:
             print("No farmers found in the database.")
+            if progress:
+                progress('land_mapping', 0, 0, 0)
             return
             
         print(f"\nFound {total_farmers} farmers to process for land mapping details")
         
         # Initialize progress bar for farmers
         with tqdm(total=total_farmers, desc="Processing land records") as pbar:
-            for farmer_id, source_api in farmers:
+            pairs = [tuple(farmer) for farmer in farmers]
+            fetch = lambda pair: fetch_farmer_mapping_details(pair[0])
+            for (farmer_id, source_api), mapping_data, error in fetch_concurrently(pairs, fetch, workers):
                 # Update progress bar description with current farmer ID and source
                 pbar.set_description(f"Processing {source_api} - ID: {farmer_id}")
-                
                 try:
-                    # Fetch mapping details for this farmer
-                    mapping_data = fetch_farmer_mapping_details(farmer_id)
-                    
+                    if error:
+                        raise error
+                    if archive and mapping_data is not None:
+                        archive.write('mapping', source_api, farmer_id, mapping_data)
                     if mapping_data:
                         # Save all land records for the current farmer in bulk
                         save_land_records_bulk(mapping_data, farmer_id)
                     
                 except Exception as e:
+                    errors += 1
                     print(f"\nError processing farmer {farmer_id}: {str(e)}")
                     # Continue with next farmer even if one fails
                 
                 # Update progress bar
                 pbar.update(1)
+                if progress:
+                    progress('land_mapping', pbar.n, total_farmers, errors)
                 
     except Exception as e:
         print(f"Error processing farmer mapping details: {str(e)}")
     finally:
         session.close()
 
-def process_all_farmer_bank_details():
-    """Process bank details for all farmers in the database."""
+def process_all_farmer_bank_details(workers=None, archive=None, only=None, progress=None):
+    """Process bank details for all farmers in the database (or only the farmer IDs in `only`)."""
     session = Session()
     try:
-        farmers = session.query(Farmer.farmer_id).distinct().all()
+        # One row per farmer ID; the source is only used to file the archived payload
+        farmers = session.query(Farmer.farmer_id, func.min(Farmer.source_api)).group_by(Farmer.farmer_id).all()
+        if only is not None:
+            farmers = [farmer for farmer in farmers if farmer[0] in only]
         total_farmers = len(farmers)
+        errors = 0
 
         if total_farmers == 0:
             print("No farmers found in the database to fetch bank details for.")
+            if progress:
+                progress('bank_details', 0, 0, 0)
             return
 
         print(f"\nFound {total_farmers} farmers to process for bank details")
 
         with tqdm(total=total_farmers, desc="Processing bank details") as pbar:
-            for (farmer_id,) in farmers: # Unpack the tuple
+            pairs = [tuple(farmer) for farmer in farmers]
+            fetch = lambda pair: fetch_farmer_bank_details(pair[0])
+            for (farmer_id, source_api), bank_data, error in fetch_concurrently(pairs, fetch, workers):
                 pbar.set_description(f"Processing bank details for Farmer ID: {farmer_id}")
                 try:
-                    bank_data = fetch_farmer_bank_details(farmer_id)
+                    if error:
+                        raise error
                     if bank_data:
+                        if archive:
+                            archive.write('bank', source_api, farmer_id, bank_data)
                         save_farmer_bank_details(bank_data, farmer_id)
                 except Exception as e:
+                    errors += 1
                     print(f"\nError processing bank details for farmer {farmer_id}: {str(e)}")
                 pbar.update(1)
+                if progress:
+                    progress('bank_details', pbar.n, total_farmers, errors)
     except Exception as e:
         print(f"Error in process_all_farmer_bank_details: {str(e)}")
     finally:
         session.close()
 
-def fetch_all_farmers():
+def add_unique_farmers(all_farmers, seen, farmers, source_name):
+    """Tag farmers with their source and append those not already seen as (FarmerId, source)."""
+    for farmer in farmers:
+        farmer['source_api'] = source_name
+        farmer_id = (farmer.get('FarmerId'), source_name)
+        if farmer_id not in seen:
+            seen.add(farmer_id)
+            all_farmers.append(farmer)
+
+def fetch_all_farmers(archive=None, progress=None):
     """Fetch all farmers from all APIs and return a list of unique farmers."""
     all_farmers = []
     farmer_ids = set()  # To track unique farmers by ID and source
+    errors = 0
     
     print("\n=== Fetching All Farmers ===")
-    for api in tqdm(FARMER_DETAILS_APIS, desc="Fetching from APIs"):
+    for done, api in enumerate(tqdm(FARMER_DETAILS_APIS, desc="Fetching from APIs"), 1):
         print(f"\nFetching data from {api['name']} API...")
         data = fetch_data_from_api(api['url'])
         
         if data and data.get('success') and 'responseData' in data:
             farmers = data['responseData']
             print(f"Found {len(farmers)} farmers in {api['name']} API")
+            if archive:
+                archive.write('farmers', api['name'], api['name'], farmers)
             
             # Add source information and filter duplicates
-            for farmer in farmers:
-                farmer['source_api'] = api['name']
-                farmer_id = (farmer.get('FarmerId'), api['name'])
-                if farmer_id not in farmer_ids:
-                    farmer_ids.add(farmer_id)
-                    all_farmers.append(farmer)
+            add_unique_farmers(all_farmers, farmer_ids, farmers, api['name'])
+        else:
+            errors += 1
+        if progress:
+            progress('fetch_farmers', done, len(FARMER_DETAILS_APIS), errors)
     
     print(f"\nTotal unique farmers found: {len(all_farmers)}")
     return all_farmers
 
-def save_farmers_to_db(farmers):
+def rebuild_from_archive(run_dir):
+    """
+    Load an archived run into the (fresh) database using bulk inserts, without any network access.
+    Returns a dict of row counts.
+    """
+    print(f"\n=== Rebuilding from archive {run_dir} ===")
+    source_order = {api['name']: index for index, api in enumerate(FARMER_DETAILS_APIS)}
+    counts = {}
+
+    # Farmers: same (FarmerId, source) de-duplication and API order as a live run
+    farmer_lists = {}
+    for source, _, farmers in iter_phase(run_dir, 'farmers'):
+        farmer_lists.setdefault(source, []).extend(farmers)
+    all_farmers = []
+    seen = set()
+    for source in sorted(farmer_lists, key=lambda name: source_order.get(name, len(source_order))):
+        add_unique_farmers(all_farmers, seen, farmer_lists[source], source)
+
+    with engine.begin() as conn:
+        counts['farmers'] = bulk_insert(
+            conn, Farmer.__table__, (farmer_row(farmer, farmer['source_api']) for farmer in all_farmers))
+        print(f"Loaded {counts['farmers']} farmers")
+
+        # A farmer listed under two sources has the same land records twice; keep the first copy
+        land_rows = (land_row(record, farmer_id)
+                     for _, farmer_id, records in iter_phase(run_dir, 'mapping')
+                     for record in (records or []))
+        counts['land_records'] = bulk_insert(conn, LandRecord.__table__, land_rows, on_conflict='IGNORE')
+        print(f"Loaded {counts['land_records']} land records")
+
+        bank_rows = (bank_row(bank_data, farmer_id)
+                     for _, farmer_id, bank_data in iter_phase(run_dir, 'bank') if bank_data)
+        counts['farmer_bank_details'] = bulk_insert(
+            conn, FarmerBankDetail.__table__, bank_rows, on_conflict='REPLACE')
+        print(f"Loaded {counts['farmer_bank_details']} bank details")
+    return counts
+
+def save_farmers_to_db(farmers, progress=None):
     """Save list of farmers to database with progress tracking."""
     print("\n=== Saving Farmers to Database ===")
     with tqdm(total=len(farmers), desc="Saving farmers") as pbar:
         for farmer in farmers:
             save_farmer_data(farmer, farmer['source_api'])
             pbar.update(1)
+            if progress:
+                progress('save_farmers', pbar.n, len(farmers), 0)
+
+# Farmer columns compared by an incremental sync to decide whether a farmer changed upstream (places as ids)
+FARMER_SYNC_FIELDS = tuple(column.name for column in Farmer.__table__.columns
+                           if column.name not in ('id', 'farmer_id', 'source_api', 'created_at', 'updated_at'))
+
+def _sync_value(value):
+    # Upstream numbers may arrive as strings or ints (and areas come back as floats); compare as strings
+    return None if value is None else str(value)
+
+def delete_in_chunks(conn, table, column, values, chunk_size=500):
+    values = list(values)
+    for i in range(0, len(values), chunk_size):
+        chunk = values[i:i + chunk_size]
+        params = {f"v{n}": value for n, value in enumerate(chunk)}
+        placeholders = ", ".join(f":{name}" for name in params)
+        conn.execute(text(f"DELETE FROM {table} WHERE {column} IN ({placeholders})"), params)
+
+def sync_farmers(all_farmers, progress=None):
+    """
+    Apply freshly fetched farmer lists to the staging database, which starts as a copy of the live one.
+
+    New farmers are inserted and changed ones updated; farmers a source no longer lists are removed
+    (sources that returned nothing are left alone, since that is usually an upstream failure).
+    Land records of new and changed farmers are deleted so they are re-fetched; fetches that failed in an
+    earlier run are only retried by a full run.
+    Returns the set of upstream farmer IDs whose land records and bank details need fetching.
+    """
+    print("\n=== Syncing Farmers ===")
+    refresh = set()
+    counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    with engine.begin() as conn:
+        places = PlaceIds(conn)
+        fetched = {}
+        for farmer in all_farmers:
+            row = places.encode(farmer_row(farmer, farmer['source_api']))
+            fetched[(row['farmer_id'], row['source_api'])] = row
+        fetched_sources = {source for _, source in fetched}
+
+        existing = {}
+        columns = ", ".join(FARMER_SYNC_FIELDS)
+        for row in conn.execute(text(f"SELECT id, farmer_id, source_api, {columns} FROM farmers")):
+            existing[(row.farmer_id, row.source_api)] = row
+
+        new_rows, changed_rows = [], []
+        for key, row in fetched.items():
+            current = existing.get(key)
+            if current is None:
+                new_rows.append(row)
+            elif any(_sync_value(row[name]) != _sync_value(getattr(current, name)) for name in FARMER_SYNC_FIELDS):
+                changed_rows.append(dict(row, id=current.id))
+            else:
+                counts['unchanged'] += 1
+                continue
+            refresh.add(key[0])
+        bulk_insert(conn, Farmer.__table__, new_rows)
+        if changed_rows:
+            assignments = ", ".join(f"{name} = :{name}" for name in FARMER_SYNC_FIELDS)
+            conn.execute(text(f"UPDATE farmers SET {assignments} WHERE id = :id"), changed_rows)
+
+        removed = [row for key, row in existing.items() if key not in fetched and key[1] in fetched_sources]
+        delete_in_chunks(conn, 'farmers', 'id', [row.id for row in removed])
+        still_listed = {farmer_id for farmer_id, _ in fetched} | {
+            farmer_id for (farmer_id, source) in existing if source not in fetched_sources}
+        gone = {row.farmer_id for row in removed} - still_listed
+        delete_in_chunks(conn, 'land_records', 'farmer_id', gone)
+        delete_in_chunks(conn, 'farmer_bank_details', 'farmer_id', gone)
+        delete_in_chunks(conn, 'land_records', 'farmer_id', refresh)
+
+    counts.update(added=len(new_rows), updated=len(changed_rows), removed=len(removed))
+    print(f"Farmers: {counts}; {len(refresh)} farmer IDs to refresh")
+    if progress:
+        progress('save_farmers', len(fetched), len(fetched), 0)
+    return refresh
+
+# Multi-process ingestion: each shard process fetches land records and bank details for its share of
+# the farmers into its own database (selected through FARMER_DB_PATH), and the shards are then merged
+# into the staging database. JSON parsing and row construction then run on every core.
+SHARD_MODES = ('source', 'id')
+
+def plan_shards(all_farmers, processes, shard_by='source'):
+    """
+    Split the fetched farmers into at most `processes` shards.
+
+    shard_by='source' keeps whole license sources together (largest first onto the least loaded shard);
+    shard_by='id' splits the sorted farmer IDs into contiguous ranges. Each farmer ID's land records and
+    bank details are fetched by exactly one shard, the first one (in API order) that lists it.
+    Returns a list of {'farmers': [payload, ...], 'owned': {farmer_id, ...}}.
+    """
+    if shard_by == 'source':
+        by_source = {}
+        for farmer in all_farmers:
+            by_source.setdefault(farmer['source_api'], []).append(farmer)
+        count = max(1, min(processes, len(by_source)))
+        loads = [0] * count
+        shard_of_source = {}
+        for source, farmers in sorted(by_source.items(), key=lambda item: -len(item[1])):
+            index = loads.index(min(loads))
+            shard_of_source[source] = index
+            loads[index] += len(farmers)
+        shard_of = lambda farmer: shard_of_source[farmer['source_api']]
+    elif shard_by == 'id':
+        ids = sorted({farmer.get('FarmerId') for farmer in all_farmers}, key=lambda value: (value is None, value))
+        count = max(1, min(processes, len(ids)))
+        size = -(-len(ids) // count) if ids else 1
+        shard_of_id = {farmer_id: position // size for position, farmer_id in enumerate(ids)}
+        shard_of = lambda farmer: shard_of_id[farmer.get('FarmerId')]
+    else:
+        raise ValueError(f"Unknown shard mode {shard_by!r}; expected one of: {', '.join(SHARD_MODES)}")
+
+    shards = [{'farmers': [], 'owned': set()} for _ in range(count)]
+    owners = {}
+    for farmer in all_farmers:
+        index = shard_of(farmer)
+        shards[index]['farmers'].append(farmer)
+        owners.setdefault(farmer.get('FarmerId'), index)
+    for farmer_id, index in owners.items():
+        shards[index]['owned'].add(farmer_id)
+    return [shard for shard in shards if shard['farmers']]
+
+def ingest_shard(index, farmers, owned, workers, archive_dir, progress_queue):
+    """Shard process entry point: save its farmers, then fetch land records and bank details for the owned IDs."""
+    report = None
+    if progress_queue is not None:
+        report = lambda phase, done, total, errors: progress_queue.put((index, phase, done, total, errors))
+    archive = PayloadArchive(Path(archive_dir).parent, run_id=Path(archive_dir).name) if archive_dir else None
+    complete = False
+    try:
+        rebuild_database()
+        with engine.begin() as conn:
+            bulk_insert(conn, Farmer.__table__, (farmer_row(farmer, farmer['source_api']) for farmer in farmers))
+        if report:
+            report('save_farmers', len(farmers), len(farmers), 0)
+        process_farmer_mapping_details(workers=workers, archive=archive, only=owned, progress=report)
+        process_all_farmer_bank_details(workers=workers, archive=archive, only=owned, progress=report)
+        complete = True
+    finally:
+        engine.dispose()
+        if archive:
+            archive.close(complete=complete)
+
+def run_shards(all_farmers, processes, shard_by='source', workers=None, archive=None, progress=None):
+    """
+    Fetch land records and bank details in `processes` shard processes.
+    Returns the shard database paths in shard order. Raises RuntimeError if a shard process fails.
+    """
+    shards = plan_shards(all_farmers, processes, shard_by)
+    shard_dir = BUILD_DB_PATH.parent / f"{DB_PATH.stem}_shards"
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    print(f"\n=== Ingesting {len(shards)} shards by {shard_by} ===")
+    for index, shard in enumerate(shards):
+        sources = sorted({farmer['source_api'] for farmer in shard['farmers']})
+        print(f"Shard {index}: {len(shard['farmers'])} farmers, {len(shard['owned'])} to fetch ({', '.join(sources)})")
+
+    # spawn, not fork: the parent holds open connections and fetch threads
+    context = multiprocessing.get_context('spawn')
+    progress_queue = context.Queue() if progress else None
+    processes_started = []
+    paths = []
+    previous_db_path = os.environ.get("FARMER_DB_PATH")
+    try:
+        for index, shard in enumerate(shards):
+            shard_path = shard_dir / f"shard_{index}.db"
+            paths.append(shard_path.with_name(shard_path.name + ".building"))
+            archive_dir = str(archive.run_dir / f"shard_{index}") if archive else None
+            # The child builds its engine from FARMER_DB_PATH when it imports this module
+            os.environ["FARMER_DB_PATH"] = str(shard_path)
+            process = context.Process(target=ingest_shard, name=f"ingest-shard-{index}",
+                                      args=(index, shard['farmers'], shard['owned'], workers, archive_dir,
+                                            progress_queue))
+            process.start()
+            processes_started.append(process)
+    finally:
+        if previous_db_path is None:
+            os.environ.pop("FARMER_DB_PATH", None)
+        else:
+            os.environ["FARMER_DB_PATH"] = previous_db_path
 
-def main():
-    print("Starting data fetch process...")
-    
-    # Create backup before starting
-    backup_database()
-    
-    # Dispose of the engine to close all connections before deleting the database
+    try:
+        state = {}
+        while any(process.is_alive() for process in processes_started) or (
+                progress_queue is not None and not progress_queue.empty()):
+            if progress_queue is None:
+                time.sleep(0.5)
+                continue
+            try:
+                index, phase, done, total, errors = progress_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            state[(index, phase)] = (done, total, errors)
+            totals = [value for (_, name), value in state.items() if name == phase]
+            progress(phase, sum(v[0] for v in totals), sum(v[1] for v in totals), sum(v[2] for v in totals))
+        for process in processes_started:
+            process.join()
+    finally:
+        for process in processes_started:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+    failed = [process.name for process in processes_started if process.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Shard processes failed: {', '.join(failed)}")
+    return paths
+
+# A shard's places ids mapped to the staging database's (filled from the shard's places first)
+SHARD_PLACE_ID = "(SELECT m.id FROM main.places m JOIN shard.places s ON s.name = m.name WHERE s.id = {column})"
+
+def merge_shards(shard_paths):
+    """Copy every shard database into the (empty) staging database with ATTACH + INSERT OR IGNORE."""
+    print(f"\n=== Merging {len(shard_paths)} shards ===")
+    engine.dispose()
+    tables = (
+        ('places', ['name']),
+        ('farmers', [column.name for column in Farmer.__table__.columns if column.name != 'id']),
+        ('land_records', [column.name for column in LandRecord.__table__.columns]),
+        ('farmer_bank_details', [column.name for column in FarmerBankDetail.__table__.columns if column.name != 'id']),
+    )
+    start = time.time()
+    conn = sqlite3.connect(BUILD_DB_PATH, isolation_level=None)
+    try:
+        # The staging file is rebuilt from scratch if this run dies, so skip the fsyncs
+        conn.execute("PRAGMA synchronous = OFF")
+        for path in shard_paths:
+            conn.execute("ATTACH DATABASE ? AS shard", (str(path),))
+            conn.execute("BEGIN")
+            for table, columns in tables:
+                column_list = ", ".join(columns)
+                values = ", ".join(SHARD_PLACE_ID.format(column=column) if column in PLACE_COLUMNS else column
+                                   for column in columns)
+                conn.execute(f"INSERT OR IGNORE INTO main.{table} ({column_list}) "
+                             f"SELECT {values} FROM shard.{table} ORDER BY id")
+            conn.execute("COMMIT")
+            conn.execute("DETACH DATABASE shard")
+    finally:
+        conn.close()
+    counts = table_counts()
+    print(f"Merged {counts} in {time.time() - start:.1f}s")
+    for path in shard_paths:
+        os.remove(path)
+    return counts
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fetch farmer, land and bank data from the upstream APIs.")
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS,
+                        help="Maximum concurrent fetch threads (the adaptive limiter may use fewer)")
+    parser.add_argument('--cache', nargs='?', const=str(DATA_DIR / "http_cache"), default=None, metavar='DIR',
+                        help="Cache upstream responses on disk (default dir: data/http_cache; or set HTTP_CACHE_DIR)")
+    parser.add_argument('--cache-ttl', type=float, default=None, metavar='SECONDS',
+                        help="Serve cached responses younger than this without revalidating (default HTTP_CACHE_TTL)")
+    parser.add_argument('--from-archive', metavar='RUN',
+                        help="Rebuild the database from an archived run (run id, directory or 'latest') without fetching")
+    parser.add_argument('--archive-dir', default=str(ARCHIVE_DIR),
+                        help="Directory holding archived runs (default INGEST_ARCHIVE_DIR or data/archive)")
+    parser.add_argument('--no-archive', action='store_true', help="Do not archive raw upstream payloads for this run")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Start from the live database and only re-fetch lands/bank details of new or changed farmers")
+    parser.add_argument('--processes', type=int,
+                        help="Shard processes for a full run (default INGEST_PROCESSES, 1); each uses --workers threads")
+    parser.add_argument('--shard-by', choices=SHARD_MODES, default='source',
+                        help="Split shards by license source or by farmer ID range")
+    return parser.parse_args()
+
+def print_client_stats():
+    for host, stats in client_stats().items():
+        print(f"{host}: {stats}")
+
+def rebuild_database():
+    """Create an empty staging database for this run; the live database is untouched until publish_database()."""
+    # Dispose of the engine to close all connections before deleting the staging file
     engine.dispose()
-    
-    # Delete existing database to start fresh
     delete_database()
-    
+    BUILD_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
     # Create tables on the fresh database
     Base.metadata.create_all(engine)
+
+def copy_live_database():
+    """Start the staging database as a copy of the live one (incremental runs)."""
+    engine.dispose()
+    delete_database()
+    BUILD_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    if DB_PATH.exists():
+        # The backup API gives a consistent copy even while the web app is using the database
+        source = sqlite3.connect(DB_PATH)
+        target = sqlite3.connect(BUILD_DB_PATH)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        print(f"Copied {DB_PATH} to {BUILD_DB_PATH}")
+    Base.metadata.create_all(engine)
+    ensure_schema(engine, compact=True)
+
+def table_counts():
+    with engine.connect() as conn:
+        return {table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                for table in ('farmers', 'land_records', 'farmer_bank_details')}
+
+def index_duplicate_farmers():
+    """Cluster farmers rows that look like the same person into farmer_duplicates (see services.duplicate_service)."""
+    print("\n=== Indexing Duplicate Farmers ===")
+    with engine.begin() as conn:
+        return build_duplicate_index(conn)
+
+def record_land_changes():
+    """
+    Append the land records added, updated (content hash differs) or removed since the live database
+    to land_record_changes in the staging database, after carrying over the live database's change log.
+    Changes older than CHANGE_LOG_RETENTION_DAYS are dropped. Returns counts per change type, or None
+    when there is no previous snapshot with content hashes to compare against.
+    """
+    print("\n=== Recording Land Record Changes ===")
+    engine.dispose()
+    now = datetime.utcnow()
+    conn = sqlite3.connect(BUILD_DB_PATH, isolation_level=None)
+    try:
+        conn.execute("ATTACH DATABASE ? AS prev", (str(DB_PATH) if DB_PATH.exists() else ":memory:",))
+        prev_tables = {row[0] for row in conn.execute("SELECT name FROM prev.sqlite_master WHERE type = 'table'")}
+        prev_columns = set()
+        if 'land_records' in prev_tables:
+            prev_columns = {row[1] for row in conn.execute("PRAGMA prev.table_info(land_records)")}
+        conn.execute("BEGIN")
+        if 'land_record_changes' in prev_tables:
+            # A full run starts from empty tables; an incremental copy already has these rows
+            conn.execute("""
+                INSERT OR IGNORE INTO land_record_changes (id, land_record_id, farmer_id, change, content_hash, changed_at)
+                SELECT id, land_record_id, farmer_id, change, content_hash, changed_at FROM prev.land_record_changes
+            """)
+            # And the highest id handed out, or a full run's new table would reuse ids when retention emptied the log
+            last_id = conn.execute("SELECT MAX(id) FROM prev.land_record_changes").fetchone()[0] or 0
+            if 'sqlite_sequence' in prev_tables:
+                last_id = max(last_id, conn.execute("SELECT COALESCE(MAX(seq), 0) FROM prev.sqlite_sequence "
+                                                    "WHERE name = 'land_record_changes'").fetchone()[0])
+            if not conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'land_record_changes'",
+                                (last_id,)).rowcount:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('land_record_changes', ?)", (last_id,))
+        counts = None
+        # Without hashes in the previous database every record would look updated; start the feed from here
+        comparable = 'content_hash' in prev_columns and (
+            conn.execute("SELECT 1 FROM prev.land_records WHERE content_hash IS NOT NULL LIMIT 1").fetchone()
+            or not conn.execute("SELECT 1 FROM prev.land_records LIMIT 1").fetchone())
+        if comparable:
+            changed_at = now.strftime('%Y-%m-%d %H:%M:%S.%f')
+            counts = {}
+            for change, query in (
+                ('added', """SELECT n.id, n.farmer_id, n.content_hash FROM main.land_records n
+                             WHERE NOT EXISTS (SELECT 1 FROM prev.land_records o WHERE o.id = n.id)"""),
+                ('updated', """SELECT n.id, n.farmer_id, n.content_hash FROM main.land_records n
+                               JOIN prev.land_records o ON o.id = n.id
+                               WHERE n.content_hash IS NOT o.content_hash"""),
+                ('removed', """SELECT o.id, o.farmer_id, NULL AS content_hash FROM prev.land_records o
+                               WHERE NOT EXISTS (SELECT 1 FROM main.land_records n WHERE n.id = o.id)"""),
+            ):
+                counts[change] = conn.execute(f"""
+                    INSERT INTO land_record_changes (land_record_id, farmer_id, change, content_hash, changed_at)
+                    SELECT id, farmer_id, ?, content_hash, ? FROM ({query}) ORDER BY id
+                """, (change, changed_at)).rowcount
+        if CHANGE_LOG_RETENTION_DAYS > 0:
+            cutoff = (now - timedelta(days=CHANGE_LOG_RETENTION_DAYS)).strftime('%Y-%m-%d %H:%M:%S.%f')
+            conn.execute("DELETE FROM land_record_changes WHERE changed_at < ?", (cutoff,))
+        conn.execute("COMMIT")
+        conn.execute("DETACH DATABASE prev")
+    finally:
+        conn.close()
+    if counts is None:
+        print("No previous land records with content hashes; this run is the baseline for the change feed")
+    else:
+        print(f"Land record changes: {counts}")
+    return counts
+
+def publish_database():
+    """Back up the live database, then atomically replace it with the staging database."""
+    engine.dispose()
+    backup_database()
+    try:
+        os.replace(BUILD_DB_PATH, DB_PATH)
+    except OSError as e:
+        # Windows refuses to replace a file another process (the web app) has open
+        print(f"Could not replace {DB_PATH}: {e}. The new database is at {BUILD_DB_PATH}.")
+        raise
+    print(f"Published new database to {DB_PATH}")
+
+def run_ingest(incremental=False, workers=None, archive_dir=ARCHIVE_DIR, progress=None, processes=1, shard_by='source'):
+    """
+    Fetch everything from upstream into the staging database and publish it.
+
+    A full run starts from empty tables; an incremental run starts from a copy of the live database
+    and only re-fetches land records and bank details of new or changed farmers (see sync_farmers).
+    progress is passed to every phase as progress(phase, done, total, errors).
+    Pass archive_dir=None to skip archiving raw payloads. With processes > 1 (full runs only) land records
+    and bank details are fetched by that many shard processes (see plan_shards) and merged afterwards.
+    Returns {'complete': bool, 'counts': {table: rows} or None, 'refreshed': farmer IDs re-fetched or None,
+             'changes': land record change counts (see record_land_changes) or None,
+             'duplicates': duplicate cluster counts (see index_duplicate_farmers) or None}.
+    """
+    if incremental and processes > 1:
+        raise ValueError("Incremental runs use a single process")
+    print(f"Starting {'incremental' if incremental else 'full'} data fetch process...")
+    if incremental:
+        copy_live_database()
+    else:
+        rebuild_database()
     
+    archive = PayloadArchive(archive_dir, kind='incremental' if incremental else 'full') if archive_dir else None
+    if archive:
+        print(f"Archiving raw payloads to {archive.run_dir}")
     start_time = time.time()
+    complete = False
+    result = {'complete': False, 'counts': None, 'refreshed': None, 'changes': None, 'duplicates': None}
     
     try:
         # Step 1: Fetch all unique farmers from all APIs
-        all_farmers = fetch_all_farmers()
-        
-        # Step 2: Save all farmers to database
-        save_farmers_to_db(all_farmers)
+        all_farmers = fetch_all_farmers(archive=archive, progress=progress)
         
-        # Step 3: Process land records for all farmers
-        print("\n=== Processing Land Records ===")
-        process_farmer_mapping_details()
+        only = None
+        if processes > 1:
+            # Steps 2-4 in shard processes, then one merge into the staging database
+            shard_paths = run_shards(all_farmers, processes, shard_by, workers=workers, archive=archive,
+                                     progress=progress)
+            merge_shards(shard_paths)
+        else:
+            # Step 2: Save all farmers to database
+            if incremental:
+                only = sync_farmers(all_farmers, progress=progress)
+                result['refreshed'] = len(only)
+            else:
+                save_farmers_to_db(all_farmers, progress=progress)
+            
+            # Step 3: Process land records for all farmers
+            print("\n=== Processing Land Records ===")
+            process_farmer_mapping_details(workers=workers, archive=archive, only=only, progress=progress)
 
-        # Step 4: Process bank details for all farmers
-        print("\n=== Processing Bank Details ===")
-        process_all_farmer_bank_details()
+            # Step 4: Process bank details for all farmers
+            print("\n=== Processing Bank Details ===")
+            process_all_farmer_bank_details(workers=workers, archive=archive, only=only, progress=progress)
         
         # Calculate and display total time taken
         total_time = time.time() - start_time
         hours, rem = divmod(total_time, 3600)
         minutes, seconds = divmod(rem, 60)
         print(f"\nData fetch and save process completed in {int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}")
+        print("\n=== Upstream Requests ===")
+        print_client_stats()
+        result['counts'] = table_counts()
+        result['duplicates'] = index_duplicate_farmers()
+        result['changes'] = record_land_changes()
+        complete = True
+        publish_database()
+        result['complete'] = True
         
     except KeyboardInterrupt:
         print("\nProcess interrupted by user. Exiting gracefully...")
+        print(f"The live database was left unchanged; the partial run is in {BUILD_DB_PATH}")
     except Exception as e:
         print(f"\nAn error occurred: {str(e)}")
         raise
+    finally:
+        if archive:
+            # Only complete runs are picked up by --from-archive latest
+            archive.close(complete=complete)
+    return result
+
+def main():
+    args = parse_args()
+    if args.from_archive:
+        run_dir = resolve_run(args.archive_dir, args.from_archive)
+        rebuild_database()
+        start_time = time.time()
+        counts = rebuild_from_archive(run_dir)
+        index_duplicate_farmers()
+        record_land_changes()
+        publish_database()
+        print(f"\nRebuilt {counts} from {run_dir} in {time.time() - start_time:.1f}s")
+        return
+
+    cache_dir = args.cache or HTTP_CACHE_DIR
+    if cache_dir:
+        ttl = args.cache_ttl if args.cache_ttl is not None else HTTP_CACHE_TTL
+        configure_cache(cache_dir, ttl=ttl)
+        # Shard processes configure their cache from the environment when they import upstream_client
+        os.environ["HTTP_CACHE_DIR"], os.environ["HTTP_CACHE_TTL"] = str(cache_dir), str(ttl)
+        print(f"Using HTTP response cache at {cache_dir} (TTL {ttl:.0f}s)")
+    if args.incremental and (args.processes or 1) > 1:
+        raise SystemExit("--incremental cannot be combined with --processes")
+    processes = args.processes or (1 if args.incremental else INGEST_PROCESSES)
+    run_ingest(incremental=args.incremental, workers=args.workers,
+               archive_dir=None if args.no_archive else args.archive_dir,
+               processes=processes, shard_by=args.shard_by)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,82 @@
+"""
+Gunicorn configuration.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+* The app is loaded once in the master (preload_app) and forked into workers,
+  so each worker starts serving in milliseconds instead of re-importing
+  Flask/SQLAlchemy. Every worker then drops the connections it inherited and
+  opens its own.
+* Workers are gthread workers: SQLite releases the GIL while a query runs, so a
+  few threads per worker overlap database time with JSON encoding.
+* Live dashboards keep an /api/events stream open, each holding one thread of
+  a worker; EVENTS_MAX_STREAMS (set below from the thread count) keeps them from
+  starving other requests.
+* When ingestion publishes a new database (fetch_farmer_data.py renames it over
+  DB_PATH), the master notices the file changed and does a graceful reload
+  (SIGHUP): new workers start on the new file while old ones finish their
+  in-flight requests.
+* With REGISTRY_SNAPSHOT=1 the master also holds the farmer registry snapshot
+  (services/registry_service.py), shared copy-on-write by the workers, and
+  reloads it from the new file before starting the new workers.
+
+Settings can be overridden from the environment (GUNICORN_*, WEB_CONCURRENCY)
+or on the command line.
+"""
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# Each open /api/events stream holds a thread; keep two per worker for everything else.
+# For many live dashboards raise GUNICORN_THREADS (a thread waiting for events costs little).
+os.environ.setdefault("EVENTS_MAX_STREAMS", str(max(threads - 2, 0)))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recycle workers now and then; jitter keeps them from restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = max_requests // 10
+preload_app = True
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None  # empty disables
+
+# Seconds between checks of the database file for a swap (0 disables)
+DB_WATCH_INTERVAL = float(os.getenv("DB_WATCH_INTERVAL", "2"))
+
+
+def post_fork(server, worker):
+    # Connections opened in the master (create_app checks the schema) must not be shared
+    from models.database import engine
+    engine.dispose(close=False)
+    from services.registry_service import leave_reloads_to_master
+    leave_reloads_to_master()
+
+
+def on_reload(server):
+    # The master keeps the preloaded app across reloads; drop its handle on the old file
+    from models.database import engine
+    engine.dispose()
+    from services.registry_service import refresh_snapshot
+    refresh_snapshot()
+
+
+def watch_database(server):
+    from models.database import DB_PATH, db_file_id
+    current = db_file_id()
+    while True:
+        time.sleep(DB_WATCH_INTERVAL)
+        file_id = db_file_id()
+        if file_id is not None and file_id != current:
+            server.log.info("Database %s was replaced; reloading workers", DB_PATH)
+            current = file_id
+            os.kill(server.pid, signal.SIGHUP)
+
+
+def when_ready(server):
+    if DB_WATCH_INTERVAL > 0:
+        threading.Thread(target=watch_database, args=(server,), name="db-watch", daemon=True).start()
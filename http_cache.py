@@ -0,0 +1,190 @@
+"""
+Content-addressed on-disk cache for upstream HTTP responses.
+
+Layout under the cache directory:
+
+    index/<aa>/<sha256(url)>.json    url, blob hash, stored_at, ETag, Last-Modified
+    blobs/<bb>/<sha256(body)>.zz     zlib-compressed response body
+
+Bodies are stored once per distinct content, so the thousands of identical
+"no records" payloads cost a single blob. Entries younger than the TTL are
+served without touching the network; older entries are revalidated with
+If-None-Match / If-Modified-Since when upstream supplied validators. When the
+cache grows past max_bytes the least recently used entries are evicted.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class CacheEntry:
+    def __init__(self, cache, url, meta):
+        self.cache = cache
+        self.url = url
+        self.meta = meta
+
+    @property
+    def fresh(self):
+        ttl = self.cache.ttl
+        return ttl is None or time.time() - self.meta['stored_at'] < ttl
+
+    def validators(self):
+        headers = {}
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+
+    def body(self):
+        with open(self.cache._blob_path(self.meta['blob']), 'rb') as f:
+            return zlib.decompress(f.read())
+
+
+class HttpCache:
+    """URL-keyed, content-addressed response cache with TTL and size-based LRU eviction."""
+
+    def __init__(self, directory, ttl=24 * 3600, max_bytes=2 * 1024 ** 3, compress_level=6):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+        self._size = None
+        self._lock = threading.Lock()
+        (self.directory / 'index').mkdir(parents=True, exist_ok=True)
+        (self.directory / 'blobs').mkdir(parents=True, exist_ok=True)
+
+    def _index_path(self, url):
+        key = _sha256(url.encode('utf-8'))
+        return self.directory / 'index' / key[:2] / f"{key}.json"
+
+    def _blob_path(self, blob):
+        return self.directory / 'blobs' / blob[:2] / f"{blob}.zz"
+
+    def _write_atomic(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def lookup(self, url):
+        """Return the CacheEntry for url, or None."""
+        path = self._index_path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self._count('misses')
+            return None
+        if not self._blob_path(meta['blob']).exists():
+            self._count('misses')
+            return None
+        # Index mtime doubles as the LRU access time
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        entry = CacheEntry(self, url, meta)
+        self._count('hits' if entry.fresh else 'misses')
+        return entry
+
+    def store(self, url, body, headers=None):
+        headers = headers or {}
+        blob = _sha256(body)
+        blob_path = self._blob_path(blob)
+        added = 0
+        if not blob_path.exists():
+            compressed = zlib.compress(body, self.compress_level)
+            self._write_atomic(blob_path, compressed)
+            added += len(compressed)
+        meta = {
+            'url': url,
+            'blob': blob,
+            'stored_at': time.time(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'size': len(body),
+        }
+        encoded = json.dumps(meta).encode('utf-8')
+        self._write_atomic(self._index_path(url), encoded)
+        added += len(encoded)
+        self._count('stored')
+        self._grow(added)
+
+    def refresh(self, entry):
+        """Mark a revalidated (304) entry as fresh again."""
+        entry.meta['stored_at'] = time.time()
+        self._write_atomic(self._index_path(entry.url), json.dumps(entry.meta).encode('utf-8'))
+        self._count('revalidated')
+
+    def _disk_usage(self):
+        return sum(path.stat().st_size for path in self.directory.rglob('*') if path.is_file())
+
+    def _grow(self, added):
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += added
+            over = self.max_bytes and self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self, target_ratio=0.9):
+        """Drop least recently used entries until the cache is under target_ratio * max_bytes."""
+        with self._lock:
+            entries = []
+            refcount = Counter()
+            for path in (self.directory / 'index').rglob('*.json'):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        blob = json.load(f)['blob']
+                    entries.append((path.stat().st_mtime, path, blob))
+                    refcount[blob] += 1
+                except (OSError, ValueError, KeyError):
+                    continue
+            entries.sort(key=lambda entry: entry[0])
+
+            size = self._disk_usage()
+            target = self.max_bytes * target_ratio
+            removed = 0
+            for _, path, blob in entries:
+                if size <= target:
+                    break
+                try:
+                    size -= path.stat().st_size
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+                refcount[blob] -= 1
+                if refcount[blob] == 0:
+                    blob_path = self._blob_path(blob)
+                    try:
+                        size -= blob_path.stat().st_size
+                        blob_path.unlink()
+                    except OSError:
+                        pass
+            self._size = size
+            self.stats['evicted'] += removed
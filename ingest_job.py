@@ -0,0 +1,135 @@
+"""
+Worker process for ingestion jobs started from the web app:
+
+    python ingest_job.py <job_id>
+
+Spawned by services.job_service.start_job. Runs fetch_farmer_data.run_ingest
+for the job and reports progress to data/jobs.db. A background thread writes
+a heartbeat with the latest progress every JOB_HEARTBEAT_INTERVAL seconds and
+interrupts the run (like Ctrl+C) when cancellation is requested, which leaves
+the live database untouched.
+"""
+import _thread
+import os
+import sys
+import threading
+import time
+import traceback
+
+from services.job_service import claim_job, heartbeat, finish_job
+
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "1"))
+
+# Phases reported by fetch_farmer_data, in run order
+PHASES = ('fetch_farmers', 'save_farmers', 'land_mapping', 'bank_details')
+
+
+class ProgressReporter:
+    """Progress callback for run_ingest; keeps per-phase counts and persists them from a heartbeat thread."""
+
+    def __init__(self, job_id, interval=JOB_HEARTBEAT_INTERVAL):
+        self.job_id = job_id
+        self.interval = interval
+        self.started_at = time.time()
+        self.last_update = self.started_at
+        self.phase = None
+        self.phases = {}
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="job-heartbeat", daemon=True)
+
+    def __call__(self, phase, done, total, errors):
+        now = time.time()
+        with self._lock:
+            state = self.phases.get(phase)
+            if state is None:
+                # A phase starts when the previous one reported for the last time
+                state = self.phases[phase] = {'started_at': self.last_update}
+            state.update(done=done, total=total, errors=errors, updated_at=now)
+            self.phase = phase
+            self.last_update = now
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            phases = {}
+            for name in PHASES:
+                state = self.phases.get(name)
+                if state is None:
+                    continue
+                finished = state['done'] >= state['total']
+                elapsed = (state['updated_at'] if finished else now) - state['started_at']
+                rate = state['done'] / elapsed if elapsed > 0 else None
+                remaining = state['total'] - state['done']
+                phases[name] = {
+                    'done': state['done'],
+                    'total': state['total'],
+                    'errors': state['errors'],
+                    'elapsed_s': round(elapsed, 1),
+                    'per_second': round(rate, 2) if rate else None,
+                    'eta_s': 0 if finished else (round(remaining / rate, 1) if rate else None),
+                }
+            return {'phase': self.phase, 'elapsed_s': round(now - self.started_at, 1), 'phases': phases}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                cancel = heartbeat(self.job_id, self.snapshot())
+            except Exception as e:
+                print(f"Heartbeat failed: {e}")
+                continue
+            if cancel and not self.cancelled:
+                print("\nCancellation requested; stopping...")
+                self.cancelled = True
+                _thread.interrupt_main()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def main():
+    job_id = int(sys.argv[1])
+    job = claim_job(job_id, os.getpid())
+    if job is None:
+        print(f"Job {job_id} is not queued; nothing to do")
+        return 1
+    if job['cancel_requested']:
+        finish_job(job_id, 'cancelled')
+        return 0
+    print(f"Running {job['kind']} ingestion job {job_id} (pid {os.getpid()})")
+
+    reporter = ProgressReporter(job_id)
+    reporter.start()
+    status, result, error = 'failed', None, None
+    try:
+        import fetch_farmer_data
+        incremental = job['kind'] == 'incremental'
+        outcome = fetch_farmer_data.run_ingest(incremental=incremental, workers=job['workers'], progress=reporter,
+                                               processes=1 if incremental else fetch_farmer_data.INGEST_PROCESSES)
+        result = dict(outcome, upstream=fetch_farmer_data.client_stats())
+        if outcome['complete']:
+            status = 'succeeded'
+        elif reporter.cancelled:
+            status = 'cancelled'
+        else:
+            error = 'Interrupted'
+    except KeyboardInterrupt:
+        status = 'cancelled' if reporter.cancelled else 'failed'
+        error = None if reporter.cancelled else 'Interrupted'
+    except Exception as e:
+        traceback.print_exc()
+        error = str(e)
+    finally:
+        reporter.stop()
+        finish_job(job_id, status, result=result, error=error, progress=reporter.snapshot())
+    print(f"Job {job_id} {status}")
+    return 0 if status == 'succeeded' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
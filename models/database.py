@@ -1,18 +1,56 @@
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc, Float, TypeDecorator
 from pathlib import Path
+import os
 
 Base = declarative_base()
 
-# Create data directory if it doesn't exist
+class SarsaiArea(TypeDecorator):
+    """An area as its total in sarsai (REAL); the API shows it as the upstream 'kanal/marle/sarsai' string."""
+    impl = Float
+    cache_ok = True
+
+# Data directory (created on first database connection, not at import)
 DATA_DIR = Path("data")
-DATA_DIR.mkdir(exist_ok=True)
 
-# Database paths
+# Database paths (FARMER_DB_PATH lets benchmarks and tools point at another file)
 DB_NAME = "farmer_land_records.db"
-DB_PATH = DATA_DIR / DB_NAME
+DB_PATH = Path(os.environ.get("FARMER_DB_PATH", DATA_DIR / DB_NAME))
 
 # Database setup
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
\ No newline at end of file
+Session = sessionmaker(bind=engine)
+
+def db_file_id():
+    """(device, inode) of the database file, or None if it does not exist."""
+    try:
+        stat = os.stat(DB_PATH)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+def db_signature():
+    """(device, inode, mtime, size) of the database file, or None if it does not exist.
+    Changes when the file is replaced or a write is committed to it."""
+    try:
+        stat = os.stat(DB_PATH)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+@event.listens_for(engine, "do_connect")
+def _ensure_db_dir(dialect, conn_rec, cargs, cparams):
+    # SQLite creates the file but not its directory
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+@event.listens_for(engine, "connect")
+def _remember_db_file(dbapi_conn, conn_rec):
+    conn_rec.info['db_file'] = db_file_id()
+
+@event.listens_for(engine, "checkout")
+def _check_db_swapped(dbapi_conn, conn_rec, conn_proxy):
+    # Ingestion publishes a new database by renaming it over DB_PATH; pooled connections
+    # still point at the old file, so drop them and reconnect
+    if conn_rec.info.get('db_file') != db_file_id():
+        raise exc.DisconnectionError("database file was replaced")
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from models.database import Base
+from models.database import Base, SarsaiArea
+from models.place_model import Place # Referenced by the place id columns
 
 class FarmerBankDetail(Base):
     __tablename__ = 'farmer_bank_details'
@@ -31,14 +32,14 @@ class Farmer(Base):
     grandfather_name = Column(String(200))
     mobile_number = Column(String(15), nullable=True, index=True)
     aadhar_number = Column(String(12), nullable=True, index=True)
-    village_name = Column(String(200))
-    district_name = Column(String(100))
-    city_name = Column(String(100))
-    owner_area = Column(String(50), nullable=True) # Changed to String to match fetch_farmer_data.py
-    final_owner_area = Column(String(50), nullable=True) # Changed to String to match fetch_farmer_data.py
-    update_owner_area = Column(String(50), nullable=True) # Changed to String to match fetch_farmer_data.py
+    village_id = Column(Integer, ForeignKey('places.id')) # Names are stored once in places
+    district_id = Column(Integer, ForeignKey('places.id'))
+    city_id = Column(Integer, ForeignKey('places.id'))
+    owner_area = Column(SarsaiArea, nullable=True) # Upstream 'K/M/S' strings, stored as sarsai
+    final_owner_area = Column(SarsaiArea, nullable=True)
+    update_owner_area = Column(SarsaiArea, nullable=True)
     owner_type = Column(Integer) # Changed to Integer to match fetch_farmer_data.py
-    verify_status = Column(String(10)) # Changed to String to match fetch_farmer_data.py
+    verify_status = Column(Boolean) # Upstream 'true' / 'false', stored as 1 / 0
     auction = Column(Integer)
     source_api = Column(String(100))
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -49,3 +50,14 @@ class Farmer(Base):
 
     def __repr__(self):
         return f"<Farmer(id='{self.id}', farmer_name='{self.farmer_name}')>"
+
+class FarmerDuplicate(Base):
+    """Membership of a farmers row in a cluster of rows that look like the same person (see services.duplicate_service)."""
+    __tablename__ = 'farmer_duplicates'
+
+    farmer_row_id = Column(Integer, ForeignKey('farmers.id'), primary_key=True) # farmers.id, not the upstream FarmerId
+    cluster_id = Column(Integer, nullable=False, index=True) # Smallest farmers.id in the cluster
+    reasons = Column(String(100)) # Comma-separated match rules that joined the cluster
+
+    def __repr__(self):
+        return f"<FarmerDuplicate(farmer_row_id='{self.farmer_row_id}', cluster_id='{self.cluster_id}')>"
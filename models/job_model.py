@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Float, Text, Index, create_engine, event
+from sqlalchemy.orm import declarative_base
+from pathlib import Path
+import os
+
+from models.database import DATA_DIR
+
+# Jobs live in their own database so they survive ingestion replacing farmer_land_records.db
+JobBase = declarative_base()
+JOBS_DB_PATH = Path(os.environ.get("JOBS_DB_PATH", DATA_DIR / "jobs.db"))
+jobs_engine = create_engine(f"sqlite:///{JOBS_DB_PATH}", connect_args={'timeout': 30})
+
+@event.listens_for(jobs_engine, "do_connect")
+def _ensure_jobs_dir(dialect, conn_rec, cargs, cparams):
+    JOBS_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+@event.listens_for(jobs_engine, "connect")
+def _jobs_pragmas(dbapi_conn, conn_rec):
+    # The worker process writes progress while web workers poll it
+    dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+class IngestJob(JobBase):
+    __tablename__ = 'ingest_jobs'
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)  # 'full' | 'incremental'
+    status = Column(String(20), nullable=False)  # queued, running, succeeded, failed, cancelled
+    # 1 while queued/running, NULL afterwards; the unique index allows one active job at a time
+    active = Column(Integer, nullable=True)
+    workers = Column(Integer, nullable=True)
+    pid = Column(Integer, nullable=True)
+    cancel_requested = Column(Integer, nullable=False, default=0)
+    created_at = Column(Float, nullable=False)  # Unix timestamps
+    started_at = Column(Float, nullable=True)
+    finished_at = Column(Float, nullable=True)
+    heartbeat_at = Column(Float, nullable=True)
+    progress = Column(Text, nullable=True)  # JSON
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+    log_path = Column(String(500), nullable=True)
+
+    __table_args__ = (Index('uq_ingest_jobs_active', 'active', unique=True),)
+
+    def __repr__(self):
+        return f"<IngestJob(id='{self.id}', kind='{self.kind}', status='{self.status}')>"
@@ -1,29 +1,30 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
-from models.database import Base
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index, text
+from models.database import Base, SarsaiArea
+from models.place_model import Place # Referenced by the place id columns
 from datetime import datetime
 
 class LandRecord(Base):
     __tablename__ = 'land_records'
 
     id = Column(Integer, primary_key=True)
-    farmer_id = Column(Integer, ForeignKey('farmers.id'))
+    farmer_id = Column(Integer, ForeignKey('farmers.id'), index=True)
     sr_no = Column(String)
     owner_id = Column(Integer)
     owner_name = Column(String)
     revenue_village_id = Column(Integer)
-    village_name = Column(String)
-    city_name = Column(String)
-    district_name = Column(String)
+    village_id = Column(Integer, ForeignKey('places.id')) # Names are stored once in places
+    city_id = Column(Integer, ForeignKey('places.id'))
+    district_id = Column(Integer, ForeignKey('places.id'))
     area_type = Column(String)
-    owner_area = Column(String) # Changed to String to match API data
+    owner_area = Column(SarsaiArea) # Upstream 'K/M/S' string, stored as sarsai
     land_owner_area_k = Column(Float)
     land_owner_area_m = Column(Float)
     land_owner_area_sarsai = Column(Float)
-    owner_type = Column(String)
+    owner_type = Column(Integer)
     khewat_no = Column(String)
     khasra_no = Column(String)
     period = Column(String)
-    type = Column(String)
+    type = Column(Integer)
     kanal = Column(Float)
     marle = Column(Float)
     sarsai = Column(Float)
@@ -36,8 +37,35 @@ class LandRecord(Base):
     commodity_id = Column(Integer)
     min_land = Column(Float)
     auction = Column(Integer)
+    version = Column(Integer, nullable=False, default=1, server_default='1') # Bumped on every edit (optimistic concurrency)
+    content_hash = Column(String) # Hash of the upstream payload fields; NULL after a local edit
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Revenue-record lookups (services.land_service.lookup_lands): a khewat is one seek
+        Index('ix_land_records_khewat', 'district_id', 'village_id', 'khewat_no'),
+        # Joint holdings list several khewats ("47,303"); only those rows are indexed here
+        Index('ix_land_records_joint_khewat', 'district_id', 'village_id', 'khewat_no',
+              sqlite_where=text("khewat_no LIKE '%,%'")),
+    )
+
+    def __repr__(self):
+        return f"<LandRecord(id='{self.id}', sr_no='{self.sr_no}')>"
+
+class LandRecordChange(Base):
+    """One added / updated / removed land record, found by comparing an ingestion run with the previous database."""
+    __tablename__ = 'land_record_changes'
+
+    id = Column(Integer, primary_key=True) # Feed cursor: increases with every recorded change, never reused
+    land_record_id = Column(Integer, nullable=False)
+    farmer_id = Column(Integer)
+    change = Column(String, nullable=False) # 'added', 'updated' or 'removed'
+    content_hash = Column(String) # Hash after the change; NULL for removals
+    changed_at = Column(DateTime, nullable=False, index=True)
+
+    # AUTOINCREMENT: ids of changes dropped by retention must not be handed out again
+    __table_args__ = {'sqlite_autoincrement': True}
+
     def __repr__(self):
-        return f"<LandRecord(id='{self.id}', sr_no='{self.sr_no}')>"
\ No newline at end of file
+        return f"<LandRecordChange(id='{self.id}', land_record_id='{self.land_record_id}', change='{self.change}')>"
@@ -0,0 +1,158 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from models.database import Base, SarsaiArea
+from models.farmer_model import Farmer, FarmerDuplicate
+from models.land_model import LandRecord, LandRecordChange
+from models.place_model import Place, PLACE_COLUMNS
+from services.area import parse_area_kms
+
+# Columns added after the first release. create_all() only creates missing tables,
+# so databases built by an older fetch_farmer_data.py get these via ALTER TABLE.
+ADDED_COLUMNS = {
+    'land_records': [
+        ('version', "INTEGER NOT NULL DEFAULT 1"),
+        ('content_hash', "VARCHAR"),
+    ],
+}
+
+# Tables added after the first release; created if missing
+ADDED_TABLES = (LandRecordChange.__table__, FarmerDuplicate.__table__, Place.__table__)
+
+# Indexes added after the first release; created if missing
+ADDED_INDEXES = tuple(sorted(LandRecord.__table__.indexes, key=lambda index: index.name))
+
+# Tables that stored names, areas and flags as text before the compact layout (see compact_tables)
+COMPACTED_TABLES = (Farmer.__table__, LandRecord.__table__)
+
+def _compacted_value(table, column, old_columns):
+    """SELECT expression converting a column of the text layout to its compact form."""
+    if column.name in PLACE_COLUMNS:
+        return f"(SELECT id FROM places WHERE name = {PLACE_COLUMNS[column.name]})"
+    if column.name not in old_columns:
+        return "NULL"
+    if isinstance(column.type, SarsaiArea):
+        return f"area_sarsai({column.name})"
+    if table.name == 'farmers' and column.name == 'verify_status':
+        return "CASE WHEN lower(verify_status) IN ('true', '1') THEN 1 WHEN verify_status IS NOT NULL THEN 0 END"
+    # owner_type / type get their integer values from the column affinity
+    return column.name
+
+def compact_tables(db_path):
+    """
+    Rewrite farmers and land_records of a database in the text layout (place names in every row,
+    'K/M/S' area strings, 'true'/'false' flags) into the compact one, then VACUUM to release the space.
+    Ids and content hashes are kept, so the change feed and duplicate index stay valid.
+    Returns True if the database was converted.
+    """
+    start = time.time()
+    size_before = db_path.stat().st_size
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.create_function('area_sarsai', 1, parse_area_kms, deterministic=True)
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process may have converted it while this one waited for the lock
+        if 'village_name' not in {row[1] for row in conn.execute("PRAGMA table_info(farmers)")}:
+            conn.execute("ROLLBACK")
+            return False
+        names = " UNION ".join(f"SELECT {name} AS name FROM {table.name}"
+                               for table in COMPACTED_TABLES for name in PLACE_COLUMNS.values())
+        conn.execute(f"INSERT OR IGNORE INTO places (name) SELECT name FROM ({names}) WHERE name <> ''")
+        # The staging copies' foreign keys need the referenced tables in their metadata
+        metadata = MetaData()
+        for table in (Place.__table__,) + COMPACTED_TABLES:
+            table.to_metadata(metadata)
+        for table in COMPACTED_TABLES:
+            old_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table.name})")}
+            staging = table.to_metadata(metadata, name=f"{table.name}_compact")
+            conn.execute(str(CreateTable(staging).compile(dialect=sqlite.dialect())))
+            columns = ", ".join(column.name for column in table.columns)
+            values = ", ".join(_compacted_value(table, column, old_columns) for column in table.columns)
+            conn.execute(f"INSERT INTO {staging.name} ({columns}) SELECT {values} FROM {table.name} ORDER BY id")
+            conn.execute(f"DROP TABLE {table.name}")
+            conn.execute(f"ALTER TABLE {staging.name} RENAME TO {table.name}")
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                conn.execute(str(CreateIndex(index).compile(dialect=sqlite.dialect())))
+        conn.execute("COMMIT")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    print(f"Compacted farmers and land_records in {time.time() - start:.1f}s: "
+          f"{size_before / 1e6:.1f} MB -> {db_path.stat().st_size / 1e6:.1f} MB")
+    return True
+
+def ensure_change_cursor(conn):
+    """
+    Recreate land_record_changes with AUTOINCREMENT if an older release created it without, keeping its
+    rows (and so the highest id handed out). Returns True if the table was recreated.
+    """
+    table = LandRecordChange.__table__
+    sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                       {'name': table.name}).scalar()
+    if sql is None or 'AUTOINCREMENT' in sql.upper():
+        return False
+    for index in table.indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {table.name}_old"))
+    table.create(conn)
+    columns = ", ".join(column.name for column in table.columns)
+    conn.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_old ORDER BY id"))
+    conn.execute(text(f"DROP TABLE {table.name}_old"))
+    return True
+
+def ensure_schema(engine, compact=False):
+    """
+    Bring an existing database up to date: add ADDED_COLUMNS, create missing ADDED_TABLES, give the change
+    feed never-reused ids (ensure_change_cursor) and create missing ADDED_INDEXES.
+    Converting text-layout tables (compact_tables) rewrites them and holds the write lock meanwhile, so it
+    only runs with compact=True: from ingestion, on its staging copy, or `python -m models.migrations`.
+    Otherwise a text-layout database raises RuntimeError, as the app cannot read it.
+    """
+    try:
+        inspector = inspect(engine)
+        tables = set(inspector.get_table_names())
+        missing = [table for table in ADDED_TABLES if table.name not in tables]
+        if missing:
+            Base.metadata.create_all(engine, tables=missing)
+            print(f"Created tables {', '.join(table.name for table in missing)}")
+        with engine.begin() as conn:
+            for table, columns in ADDED_COLUMNS.items():
+                if table not in tables:
+                    continue
+                existing = {col['name'] for col in inspector.get_columns(table)}
+                for name, ddl in columns:
+                    if name not in existing:
+                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                        print(f"Added column {table}.{name}")
+            if ensure_change_cursor(conn):
+                print("Recreated land_record_changes with never-reused ids")
+        if 'farmers' in tables and 'village_name' in {col['name'] for col in inspector.get_columns('farmers')}:
+            if not compact:
+                raise RuntimeError(f"{engine.url.database} is in the text layout of an older release; convert it "
+                                   "with `python -m models.migrations` or an incremental ingestion run")
+            engine.dispose()
+            compact_tables(Path(engine.url.database))
+            inspector = inspect(engine)
+        with engine.begin() as conn:
+            for index in ADDED_INDEXES:
+                if index.table.name not in tables:
+                    continue
+                if index.name not in {ix['name'] for ix in inspector.get_indexes(index.table.name)}:
+                    index.create(conn)
+                    print(f"Created index {index.name}")
+    except Exception:
+        raise
+
+def main():
+    """Bring the database at FARMER_DB_PATH up to date, converting it to the compact layout if needed."""
+    from models.database import engine, DB_PATH
+    print(f"Migrating {DB_PATH}")
+    ensure_schema(engine, compact=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, text
+from models.database import Base
+
+class Place(Base):
+    """A district, city (tehsil) or village name, stored once and referenced by id from farmers and land_records."""
+    __tablename__ = 'places'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<Place(id='{self.id}', name='{self.name}')>"
+
+# Place id columns of farmers and land_records, and the name column each one replaces in row dicts and API output
+PLACE_COLUMNS = {
+    'district_id': 'district_name',
+    'city_id': 'city_name',
+    'village_id': 'village_name',
+}
+
+class PlaceIds:
+    """Resolves place names to places.id on an open connection, adding names not seen before."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.ids = {}
+
+    def __call__(self, name):
+        if not name:
+            return None
+        place_id = self.ids.get(name)
+        if place_id is None:
+            self.conn.execute(text("INSERT OR IGNORE INTO places (name) VALUES (:name)"), {'name': name})
+            place_id = self.ids[name] = self.conn.execute(
+                text("SELECT id FROM places WHERE name = :name"), {'name': name}).scalar()
+        return place_id
+
+    def encode(self, row):
+        """Copy of a row dict with its district/city/village names replaced by PLACE_COLUMNS ids."""
+        row = dict(row)
+        for id_column, name_column in PLACE_COLUMNS.items():
+            if name_column in row:
+                row[id_column] = self(row.pop(name_column))
+        return row
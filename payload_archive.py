@@ -0,0 +1,118 @@
+"""
+Raw upstream payload archive.
+
+Every ingestion run writes what it received from upstream to
+data/archive/<run_id>/ as gzip-compressed JSON Lines, one file per phase and
+source:
+
+    farmers-<SOURCE>.jsonl.gz   {"key": "<SOURCE>", "fetched_at": ..., "data": [farmer, ...]}
+    mapping-<SOURCE>.jsonl.gz   {"key": <FarmerId>, "fetched_at": ..., "data": [land record, ...]}
+    bank-<SOURCE>.jsonl.gz      {"key": <FarmerId>, "fetched_at": ..., "data": {payment options}}
+    manifest.json               run id, kind, timestamps, line counts per file
+
+`fetch_farmer_data.py --from-archive <run_id|latest>` replays these files into
+a fresh database without touching the network. Incremental runs only hold the
+payloads they re-fetched, so 'latest' only considers full runs.
+"""
+import gzip
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+PHASES = ('farmers', 'mapping', 'bank')
+
+
+def _safe_name(name):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(name))
+
+
+class PayloadArchive:
+    """Writer for one ingestion run's archive directory."""
+
+    def __init__(self, root, run_id=None, kind='full'):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.kind = kind
+        self.run_dir = Path(root) / self.run_id
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.counts = {}
+        self._files = {}
+
+    def _file(self, phase, source):
+        name = f"{phase}-{_safe_name(source)}.jsonl.gz"
+        if name not in self._files:
+            self._files[name] = gzip.open(self.run_dir / name, 'at', encoding='utf-8', compresslevel=6)
+            self.counts.setdefault(name, 0)
+        return name, self._files[name]
+
+    def write(self, phase, source, key, data):
+        """Append one upstream payload (the responseData part) to the phase/source file."""
+        if phase not in PHASES:
+            raise ValueError(f"Unknown archive phase: {phase}")
+        name, f = self._file(phase, source)
+        f.write(json.dumps({'key': key, 'fetched_at': time.time(), 'data': data}, ensure_ascii=False))
+        f.write('\n')
+        self.counts[name] += 1
+
+    def close(self, complete=True):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        counts = dict(self.counts)
+        for shard_manifest in sorted(self.run_dir.glob('*/manifest.json')):
+            with open(shard_manifest, 'r', encoding='utf-8') as f:
+                for name, count in json.load(f).get('files', {}).items():
+                    counts[f"{shard_manifest.parent.name}/{name}"] = count
+        manifest = {
+            'run_id': self.run_id,
+            'kind': self.kind,
+            'started_at': self.started_at,
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'complete': complete,
+            'files': counts,
+        }
+        with open(self.run_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+
+def resolve_run(root, run):
+    """Return the archive directory for a run id, a path, or 'latest' (newest completed full run)."""
+    path = Path(run)
+    if path.is_dir():
+        return path
+    root = Path(root)
+    if run == 'latest':
+        runs = []
+        for manifest_path in root.glob('*/manifest.json'):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if manifest.get('complete') and manifest.get('kind', 'full') == 'full':
+                    runs.append(manifest_path.parent)
+            except (OSError, ValueError):
+                continue
+        if not runs:
+            raise FileNotFoundError(f"No completed archive runs in {root}")
+        return max(runs, key=lambda p: p.name)
+    if (root / run).is_dir():
+        return root / run
+    raise FileNotFoundError(f"Archive run not found: {run}")
+
+
+def iter_phase(run_dir, phase):
+    """Yield (source, key, data) for every archived payload of a phase."""
+    # Multi-process runs keep each shard's payloads in a shard_<n>/ subdirectory
+    for path in sorted(Path(run_dir).glob(f"**/{phase}-*.jsonl.gz")):
+        source = path.name[len(phase) + 1:-len('.jsonl.gz')]
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    yield source, record['key'], record['data']
+        except (EOFError, gzip.BadGzipFile) as e:
+            # A run that was interrupted leaves a truncated final member; keep what was read
+            print(f"⚠️ Truncated archive file {path.name}: {e}")
@@ -0,0 +1,19 @@
+from flask import Blueprint, Response, jsonify
+from services.event_service import open_stream, StreamLimitError
+
+event_bp = Blueprint('event_bp', __name__)
+
+@event_bp.route('/api/events')
+def events_route():
+    """
+    Server-sent events for live dashboards: stats, lands, job and reload (see services/event_service.py).
+    """
+    try:
+        stream = open_stream()
+    except StreamLimitError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    # No caching or proxy buffering, or events arrive late and in bursts
+    return Response(stream, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
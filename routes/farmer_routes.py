@@ -4,26 +4,20 @@ from services.farmer_service import (
     get_farmers_api,
     get_farmer_by_id,
     get_farmer_for_render,
+    get_farmers_batch,
+    FARMER_LIST_KEYS,
+    FARMER_LIST_SECTIONS,
+    FARMER_DETAIL_FIELDS,
+    FARMER_DETAIL_SECTIONS,
+    LAND_DETAIL_FIELDS,
+    FARMER_LOOKUP_COLUMNS,
+    MAX_FARMER_LOOKUPS,
 )
-import json
-import os
+from services.serialization import json_response, parse_field_selection
+from services.duplicate_service import get_duplicate_clusters, get_farmer_duplicates
 
 farmer_bp = Blueprint('farmer_bp', __name__)
 
-def convert_to_acres(kanal, marle, sarsai):
-    total_sarsai = (kanal * 20 * 9) + (marle * 9) + sarsai
-    return total_sarsai / 1440
-
-# Load bank data once
-def load_bank_data():
-    bank_data_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'js', 'bankId.json')
-    with open(bank_data_path, 'r') as f:
-        bank_list = json.load(f)
-    bank_map = {bank['BankId']: bank['BankName'] for bank in bank_list}
-    return bank_map
-
-bank_id_to_name_map = load_bank_data()
-
 @farmer_bp.route('/farmers/all')
 def all_farmers():
     try:
@@ -40,12 +34,17 @@ def get_farmers():
         search = request.args.get('search', '')
         source_api = request.args.get('source_api', '')
         total_area = request.args.get('total_area', '')
+        try:
+            fields, include = parse_field_selection(request.args, FARMER_LIST_KEYS, FARMER_LIST_SECTIONS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         farmers, total_farmers, page, per_page = get_farmers_api(
-            page=page, per_page=per_page, search=search, source_api=source_api, total_area=total_area
+            page=page, per_page=per_page, search=search, source_api=source_api, total_area=total_area,
+            fields=fields, include=include
         )
 
-        return jsonify({
+        return json_response({
             'data': farmers,
             'total': total_farmers,
             'page': page,
@@ -58,10 +57,71 @@ def get_farmers():
 @farmer_bp.route('/api/farmer/<int:farmer_id>')
 def get_farmer(farmer_id):
     try:
-        farmer = get_farmer_by_id(farmer_id)
+        try:
+            fields, include = parse_field_selection(request.args, FARMER_DETAIL_FIELDS, FARMER_DETAIL_SECTIONS)
+            land_fields, _ = parse_field_selection(request.args, LAND_DETAIL_FIELDS, param='land_fields')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        farmer = get_farmer_by_id(farmer_id, fields=fields, include=include, land_fields=land_fields)
         if not farmer:
             return jsonify({'error': 'Farmer not found'}), 404
-        return jsonify(farmer)
+        return json_response(farmer)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@farmer_bp.route('/api/farmers/lookup', methods=['POST'])
+def lookup_farmers():
+    """
+    Body: {"ids": [...], "farmer_ids": [...], "aadhar_numbers": [...], "mobile_numbers": [...]} (any of them)
+    Returns the matching farmers with lands and bank detail, which farmers each value matched and the values
+    that matched none. ?fields=, ?include= and ?land_fields= select as for /api/farmer/<id>.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not any(data.get(key) for key in FARMER_LOOKUP_COLUMNS):
+            return jsonify({'error': f"Expected a non-empty list in one of: {', '.join(FARMER_LOOKUP_COLUMNS)}"}), 400
+        lookups = {key: value for key, value in data.items() if value}
+        count = sum(len(value) for value in lookups.values() if isinstance(value, list))
+        if count > MAX_FARMER_LOOKUPS:
+            return jsonify({'error': f'At most {MAX_FARMER_LOOKUPS} lookups per request'}), 413
+        try:
+            fields, include = parse_field_selection(request.args, FARMER_DETAIL_FIELDS, FARMER_DETAIL_SECTIONS)
+            land_fields, _ = parse_field_selection(request.args, LAND_DETAIL_FIELDS, param='land_fields')
+            result = get_farmers_batch(lookups, fields=fields, include=include, land_fields=land_fields)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return json_response(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@farmer_bp.route('/api/duplicates')
+def get_duplicates():
+    """Clusters of farmers rows that look like the same person, largest first; ?reason= filters by match rule."""
+    try:
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = min(max(1, request.args.get('per_page', 20, type=int)), 100)
+        try:
+            clusters, total = get_duplicate_clusters(page=page, per_page=per_page,
+                                                     reason=request.args.get('reason') or None)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return json_response({
+            'data': clusters,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page if per_page > 0 else 1
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@farmer_bp.route('/api/farmer/<int:farmer_id>/duplicates')
+def get_duplicates_of_farmer(farmer_id):
+    try:
+        cluster = get_farmer_duplicates(farmer_id)
+        if not cluster:
+            return jsonify({'error': 'No duplicates found for this farmer'}), 404
+        return json_response(cluster)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,81 @@
+from flask import Blueprint, jsonify, request
+from services.job_service import (
+    start_job,
+    get_job,
+    list_jobs,
+    cancel_job,
+    JobConflictError,
+    JOB_KINDS,
+)
+import hmac
+import os
+
+job_bp = Blueprint('job_bp', __name__)
+
+# Starting and cancelling jobs requires this value in the X-Jobs-Token header; unset disables both
+INGEST_JOBS_TOKEN = os.getenv("INGEST_JOBS_TOKEN", "")
+
+def _denied():
+    """Error response when the request may not start or cancel jobs, else None."""
+    if not INGEST_JOBS_TOKEN:
+        return jsonify({'error': 'Job control is disabled; set INGEST_JOBS_TOKEN to enable it'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Jobs-Token', ''), INGEST_JOBS_TOKEN):
+        return jsonify({'error': 'Invalid or missing X-Jobs-Token'}), 403
+    return None
+
+@job_bp.route('/api/jobs', methods=['POST'])
+def start_job_route():
+    """
+    Body: {"kind": "full" | "incremental", "workers": 8}
+    Starts an ingestion job in a worker process; poll GET /api/jobs/<id> for progress.
+    """
+    try:
+        denied = _denied()
+        if denied:
+            return denied
+        data = request.get_json(silent=True) or {}
+        kind = data.get('kind', 'incremental')
+        workers = data.get('workers')
+        if kind not in JOB_KINDS:
+            return jsonify({'error': f"'kind' must be one of: {', '.join(JOB_KINDS)}"}), 400
+        if workers is not None and (not isinstance(workers, int) or not 1 <= workers <= 64):
+            return jsonify({'error': "'workers' must be an integer between 1 and 64"}), 400
+        job = start_job(kind, workers=workers)
+        return jsonify(job), 202
+    except JobConflictError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@job_bp.route('/api/jobs')
+def list_jobs_route():
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        return jsonify({'jobs': list_jobs(limit=limit)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@job_bp.route('/api/jobs/<int:job_id>')
+def get_job_route(job_id):
+    try:
+        job = get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@job_bp.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job_route(job_id):
+    try:
+        denied = _denied()
+        if denied:
+            return denied
+        job = cancel_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        if job['status'] not in ('queued', 'running'):
+            return jsonify({'error': f"Job already {job['status']}", 'job': job}), 409
+        return jsonify(job), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
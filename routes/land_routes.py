@@ -1,5 +1,16 @@
 from flask import Blueprint, jsonify, request
-from services.land_service import get_lands_api, get_land_by_id, update_land
+from services.serialization import json_response, parse_field_selection
+from services.land_service import (
+    get_lands_api,
+    get_land_by_id,
+    lookup_lands,
+    update_land,
+    update_lands_batch,
+    MAX_BATCH_UPDATES,
+    LAND_LIST_FIELDS,
+    LAND_LIST_SECTIONS,
+)
+from services.change_service import get_changes as get_change_feed, ChangeFeedExpiredError, CHANGE_FEED_DEFAULT_LIMIT
 
 land_bp = Blueprint('land_bp', __name__)
 
@@ -10,9 +21,15 @@ def get_lands():
         page = request.args.get('page', 1, type=int)
         per_page = 10
         search = request.args.get('search', '')
+        try:
+            fields, include = parse_field_selection(request.args, LAND_LIST_FIELDS, LAND_LIST_SECTIONS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        lands, total_lands, page, per_page = get_lands_api(page=page, per_page=per_page, search=search)
-        return jsonify({
+        lands, total_lands, page, per_page = get_lands_api(
+            page=page, per_page=per_page, search=search, fields=fields, include=include
+        )
+        return json_response({
             'data': lands,
             'total': total_lands,
             'page': page,
@@ -28,19 +45,86 @@ def get_land(land_id):
         land = get_land_by_id(land_id)
         if not land:
             return jsonify({'error': 'Land record not found'}), 404
-        return jsonify(land)
+        return json_response(land)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@land_bp.route('/api/lands/lookup')
+def lookup_lands_route():
+    """Land records by ?district=&village= and ?khewat= and/or ?khasra= (revenue-record numbers)."""
+    try:
+        try:
+            records, truncated = lookup_lands(
+                request.args.get('district'), request.args.get('village'),
+                khewat_no=request.args.get('khewat'), khasra_no=request.args.get('khasra'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return json_response({'data': records, 'total': len(records), 'truncated': truncated})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @land_bp.route('/api/land/update/<int:land_id>', methods=['POST'])
-def update_land(land_id):
+def update_land_route(land_id):
     try:
         data = request.get_json()
         if not data:
             return jsonify({'error': 'Invalid data'}), 400
-        success = update_land(land_id, data)
+        try:
+            success = update_land(land_id, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         if success:
             return jsonify({'success': True})
-        return jsonify({'error': 'Update failed'}), 500
+        return jsonify({'error': 'Update failed: record not found or modified since it was read'}), 409
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@land_bp.route('/api/lands/update', methods=['POST'])
+def update_lands_route():
+    """
+    Body: {"updates": [{"id": 1, "version": 3, "khewat_no": "122", ...}, ...], "atomic": false}
+    Returns per-row results in request order.
+    """
+    try:
+        data = request.get_json(silent=True)
+        updates = data.get('updates') if isinstance(data, dict) else None
+        if not isinstance(updates, list) or not updates:
+            return jsonify({'error': "Expected a non-empty 'updates' list"}), 400
+        if len(updates) > MAX_BATCH_UPDATES:
+            return jsonify({'error': f'At most {MAX_BATCH_UPDATES} updates per request'}), 413
+        atomic = bool(data.get('atomic', False))
+        results, committed = update_lands_batch(updates, atomic=atomic)
+        summary = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        return jsonify({
+            'committed': committed,
+            'summary': summary,
+            'results': results
+        }), (200 if committed else 409)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@land_bp.route('/api/changes')
+def get_changes():
+    """
+    Land records added, updated or removed by ingestion runs, oldest first.
+    ?since= is the next_since of the previous response (or an ISO timestamp, UTC), ?limit= caps the page
+    and ?include=record adds each record's current fields. 410 means the cursor is older than the
+    retained log: reload /api/lands and continue from 'latest'.
+    """
+    try:
+        limit = request.args.get('limit', CHANGE_FEED_DEFAULT_LIMIT, type=int)
+        include = [part.strip() for part in request.args.get('include', '').split(',') if part.strip()]
+        if set(include) - {'record'}:
+            return jsonify({'error': "Unknown include; allowed: record"}), 400
+        try:
+            feed = get_change_feed(since=request.args.get('since', '0'), limit=limit,
+                                   include_records='record' in include)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except ChangeFeedExpiredError as e:
+            return jsonify({'error': str(e), 'latest': e.latest}), 410
+        return json_response(feed)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
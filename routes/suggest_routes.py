@@ -0,0 +1,26 @@
+import time
+
+from flask import Blueprint, jsonify, request
+from services.serialization import json_response
+from services.suggest_service import get_suggestions, SUGGEST_DEFAULT_LIMIT
+
+suggest_bp = Blueprint('suggest_bp', __name__)
+
+@suggest_bp.route('/api/suggest')
+def suggest():
+    try:
+        start = time.perf_counter()
+        query = request.args.get('q', '')
+        limit = request.args.get('limit', SUGGEST_DEFAULT_LIMIT, type=int)
+        kinds = [kind for kind in request.args.get('kinds', '').split(',') if kind]
+        try:
+            suggestions = get_suggestions(query, kinds=kinds, limit=limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return json_response({
+            'query': query,
+            'suggestions': suggestions,
+            'took_ms': round((time.perf_counter() - start) * 1000, 2),
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
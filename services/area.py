@@ -0,0 +1,29 @@
+"""Land area conversions (1 acre = 8 kanal, 1 kanal = 20 marle, 1 marla = 9 sarsai)."""
+
+SARSAI_PER_MARLA = 9
+SARSAI_PER_KANAL = 20 * SARSAI_PER_MARLA
+SARSAI_PER_ACRE = 8 * SARSAI_PER_KANAL
+
+def to_sarsai(kanal, marle, sarsai):
+    return (kanal * SARSAI_PER_KANAL) + (marle * SARSAI_PER_MARLA) + sarsai
+
+def convert_to_acres(kanal, marle, sarsai):
+    return to_sarsai(kanal, marle, sarsai) / SARSAI_PER_ACRE
+
+def format_area_kms(total_sarsai):
+    """Format an area in sarsai as the upstream 'kanal/marle/sarsai' string."""
+    kanal, rem = divmod(total_sarsai, SARSAI_PER_KANAL)
+    marle, sarsai = divmod(rem, SARSAI_PER_MARLA)
+    return f"{int(kanal)}/{int(marle)}/{sarsai:.2f}"
+
+def parse_area_kms(value):
+    """Total sarsai of an upstream 'kanal/marle/sarsai' area string ('83/8/4.50'); None if missing or malformed."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    parts = str(value).strip().split('/')
+    if len(parts) != 3:
+        return None
+    try:
+        return to_sarsai(*(float(part) for part in parts))
+    except ValueError:
+        return None
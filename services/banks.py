@@ -0,0 +1,16 @@
+"""Bank ID to name lookup backed by static/js/bankId.json, loaded on first use."""
+import json
+import os
+from functools import lru_cache
+
+BANK_DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'static', 'js', 'bankId.json')
+
+@lru_cache(maxsize=None)
+def bank_id_to_name_map():
+    """Return {BankId: BankName}; the file is read once per process."""
+    with open(BANK_DATA_PATH, 'r') as f:
+        bank_list = json.load(f)
+    return {bank['BankId']: bank['BankName'] for bank in bank_list}
+
+def bank_name(bank_id, default='Unknown Bank'):
+    return bank_id_to_name_map().get(bank_id, default)
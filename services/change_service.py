@@ -0,0 +1,111 @@
+"""
+Land record change feed.
+
+Every ingestion run compares its land records with the previous database
+(by LandRecord.id and content hash, see fetch_farmer_data.record_land_changes)
+and appends one row per added, updated or removed record to
+land_record_changes. A consumer reads the feed from its last cursor:
+
+    GET /api/changes?since=<cursor>  ->  {'changes': [...], 'next_since': <cursor>, 'has_more': bool}
+
+and repeats with next_since until has_more is false.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from models.database import engine
+from services.serialization import sql_timestamp, rows_as_dicts
+from services.land_service import LAND_LIST_FIELDS, ID_CHUNK_SIZE
+
+CHANGE_FEED_DEFAULT_LIMIT = 500
+CHANGE_FEED_MAX_LIMIT = 5000
+CHANGE_COLUMNS = ", ".join([
+    "id", "land_record_id", "farmer_id", "change", "content_hash", sql_timestamp("changed_at"),
+])
+
+class ChangeFeedExpiredError(Exception):
+    """Raised when the changes after a cursor were already dropped by retention; the client must resync."""
+
+    def __init__(self, latest):
+        super().__init__("Changes since this cursor are no longer available; reload all land records "
+                         "and continue from 'latest'")
+        self.latest = latest
+
+def parse_since(value):
+    """
+    A feed cursor (integer) or an ISO timestamp; returns ('cursor', int) or ('time', datetime).
+    changed_at is stored as naive UTC, so a timestamp with an offset (or Z) is converted to UTC and one
+    without is taken as UTC.
+    """
+    value = (value or '0').strip()
+    if value.lstrip('-').isdigit():
+        return 'cursor', int(value)
+    try:
+        since = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith(('Z', 'z')) else value)
+    except ValueError:
+        raise ValueError("'since' must be a change cursor or an ISO timestamp") from None
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return 'time', since
+
+def _land_records(conn, land_ids):
+    columns = ", ".join(LAND_LIST_FIELDS.values())
+    records = {}
+    for i in range(0, len(land_ids), ID_CHUNK_SIZE):
+        chunk = land_ids[i:i + ID_CHUNK_SIZE]
+        params = {f"id{n}": land_id for n, land_id in enumerate(chunk)}
+        placeholders = ", ".join(f":{name}" for name in params)
+        result = conn.execute(text(f"SELECT {columns} FROM land_records lr WHERE lr.id IN ({placeholders})"), params)
+        records.update((record['id'], record) for record in rows_as_dicts(result))
+    return records
+
+def get_changes(since='0', limit=CHANGE_FEED_DEFAULT_LIMIT, include_records=False):
+    """
+    Returns {'changes', 'since', 'next_since', 'has_more', 'latest'} for up to `limit` changes after `since`.
+    With include_records, added and updated changes carry the record's current fields (as in /api/lands),
+    or None if it was removed later. Raises ValueError for a bad cursor and ChangeFeedExpiredError when
+    retention already dropped changes the client has not seen, or the cursor is past the latest change.
+    """
+    try:
+        kind, value = parse_since(since)
+        limit = max(1, min(limit, CHANGE_FEED_MAX_LIMIT))
+        with engine.connect() as conn:
+            # The highest id ever handed out, also when retention dropped every row
+            oldest, latest = conn.execute(text("""
+                SELECT MIN(id), MAX(COALESCE(MAX(id), 0),
+                                    (SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'land_record_changes'))
+                FROM land_record_changes
+            """)).fetchone()
+            if kind == 'cursor':
+                first = oldest if oldest is not None else latest + 1
+                # Older than the retained log, or from a different log (a restored or rebuilt database)
+                if value < first - 1 or value > latest:
+                    raise ChangeFeedExpiredError(latest)
+                where, params = "id > :since", {'since': value}
+            else:
+                where, params = "changed_at > :since", {'since': value.strftime('%Y-%m-%d %H:%M:%S.%f')}
+            result = conn.execute(text(f"""
+                SELECT {CHANGE_COLUMNS} FROM land_record_changes
+                WHERE {where} ORDER BY id LIMIT :limit
+            """), dict(params, limit=limit + 1))
+            changes = rows_as_dicts(result)
+            has_more = len(changes) > limit
+            changes = changes[:limit]
+
+            if include_records:
+                wanted = sorted({c['land_record_id'] for c in changes if c['change'] != 'removed'})
+                records = _land_records(conn, wanted)
+                for change in changes:
+                    change['record'] = records.get(change['land_record_id']) if change['change'] != 'removed' else None
+
+        next_since = changes[-1]['id'] if changes else (value if kind == 'cursor' else latest)
+        return {
+            'changes': changes,
+            'since': since,
+            'next_since': next_since,
+            'has_more': has_more,
+            'latest': latest,
+        }
+    except Exception:
+        raise
@@ -0,0 +1,51 @@
+"""
+AES-128-CBC helpers for the account numbers returned by the payment options API.
+
+The cryptography package is imported on first use, so importing this module
+(and the services that depend on it) stays cheap.
+"""
+import base64
+from functools import lru_cache
+
+# Decryption key and IV (from user's instruction)
+# let key1 = CryptoJS.enc.Utf8.parse('8080808080808080');
+# let iv1 = CryptoJS.enc.Utf8.parse('8080808080808080');
+AES_KEY = b'8080808080808080' # 16 bytes for AES-128
+AES_IV = b'8080808080808080' # 16 bytes for AES-128
+
+@lru_cache(maxsize=None)
+def _cipher():
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.hazmat.backends import default_backend
+    return Cipher(algorithms.AES(AES_KEY), modes.CBC(AES_IV), backend=default_backend())
+
+@lru_cache(maxsize=None)
+def _pkcs7():
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import algorithms
+    return padding.PKCS7(algorithms.AES.block_size)
+
+def decrypt_account_no(encrypted_account_no):
+    """Decrypts an AES-encrypted account number using the provided key and IV."""
+    try:
+        # The input is Base64 encoded, so decode it first
+        encrypted_bytes = base64.b64decode(encrypted_account_no)
+
+        decryptor = _cipher().decryptor()
+        decrypted_padded_bytes = decryptor.update(encrypted_bytes) + decryptor.finalize()
+
+        # Unpad the decrypted data (PKCS7 padding)
+        unpadder = _pkcs7().unpadder()
+        decrypted_bytes = unpadder.update(decrypted_padded_bytes) + unpadder.finalize()
+
+        return decrypted_bytes.decode('utf-8')
+    except Exception as e:
+        print(f"Error decrypting account number: {e}")
+        return None
+
+def encrypt_account_no(account_no):
+    """Encrypts an account number the way upstream does (AES-CBC, PKCS7, Base64)."""
+    padder = _pkcs7().padder()
+    padded = padder.update(account_no.encode('utf-8')) + padder.finalize()
+    encryptor = _cipher().encryptor()
+    return base64.b64encode(encryptor.update(padded) + encryptor.finalize()).decode('ascii')
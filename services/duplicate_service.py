@@ -0,0 +1,247 @@
+"""
+Duplicate farmer detection across sources.
+
+fetch_all_farmers only de-duplicates on (FarmerId, source), so one person
+registered under several sources or IDs appears as several farmers rows.
+Instead of comparing every pair of rows, each row is put into a few blocks
+keyed on normalized values, and rows sharing a block are joined with
+union-find, which keeps the whole pass close to linear in the number of rows:
+
+* farmer_id            the same upstream FarmerId listed by several sources
+* aadhar               the same 12-digit Aadhaar number
+* mobile_name          the same mobile number and phonetic first name
+                       (a mobile number alone is often shared by a family)
+* name_father_village  the same phonetic name, father's and grandfather's name
+                       and village
+
+Names are transliterated from Gurmukhi, reduced to a consonant skeleton
+(so "Gurpreet", "Gurprit" and "ਗੁਰਪ੍ਰੀਤ" match) and stripped of words such as
+Singh, Kaur and relation markers. Blocks larger than DUPLICATE_MAX_BLOCK are
+skipped as too generic (placeholder numbers, very common names).
+
+Clusters are stored in farmer_duplicates by fetch_farmer_data after every run.
+"""
+import os
+import re
+import time
+from functools import lru_cache
+
+from sqlalchemy import text
+
+from models.database import engine
+from models.farmer_model import FarmerDuplicate
+from services.serialization import sql_place_name
+
+DUPLICATE_MAX_BLOCK = int(os.getenv("DUPLICATE_MAX_BLOCK", "25"))
+DUPLICATE_RULES = ('farmer_id', 'aadhar', 'mobile_name', 'name_father_village')
+DUPLICATE_MEMBER_COLUMNS = f"f.id, f.farmer_id, f.farmer_name, f.father_name, {sql_place_name('f.village_id')}, " \
+                           f"{sql_place_name('f.district_id')}, f.mobile_number, f.source_api"
+
+# Gurmukhi to Latin, consonants without their inherent vowel (the phonetic key drops vowels anyway)
+GURMUKHI_TO_LATIN = str.maketrans({
+    'ਅ': 'a', 'ਆ': 'aa', 'ਇ': 'i', 'ਈ': 'ii', 'ਉ': 'u', 'ਊ': 'uu', 'ਏ': 'e', 'ਐ': 'ai', 'ਓ': 'o', 'ਔ': 'au',
+    'ੳ': 'u', 'ੲ': 'i',
+    'ਕ': 'k', 'ਖ': 'kh', 'ਗ': 'g', 'ਘ': 'gh', 'ਙ': 'ng',
+    'ਚ': 'ch', 'ਛ': 'chh', 'ਜ': 'j', 'ਝ': 'jh', 'ਞ': 'ny',
+    'ਟ': 't', 'ਠ': 'th', 'ਡ': 'd', 'ਢ': 'dh', 'ਣ': 'n',
+    'ਤ': 't', 'ਥ': 'th', 'ਦ': 'd', 'ਧ': 'dh', 'ਨ': 'n',
+    'ਪ': 'p', 'ਫ': 'ph', 'ਬ': 'b', 'ਭ': 'bh', 'ਮ': 'm',
+    'ਯ': 'y', 'ਰ': 'r', 'ਲ': 'l', 'ਵ': 'v', 'ੜ': 'r', 'ਸ': 's', 'ਹ': 'h',
+    '\u0a33': 'l', '\u0a36': 'sh', '\u0a59': 'kh', '\u0a5a': 'g', '\u0a5b': 'z', '\u0a5e': 'f',  # nukta letters
+    'ਾ': 'aa', 'ਿ': 'i', 'ੀ': 'ii', 'ੁ': 'u', 'ੂ': 'uu', 'ੇ': 'e', 'ੈ': 'ai', 'ੋ': 'o', 'ੌ': 'au',
+    'ੰ': 'n', 'ਂ': 'n', 'ੱ': '', '੍': '', '਼': '',
+    '੦': '0', '੧': '1', '੨': '2', '੩': '3', '੪': '4', '੫': '5', '੬': '6', '੭': '7', '੮': '8', '੯': '9',
+})
+
+_ASPIRATED = re.compile(r'([bcdgjkpst])h')
+_SOUNDS_ALIKE = str.maketrans({'f': 'p', 'w': 'v', 'z': 'j', 'q': 'k', 'x': 'k'})
+_VOWELS = re.compile(r'[aeiouyh]')
+_REPEATS = re.compile(r'(.)\1+')
+_NOT_LETTERS = re.compile(r'[^a-z]+')
+_BRACKETED = re.compile(r'\([^)]*\)')
+_NOT_DIGITS = re.compile(r'\D+')
+
+def phonetic(word):
+    """Consonant skeleton of a Latin word: first letter, then consonants with aspiration and repeats removed."""
+    word = _ASPIRATED.sub(r'\1', word).translate(_SOUNDS_ALIKE)
+    if not word:
+        return ''
+    return _REPEATS.sub(r'\1', word[0] + _VOWELS.sub('', word[1:]))
+
+# Honorifics, family names shared by most farmers, and relation words ("s/o", "ਪੁੱਤਰ")
+_STOP_KEYS = {phonetic(word) for word in (
+    'singh', 'kaur', 'puttar', 'putri', 'patni', 'son', 'of', 'wife', 'daughter', 'late', 'shri', 'smt',
+)}
+
+@lru_cache(maxsize=65536)
+def name_tokens(value):
+    """Phonetic keys of the significant words of a (Latin or Gurmukhi) name, in order."""
+    # Cached: names, fathers' names and villages repeat across many rows
+    if not value:
+        return ()
+    latin = _BRACKETED.sub(' ', str(value)).translate(GURMUKHI_TO_LATIN).lower()
+    keys = []
+    for word in _NOT_LETTERS.split(latin):
+        if len(word) < 2:
+            continue
+        key = phonetic(word)
+        if key and key not in _STOP_KEYS:
+            keys.append(key)
+    return tuple(keys)
+
+def name_key(value):
+    return ' '.join(sorted(name_tokens(value)))
+
+def normalize_mobile(value):
+    digits = _NOT_DIGITS.sub('', str(value or ''))
+    if len(digits) == 12 and digits.startswith('91'):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+    if len(digits) != 10 or digits[0] not in '6789' or len(set(digits)) == 1:
+        return None
+    return digits
+
+def normalize_aadhar(value):
+    digits = _NOT_DIGITS.sub('', str(value or ''))
+    if len(digits) != 12 or digits[0] in '01' or len(set(digits)) == 1:
+        return None
+    return digits
+
+def blocking_keys(row):
+    """Blocking keys of one farmers row (DUPLICATE_MEMBER_COLUMNS plus aadhar_number and grandfather_name)."""
+    keys = []
+    if row['farmer_id'] is not None:
+        keys.append(('farmer_id', row['farmer_id']))
+    aadhar = normalize_aadhar(row['aadhar_number'])
+    if aadhar:
+        keys.append(('aadhar', aadhar))
+    tokens = name_tokens(row['farmer_name'])
+    mobile = normalize_mobile(row['mobile_number'])
+    if mobile and tokens:
+        keys.append(('mobile_name', mobile, tokens[0]))
+    name, father, village = ' '.join(sorted(tokens)), name_key(row['father_name']), name_key(row['village_name'])
+    if name and father and village:
+        # The grandfather's name (when upstream has it) keeps namesakes in a large village apart
+        keys.append(('name_father_village', name, father, name_key(row.get('grandfather_name')), village))
+    return keys
+
+def find_duplicate_clusters(rows, max_block=DUPLICATE_MAX_BLOCK):
+    """
+    Group rows that look like the same person.
+    rows is a sequence of mappings with 'id' and the fields used by blocking_keys.
+    Returns a list of (sorted member ids, sorted rule names) for every cluster of two or more rows.
+    """
+    blocks = {}
+    for position, row in enumerate(rows):
+        for key in blocking_keys(row):
+            blocks.setdefault(key, []).append(position)
+
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    joined_by = []
+    for key, members in blocks.items():
+        if len(members) < 2 or len(members) > max_block:
+            continue
+        root = find(members[0])
+        for other in members[1:]:
+            other_root = find(other)
+            if other_root != root:
+                parent[other_root] = root
+        joined_by.append((members[0], key[0]))
+
+    clusters = {}
+    for position in range(len(rows)):
+        clusters.setdefault(find(position), []).append(rows[position]['id'])
+    reasons = {}
+    for position, rule in joined_by:
+        reasons.setdefault(find(position), set()).add(rule)
+    return [(sorted(ids), sorted(reasons[root])) for root, ids in clusters.items() if len(ids) > 1]
+
+def build_duplicate_index(conn):
+    """Recompute farmer_duplicates from the farmers table on an open connection; returns summary counts."""
+    start = time.time()
+    rows = [row._mapping for row in conn.execute(text(
+        f"SELECT {DUPLICATE_MEMBER_COLUMNS}, f.aadhar_number, f.grandfather_name FROM farmers f ORDER BY f.id"))]
+    clusters = find_duplicate_clusters(rows)
+    conn.execute(FarmerDuplicate.__table__.delete())
+    members = [
+        {'farmer_row_id': member, 'cluster_id': ids[0], 'reasons': ','.join(reasons)}
+        for ids, reasons in clusters for member in ids
+    ]
+    if members:
+        conn.execute(FarmerDuplicate.__table__.insert(), members)
+    summary = {'clusters': len(clusters), 'farmers': len(members), 'seconds': round(time.time() - start, 2)}
+    print(f"Duplicate farmers: {summary}")
+    return summary
+
+def _clusters_with_members(conn, cluster_rows):
+    """Attach member rows to [(cluster_id, size, reasons), ...]."""
+    if not cluster_rows:
+        return []
+    params = {f"c{n}": row.cluster_id for n, row in enumerate(cluster_rows)}
+    placeholders = ", ".join(f":{name}" for name in params)
+    members = {}
+    for row in conn.execute(text(f"""
+        SELECT d.cluster_id, {DUPLICATE_MEMBER_COLUMNS}
+        FROM farmer_duplicates d JOIN farmers f ON f.id = d.farmer_row_id
+        WHERE d.cluster_id IN ({placeholders})
+        ORDER BY f.id
+    """), params):
+        member = dict(row._mapping)
+        members.setdefault(member.pop('cluster_id'), []).append(member)
+    return [{
+        'cluster_id': row.cluster_id,
+        'size': row.size,
+        'reasons': row.reasons.split(',') if row.reasons else [],
+        'members': members.get(row.cluster_id, []),
+    } for row in cluster_rows]
+
+def get_duplicate_clusters(page=1, per_page=20, reason=None):
+    """
+    Returns (clusters, total) with the largest clusters first.
+    reason limits the clusters to those joined by that rule (one of DUPLICATE_RULES).
+    """
+    try:
+        if reason is not None and reason not in DUPLICATE_RULES:
+            raise ValueError(f"Unknown reason {reason!r}; expected one of: {', '.join(DUPLICATE_RULES)}")
+        where, params = "", {}
+        if reason:
+            # reasons is a short comma-separated list, so match whole names
+            where = "WHERE ',' || reasons || ',' LIKE :reason"
+            params['reason'] = f"%,{reason},%"
+        with engine.connect() as conn:
+            total = conn.execute(text(f"""
+                SELECT COUNT(DISTINCT cluster_id) FROM farmer_duplicates {where}
+            """), params).scalar() or 0
+            cluster_rows = conn.execute(text(f"""
+                SELECT cluster_id, COUNT(*) AS size, MIN(reasons) AS reasons
+                FROM farmer_duplicates {where}
+                GROUP BY cluster_id
+                ORDER BY size DESC, cluster_id
+                LIMIT :limit OFFSET :offset
+            """), dict(params, limit=per_page, offset=(page - 1) * per_page)).fetchall()
+            return _clusters_with_members(conn, cluster_rows), total
+    except Exception:
+        raise
+
+def get_farmer_duplicates(farmer_row_id):
+    """Returns the cluster containing farmers.id farmer_row_id, or None if it has no duplicates."""
+    try:
+        with engine.connect() as conn:
+            cluster_rows = conn.execute(text("""
+                SELECT cluster_id, COUNT(*) AS size, MIN(reasons) AS reasons
+                FROM farmer_duplicates
+                WHERE cluster_id = (SELECT cluster_id FROM farmer_duplicates WHERE farmer_row_id = :id)
+                GROUP BY cluster_id
+            """), {'id': farmer_row_id}).fetchall()
+            clusters = _clusters_with_members(conn, cluster_rows)
+        return clusters[0] if clusters else None
+    except Exception:
+        raise
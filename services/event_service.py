@@ -0,0 +1,155 @@
+"""
+Live dashboard updates, pushed as server-sent events from GET /api/events.
+
+Dashboards used to fetch /api/stats and the listings themselves to see new
+data, one query per client per refresh. Instead each web worker runs one
+publisher thread that looks for changes every EVENTS_POLL_INTERVAL seconds and
+fans each change out to all of the worker's streams as one pre-encoded
+message, so the work is done once per change however many dashboards are open.
+Events:
+
+* stats: the /api/stats numbers (services/stats_service.py). A new stream gets
+  all of them; later events carry only the ones that changed.
+* lands: [{id, farmer_id, version}] of land records edited since the last event.
+* job: the latest ingestion job, when its status or progress changes.
+* reload: ingestion published a new database. The stream then ends and the
+  browser reconnects (under gunicorn, to a worker serving the new file) and
+  gets a fresh snapshot.
+
+The database is only queried when its file changed (db_signature). Each open
+stream holds a server thread while it waits, so EVENTS_MAX_STREAMS caps the
+streams of a worker; further clients get a 503 and retry later. The publisher
+thread starts with a worker's first stream and stops after its last one, so the
+preloaded gunicorn master never runs it.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from models.database import engine, db_signature
+from services.job_service import latest_job
+from services.land_service import LandEdits
+from services.serialization import dumps
+from services.stats_service import get_stats
+
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "2"))
+# Seconds between keep-alive comments on an idle stream; a failed write is how a closed client is noticed
+EVENTS_KEEPALIVE = float(os.getenv("EVENTS_KEEPALIVE", "15"))
+EVENTS_MAX_STREAMS = int(os.getenv("EVENTS_MAX_STREAMS", "100"))
+# Milliseconds the browser waits before reconnecting a dropped stream
+EVENTS_RETRY_MS = 3000
+# Events kept for streams that have not caught up yet
+EVENTS_BACKLOG = 100
+
+class StreamLimitError(Exception):
+    """Raised when a worker already serves EVENTS_MAX_STREAMS streams."""
+
+def sse_message(event, data):
+    """One server-sent event with a JSON payload."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+def _job_state(job):
+    # The heartbeat alone is not news
+    return None if job is None else {key: value for key, value in job.items() if key != 'heartbeat_at'}
+
+class EventPublisher:
+    """Detects changes for all streams of this process and keeps the recent events for them."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.events = deque(maxlen=EVENTS_BACKLOG)  # (seq, event, message)
+        self.seq = 0
+        self.streams = 0
+        self.thread = None
+
+    def publish(self, event, data):
+        message = sse_message(event, data)
+        with self.condition:
+            self.seq += 1
+            self.events.append((self.seq, event, message))
+            self.condition.notify_all()
+
+    def _run(self):
+        signature = stats = lands = job_state = None
+        checked = False
+        while True:
+            with self.condition:
+                if not self.streams:
+                    self.thread = None
+                    return
+            try:
+                job = latest_job()
+                if checked and job is not None and _job_state(job) != job_state:
+                    self.publish('job', job)
+                job_state = _job_state(job)
+
+                current = db_signature()
+                if current is not None and current != signature:
+                    if signature is not None and current[:2] != signature[:2]:
+                        # A new file: everything may have changed, and under gunicorn this worker is replaced
+                        self.publish('reload', {})
+                        stats = lands = None
+                    new_stats = get_stats()
+                    if stats is not None:
+                        changed = {key: value for key, value in new_stats.items() if stats.get(key) != value}
+                        if changed:
+                            self.publish('stats', changed)
+                    with engine.connect() as conn:
+                        if lands is None:
+                            lands = LandEdits(conn)
+                        else:
+                            edited = lands.check(conn)
+                            if edited:
+                                self.publish('lands', {'lands': edited})
+                    signature, stats = current, new_stats
+                checked = True
+            except Exception as e:
+                print(f"Event publisher check failed: {e}")
+            time.sleep(EVENTS_POLL_INTERVAL)
+
+    def check_capacity(self):
+        if self.streams >= EVENTS_MAX_STREAMS:
+            raise StreamLimitError(f"This worker already serves {EVENTS_MAX_STREAMS} event streams")
+
+    def stream(self):
+        """Generator of the messages of one client: a snapshot, then every event until the client leaves."""
+        with self.condition:
+            self.streams += 1
+            cursor = self.seq
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="event-publisher", daemon=True)
+                self.thread.start()
+        try:
+            yield b"retry: %d\n\n" % EVENTS_RETRY_MS
+            yield sse_message('stats', get_stats())
+            job = latest_job()
+            if job is not None:
+                yield sse_message('job', job)
+            while True:
+                with self.condition:
+                    if self.seq == cursor:
+                        self.condition.wait(EVENTS_KEEPALIVE)
+                    missed = bool(self.events) and self.events[0][0] > cursor + 1
+                    pending = [(seq, event, message) for seq, event, message in self.events if seq > cursor]
+                if not pending:
+                    yield b": keepalive\n\n"
+                    continue
+                if missed:
+                    # Fell behind the backlog; the full stats make up for the deltas it lost
+                    yield sse_message('stats', get_stats())
+                for seq, event, message in pending:
+                    cursor = seq
+                    yield message
+                    if event == 'reload':
+                        return
+        finally:
+            with self.condition:
+                self.streams -= 1
+
+publisher = EventPublisher()
+
+def open_stream():
+    """Message generator for a new client. Raises StreamLimitError when this worker is at capacity."""
+    publisher.check_capacity()
+    return publisher.stream()
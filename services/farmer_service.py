@@ -1,71 +1,67 @@
 from models.database import engine
+from models.database import SarsaiArea
 from models.farmer_model import Farmer, FarmerBankDetail
 from models.land_model import LandRecord
-from sqlalchemy import text, inspect
-from datetime import datetime
-from fetch_farmer_data import decrypt_account_no
-import json
-import os
-
-def convert_to_acres(kanal, marle, sarsai):
-    total_sarsai = (kanal * 20 * 9) + (marle * 9) + sarsai
-    return total_sarsai / 1440
-
-def load_bank_data():
-    bank_data_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'js', 'bankId.json')
-    with open(bank_data_path, 'r') as f:
-        bank_list = json.load(f)
-    return {bank['BankId']: bank['BankName'] for bank in bank_list}
-
-bank_id_to_name_map = load_bank_data()
+from models.place_model import PLACE_COLUMNS
+from sqlalchemy import text, inspect, DateTime
+from services.serialization import sql_timestamp, sql_area_kms, sql_place_name
+from services.crypto import decrypt_account_no
+from services.banks import bank_name
+from services.area import convert_to_acres
+from services.land_service import ID_CHUNK_SIZE
+from services.duplicate_service import normalize_aadhar, normalize_mobile
+from services.registry_service import get_snapshot
 
 def get_all_farmers_for_render():
     """
     Returns list of farmer dicts suitable for rendering in templates.
     """
     try:
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            return [_render_dict(*_record_dicts(record)) for record in snapshot]
         with engine.connect() as conn:
-            farmers_result = conn.execute(text("SELECT * FROM farmers")).fetchall()
+            farmers_result = conn.execute(text(f"SELECT {FARMER_SELECT} FROM farmers")).fetchall()
             farmers = []
             for farmer_row in farmers_result:
                 farmer = dict(farmer_row._mapping)
-
-                # Fetch lands
-                lands_result = conn.execute(text("SELECT * FROM land_records WHERE farmer_id = :farmer_id"), {'farmer_id': farmer['farmer_id']}).fetchall()
-                lands = []
-                total_kanal = total_marle = total_sarsai = 0
-                for land_row in lands_result:
-                    land = dict(land_row._mapping)
-                    lands.append(land)
-                    total_kanal += land.get('kanal', 0) or 0
-                    total_marle += land.get('marle', 0) or 0
-                    total_sarsai += land.get('sarsai', 0) or 0
-
-                farmer['lands'] = lands
-                farmer['total_area_acres'] = convert_to_acres(total_kanal, total_marle, total_sarsai)
-
-                # Fetch bank details
-                bank_detail_row = conn.execute(text("SELECT * FROM farmer_bank_details WHERE farmer_id = :farmer_id"), {'farmer_id': farmer['farmer_id']}).fetchone()
-                if bank_detail_row:
-                    bank_detail = dict(bank_detail_row._mapping)
-                    if bank_detail.get('account_no_encrypted'):
-                        bank_detail['account_no'] = decrypt_account_no(bank_detail['account_no_encrypted'])
-                    else:
-                        bank_detail['account_no'] = 'N/A'
-                    bank_detail['bank_name'] = bank_id_to_name_map.get(bank_detail.get('bank_id'), 'Unknown Bank')
-                    farmer['bank_detail'] = bank_detail
-                else:
-                    farmer['bank_detail'] = None
-
-                farmers.append(farmer)
+                lands_result = conn.execute(text(f"SELECT {LAND_SELECT} FROM land_records WHERE farmer_id = :farmer_id"), {'farmer_id': farmer['farmer_id']}).fetchall()
+                bank_detail_row = conn.execute(text(f"SELECT {BANK_SELECT} FROM farmer_bank_details WHERE farmer_id = :farmer_id"), {'farmer_id': farmer['farmer_id']}).fetchone()
+                farmers.append(_render_dict(farmer, [dict(land_row._mapping) for land_row in lands_result],
+                                            _bank_dict(bank_detail_row) if bank_detail_row else None))
             return farmers
     except Exception:
         raise
 
-def get_farmers_api(page=1, per_page=10, search='', source_api='', total_area=''):
+# Output fields of get_farmers_api in response order, and the SQL selecting each
+FARMER_LIST_FIELDS = {
+    'id': "f.id",
+    'farmer_id': "f.farmer_id",
+    'farmer_name': "f.farmer_name",
+    'father_name': "f.father_name",
+    'grandfather_name': "f.grandfather_name",
+    'mobile_number': "f.mobile_number",
+    'aadhar_number': "f.aadhar_number",
+    'village_name': sql_place_name("f.village_id"),
+    'source_api': "f.source_api",
+    'created_at': sql_timestamp("f.created_at"),
+    'updated_at': sql_timestamp("f.updated_at"),
+    'total_land_records': "(SELECT COUNT(*) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) AS total_land_records",
+    'total_land': sql_area_kms("f.owner_area", "total_land"),
+    'area_under_cultivation': sql_area_kms("f.final_owner_area", "area_under_cultivation"),
+}
+# Optional nested sections of each farmer (?include=)
+FARMER_LIST_SECTIONS = ('bank_detail',)
+FARMER_LIST_KEYS = tuple(FARMER_LIST_FIELDS)
+FARMER_LIST_COLUMNS = ", ".join(FARMER_LIST_FIELDS.values())
+FARMER_LIST_BANK_COLUMNS = "fbd.bank_id, fbd.account_holder_name, fbd.account_no_encrypted, fbd.ifsc_code, fbd.branch_name"
+
+def get_farmers_api(page=1, per_page=10, search='', source_api='', total_area='', fields=None, include=None):
     """
     Returns a tuple: (farmers_list, total_farmers, page, per_page)
     where farmers_list is suitable for jsonify in API.
+    fields limits the keys of FARMER_LIST_FIELDS returned ('id' is always kept) and include the
+    sections of FARMER_LIST_SECTIONS; None means all. Omitted fields and sections are not queried.
     """
     try:
         offset = (page - 1) * per_page
@@ -97,54 +93,44 @@ def get_farmers_api(page=1, per_page=10, search='', source_api='', total_area=''
             count_result = conn.execute(text(count_query), params).fetchone()
             total_farmers = count_result[0] if count_result else 0
 
-            query = """
-                SELECT f.id, f.farmer_id, f.farmer_name, f.father_name, f.grandfather_name,
-                       f.mobile_number, f.aadhar_number, f.village_name, f.source_api,
-                       f.created_at, f.updated_at,
-                       f.owner_area, f.final_owner_area,
-                       (SELECT COUNT(*) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) as total_land_records,
-                       (SELECT COALESCE(SUM(lr.kanal), 0) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) as total_kanal,
-                       (SELECT COALESCE(SUM(lr.marle), 0) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) as total_marle,
-                       (SELECT COALESCE(SUM(lr.sarsai), 0) FROM land_records lr WHERE lr.farmer_id = f.farmer_id) as total_sarsai,
-                       fbd.bank_id, fbd.account_holder_name, fbd.account_no_encrypted, fbd.ifsc_code, fbd.branch_name
-                FROM farmers f
-                LEFT JOIN farmer_bank_details fbd ON f.farmer_id = fbd.farmer_id
-            """
+            keys = FARMER_LIST_KEYS if fields is None else tuple(key for key in FARMER_LIST_KEYS if key in fields or key == 'id')
+            with_bank = include is None or 'bank_detail' in include
+            columns = ", ".join(FARMER_LIST_FIELDS[key] for key in keys)
+            if with_bank:
+                query = f"""
+                    SELECT {columns}, {FARMER_LIST_BANK_COLUMNS}
+                    FROM farmers f
+                    LEFT JOIN farmer_bank_details fbd ON f.farmer_id = fbd.farmer_id
+                """
+            else:
+                query = f"SELECT {columns} FROM farmers f"
 
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
             
-            query += f" GROUP BY f.id ORDER BY f.id LIMIT {per_page} OFFSET {offset}"
+            if with_bank:
+                query += " GROUP BY f.id"
+            query += f" ORDER BY f.id LIMIT {per_page} OFFSET {offset}"
 
             result = conn.execute(text(query), params)
 
             farmers = []
+            bank_start = len(keys)
             for row in result:
-                farmer = {
-                    'id': row.id,
-                    'farmer_id': row.farmer_id,
-                    'farmer_name': row.farmer_name,
-                    'father_name': row.father_name,
-                    'grandfather_name': row.grandfather_name,
-                    'mobile_number': row.mobile_number,
-                    'aadhar_number': row.aadhar_number,
-                    'village_name': row.village_name,
-                    'source_api': row.source_api,
-                    'created_at': datetime.strptime(row.created_at, '%Y-%m-%d %H:%M:%S.%f').strftime('%Y-%m-%d %H:%M:%S') if isinstance(row.created_at, str) else (row.created_at.strftime('%Y-%m-%d %H:%M:%S') if row.created_at else None),
-                    'updated_at': datetime.strptime(row.updated_at, '%Y-%m-%d %H:%M:%S.%f').strftime('%Y-%m-%d %H:%M:%S') if isinstance(row.updated_at, str) else (row.updated_at.strftime('%Y-%m-%d %H:%M:%S') if row.updated_at else None),
-                    'total_land_records': row.total_land_records or 0,
-                    'total_land': row.owner_area,
-                    'area_under_cultivation': row.final_owner_area,
-                    'bank_detail': None
-                }
-                if row.account_no_encrypted:
+                farmer = dict(zip(keys, row))
+                if not with_bank:
+                    farmers.append(farmer)
+                    continue
+                bank_id, account_holder_name, account_no_encrypted, ifsc_code, branch_name = row[bank_start:]
+                farmer['bank_detail'] = None
+                if account_no_encrypted:
                     farmer['bank_detail'] = {
-                        'bank_id': row.bank_id,
-                        'account_holder_name': row.account_holder_name,
-                        'account_no': decrypt_account_no(row.account_no_encrypted),
-                        'ifsc_code': row.ifsc_code,
-                        'branch_name': row.branch_name,
-                        'bank_name': bank_id_to_name_map.get(row.bank_id, 'Unknown Bank')
+                        'bank_id': bank_id,
+                        'account_holder_name': account_holder_name,
+                        'account_no': decrypt_account_no(account_no_encrypted),
+                        'ifsc_code': ifsc_code,
+                        'branch_name': branch_name,
+                        'bank_name': bank_name(bank_id)
                     }
                 farmers.append(farmer)
 
@@ -152,113 +138,304 @@ def get_farmers_api(page=1, per_page=10, search='', source_api='', total_area=''
     except Exception:
         raise
 
-def get_farmer_by_id(farmer_id):
+# Replacement values for NULL land columns in get_farmer_by_id
+LAND_NULL_DEFAULTS = {}
+for _key in ['owner_name', 'village_name', 'city_name', 'district_name',
+             'area_type', 'khewat_no', 'khasra_no', 'period', 'source_api']:
+    LAND_NULL_DEFAULTS[_key] = ''
+for _key in ['land_owner_area_k', 'land_owner_area_m', 'land_owner_area_sarsai',
+             'kanal', 'marle', 'sarsai', 'kanal1', 'marle1', 'sarsai1']:
+    LAND_NULL_DEFAULTS[_key] = 0.0
+for _key in ['owner_type', 'type', 'mapped_area', 'license_id', 'verify_status',
+             'commodity_id', 'min_land', 'auction']:
+    LAND_NULL_DEFAULTS[_key] = 0
+
+def column_selects(model, null_defaults=None):
+    """
+    Return {output name: SELECT expression} for a model, formatted by SQLite: timestamps as text, place ids
+    as their names (district_id as district_name), sarsai areas as 'K/M/S' and NULLs as their null_defaults.
+    """
+    null_defaults = null_defaults or {}
+    selects = {}
+    for col in inspect(model).columns:
+        if isinstance(col.type, DateTime):
+            selects[col.name] = sql_timestamp(col.name)
+        elif isinstance(col.type, SarsaiArea):
+            selects[col.name] = sql_area_kms(col.name)
+        elif col.name in PLACE_COLUMNS:
+            name = PLACE_COLUMNS[col.name]
+            selects[name] = sql_place_name(col.name, default=null_defaults.get(name))
+        elif col.name in null_defaults:
+            selects[col.name] = f"COALESCE({col.name}, {null_defaults[col.name]!r}) AS {col.name}"
+        else:
+            selects[col.name] = col.name
+    return selects
+
+FARMER_FIELDS = column_selects(Farmer)
+FARMER_SELECT = ", ".join(FARMER_FIELDS.values())
+LAND_FIELDS = column_selects(LandRecord, LAND_NULL_DEFAULTS)
+LAND_SELECT = ", ".join(LAND_FIELDS.values())
+BANK_FIELDS = column_selects(FarmerBankDetail)
+BANK_SELECT = ", ".join(BANK_FIELDS.values())
+BANK_COLUMNS = tuple(BANK_FIELDS)
+
+# Fields and nested sections of get_farmer_by_id, selectable with ?fields= / ?include= / ?land_fields=
+FARMER_DETAIL_FIELDS = tuple(FARMER_FIELDS) + ('land_count',)
+FARMER_DETAIL_SECTIONS = ('lands', 'bank_detail')
+LAND_DETAIL_FIELDS = tuple(LAND_FIELDS)
+LAND_FIELD_POSITIONS = {key: position for position, key in enumerate(LAND_FIELDS)}
+LAND_COUNT_SELECT = "(SELECT COUNT(*) FROM land_records lr WHERE lr.farmer_id = farmers.farmer_id) AS land_count"
+
+def _detail_selects(fields, include):
+    """Farmer keys, read columns and SELECT expressions for a detail field selection (see get_farmer_by_id)."""
+    keys = FARMER_DETAIL_FIELDS if fields is None else tuple(
+        key for key in FARMER_DETAIL_FIELDS if key in fields or key == 'id')
+    with_lands = include is None or 'lands' in include
+    # farmer_id is the join key for the sections, so it is always read
+    columns = [key for key in keys if key in FARMER_FIELDS]
+    if 'farmer_id' not in columns:
+        columns.append('farmer_id')
+    selects = [FARMER_FIELDS[key] for key in columns]
+    if 'land_count' in keys and not with_lands:
+        columns.append('land_count')
+        selects.append(LAND_COUNT_SELECT)
+    return keys, columns, selects
+
+def _land_keys(land_fields):
+    return LAND_DETAIL_FIELDS if land_fields is None else tuple(
+        key for key in LAND_DETAIL_FIELDS if key in land_fields or key == 'id')
+
+def _bank_dict(bank_detail_row):
+    bank_detail = dict(zip(BANK_COLUMNS, bank_detail_row))
+    if bank_detail.get('account_no_encrypted'):
+        bank_detail['account_no'] = decrypt_account_no(bank_detail['account_no_encrypted'])
+    else:
+        bank_detail['account_no'] = 'N/A'
+    return bank_detail
+
+def get_farmer_by_id(farmer_id, fields=None, include=None, land_fields=None):
     """
     Returns a detailed farmer dict (including lands and bank detail) for API use.
-    Raises if not found.
+    Returns None if not found.
+    fields limits the farmer keys (FARMER_DETAIL_FIELDS, 'id' always kept), include the sections
+    (FARMER_DETAIL_SECTIONS) and land_fields the keys of each land; None means all.
+    Sections that are not included are neither queried nor decrypted.
+    Read from the registry snapshot when one is loaded (services/registry_service.py).
     """
     try:
+        keys, columns, selects = _detail_selects(fields, include)
+        with_lands = include is None or 'lands' in include
+        with_bank = include is None or 'bank_detail' in include
+
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            record = snapshot.get(farmer_id)
+            if record is None:
+                return None
+            values, lands, bank = record
+            row = dict(zip(FARMER_FIELDS, values))
+            if 'land_count' in columns:
+                row['land_count'] = len(lands)
+            farmer = {key: row[key] for key in keys if key in row}
+            if with_lands:
+                land_keys = _land_keys(land_fields)
+                positions = [LAND_FIELD_POSITIONS[key] for key in land_keys]
+                farmer['lands'] = [{key: land[position] for key, position in zip(land_keys, positions)}
+                                   for land in lands]
+                if 'land_count' in keys:
+                    farmer['land_count'] = len(lands)
+            if with_bank:
+                farmer['bank_detail'] = _bank_dict(bank) if bank else None
+            return farmer
+
         with engine.connect() as conn:
-            farmer_row = conn.execute(text("""
-                SELECT {}
+            farmer_row = conn.execute(text(f"""
+                SELECT {", ".join(selects)}
                 FROM farmers
                 WHERE id = :id
-            """.format(", ".join([col.name for col in inspect(Farmer).columns]))), {'id': farmer_id}).fetchone()
+            """), {'id': farmer_id}).fetchone()
             
             if not farmer_row:
                 return None
 
-            farmer = {col.name: getattr(farmer_row, col.name) for col in inspect(Farmer).columns}
-            for key, value in farmer.items():
-                if isinstance(value, datetime):
-                    farmer[key] = value.strftime('%Y-%m-%d %H:%M:%S')
-
-            lands_result = conn.execute(text("""
-                SELECT {}
-                FROM land_records
-                WHERE farmer_id = :farmer_id
-            """.format(", ".join([col.name for col in inspect(LandRecord).columns]))),
-                {'farmer_id': farmer['farmer_id']}
-            ).fetchall()
-
-            lands = []
-            for land_row in lands_result:
-                land_data = {col.name: getattr(land_row, col.name) for col in inspect(LandRecord).columns}
-                for key, value in land_data.items():
-                    if isinstance(value, datetime):
-                        land_data[key] = value.strftime('%Y-%m-%d %H:%M:%S')
-                    elif value is None:
-                        if key in ['owner_name', 'village_name', 'city_name', 'district_name',
-                                  'area_type', 'khewat_no', 'khasra_no', 'period', 'source_api']:
-                            land_data[key] = ''
-                        elif key in ['land_owner_area_k', 'land_owner_area_m', 'land_owner_area_sarsai',
-                                    'kanal', 'marle', 'sarsai', 'kanal1', 'marle1', 'sarsai1']:
-                            land_data[key] = 0.0
-                        elif key in ['owner_type', 'type', 'mapped_area', 'license_id', 'verify_status',
-                                    'commodity_id', 'min_land', 'auction']:
-                            land_data[key] = 0
-                lands.append(land_data)
-
-            farmer['lands'] = lands
-
-            bank_detail_row = conn.execute(text("""
-                SELECT {}
-                FROM farmer_bank_details
-                WHERE farmer_id = :farmer_id
-            """.format(", ".join([col.name for col in inspect(FarmerBankDetail).columns]))),
-                {'farmer_id': farmer['farmer_id']}
-            ).fetchone()
-
-            if bank_detail_row:
-                bank_detail = {col.name: getattr(bank_detail_row, col.name) for col in inspect(FarmerBankDetail).columns}
-                if bank_detail.get('account_no_encrypted'):
-                    bank_detail['account_no'] = decrypt_account_no(bank_detail['account_no_encrypted'])
-                else:
-                    bank_detail['account_no'] = 'N/A'
-                farmer['bank_detail'] = bank_detail
-            else:
-                farmer['bank_detail'] = None
+            row = dict(zip(columns, farmer_row))
+            upstream_id = row['farmer_id']
+            farmer = {key: row[key] for key in keys if key in row}
+
+            if with_lands:
+                land_keys = _land_keys(land_fields)
+                lands_result = conn.execute(text(f"""
+                    SELECT {", ".join(LAND_FIELDS[key] for key in land_keys)}
+                    FROM land_records
+                    WHERE farmer_id = :farmer_id
+                """),
+                    {'farmer_id': upstream_id}
+                )
+
+                lands = [dict(zip(land_keys, land_row)) for land_row in lands_result]
+
+                farmer['lands'] = lands
+                if 'land_count' in keys:
+                    farmer['land_count'] = len(lands)
+
+            if with_bank:
+                bank_detail_row = conn.execute(text(f"""
+                    SELECT {BANK_SELECT}
+                    FROM farmer_bank_details
+                    WHERE farmer_id = :farmer_id
+                """),
+                    {'farmer_id': upstream_id}
+                ).fetchone()
+
+                farmer['bank_detail'] = _bank_dict(bank_detail_row) if bank_detail_row else None
 
             return farmer
     except Exception:
         raise
 
+# Lookup lists accepted by get_farmers_batch and the farmers column each one matches (all indexed)
+FARMER_LOOKUP_COLUMNS = {
+    'ids': 'id',
+    'farmer_ids': 'farmer_id',
+    'aadhar_numbers': 'aadhar_number',
+    'mobile_numbers': 'mobile_number',
+}
+MAX_FARMER_LOOKUPS = 5000
+
+def _lookup_candidates(lookup, value):
+    """Stored values that a requested value may match: ints for ids, raw and normalized text for numbers."""
+    if lookup in ('ids', 'farmer_ids'):
+        if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().isdigit():
+            raise ValueError(f"'{lookup}' must contain integers, got {value!r}")
+        return {int(value)}
+    if not isinstance(value, (int, str)):
+        raise ValueError(f"'{lookup}' must contain strings, got {value!r}")
+    normalize = normalize_aadhar if lookup == 'aadhar_numbers' else normalize_mobile
+    return {candidate for candidate in (str(value).strip(), normalize(value)) if candidate}
+
+def _chunked_in(conn, sql, column, values, params=None):
+    """Run sql (with an {in} placeholder for `column IN (...)`) once per ID_CHUNK_SIZE values; yields rows."""
+    values = list(values)
+    for i in range(0, len(values), ID_CHUNK_SIZE):
+        chunk = values[i:i + ID_CHUNK_SIZE]
+        chunk_params = {f"v{n}": value for n, value in enumerate(chunk)}
+        placeholders = ", ".join(f":{name}" for name in chunk_params)
+        yield from conn.execute(text(sql.format(**{'in': f"{column} IN ({placeholders})"})),
+                                dict(params or {}, **chunk_params))
+
+def get_farmers_batch(lookups, fields=None, include=None, land_fields=None):
+    """
+    Resolve many farmers at once. lookups maps FARMER_LOOKUP_COLUMNS keys to lists of values:
+    'ids' (farmers.id), 'farmer_ids' (upstream FarmerId), 'aadhar_numbers' and 'mobile_numbers'
+    (matched as given and as digits only). fields, include and land_fields select as in get_farmer_by_id.
+    Returns {'farmers': [...], 'matches': {lookup: {value: [farmers.id, ...]}}, 'not_found': {lookup: [value, ...]}}
+    with every farmer once, ordered by id. Raises ValueError for unknown lookups or malformed values.
+    Every section is read with a few set-based IN queries, whatever the number of farmers.
+    """
+    try:
+        unknown = sorted(set(lookups) - set(FARMER_LOOKUP_COLUMNS))
+        if unknown:
+            raise ValueError(f"Unknown lookup(s) {', '.join(unknown)}; allowed: {', '.join(FARMER_LOOKUP_COLUMNS)}")
+        candidates = {}
+        for lookup, values in lookups.items():
+            if not isinstance(values, list):
+                raise ValueError(f"'{lookup}' must be a list")
+            by_candidate = candidates[lookup] = {}
+            for value in values:
+                for candidate in _lookup_candidates(lookup, value):
+                    by_candidate.setdefault(candidate, []).append(value)
+
+        keys, columns, selects = _detail_selects(fields, include)
+        with_lands = include is None or 'lands' in include
+        with_bank = include is None or 'bank_detail' in include
+        matches = {lookup: {} for lookup in lookups}
+        rows = {}
+
+        with engine.connect() as conn:
+            for lookup, by_candidate in candidates.items():
+                column = FARMER_LOOKUP_COLUMNS[lookup]
+                sql = f"SELECT {column} AS lookup_value, {', '.join(selects)} FROM farmers WHERE {{in}}"
+                for farmer_row in _chunked_in(conn, sql, column, by_candidate):
+                    row = dict(zip(columns, farmer_row[1:]))
+                    rows[row['id']] = row
+                    for value in by_candidate[farmer_row[0]]:
+                        ids = matches[lookup].setdefault(str(value), [])
+                        if row['id'] not in ids:
+                            ids.append(row['id'])
+
+            upstream_ids = {row['farmer_id'] for row in rows.values() if row['farmer_id'] is not None}
+            lands_by_farmer, bank_by_farmer = {}, {}
+            if with_lands and upstream_ids:
+                land_keys = _land_keys(land_fields)
+                land_selects = ", ".join(LAND_FIELDS[key] for key in land_keys)
+                sql = f"SELECT farmer_id, {land_selects} FROM land_records WHERE {{in}}"
+                for land_row in _chunked_in(conn, sql, 'farmer_id', upstream_ids):
+                    lands_by_farmer.setdefault(land_row[0], []).append(dict(zip(land_keys, land_row[1:])))
+            if with_bank and upstream_ids:
+                sql = f"SELECT {BANK_SELECT} FROM farmer_bank_details WHERE {{in}}"
+                for bank_detail_row in _chunked_in(conn, sql, 'farmer_id', upstream_ids):
+                    bank_detail = _bank_dict(bank_detail_row)
+                    bank_by_farmer[bank_detail['farmer_id']] = bank_detail
+
+        farmers = []
+        for farmer_row_id in sorted(rows):
+            row = rows[farmer_row_id]
+            farmer = {key: row[key] for key in keys if key in row}
+            if with_lands:
+                # Farmers listed by several sources share their upstream land records
+                farmer['lands'] = lands_by_farmer.get(row['farmer_id'], [])
+                if 'land_count' in keys:
+                    farmer['land_count'] = len(farmer['lands'])
+            if with_bank:
+                farmer['bank_detail'] = bank_by_farmer.get(row['farmer_id'])
+            farmers.append(farmer)
+
+        not_found = {}
+        for lookup, values in lookups.items():
+            missing = [value for value in values if str(value) not in matches[lookup]]
+            if missing:
+                not_found[lookup] = missing
+        return {'farmers': farmers, 'matches': matches, 'not_found': not_found}
+    except Exception:
+        raise
+
+def _record_dicts(record):
+    """Farmer dict, land dicts and bank detail dict (or None) of a registry snapshot record."""
+    values, lands, bank = record
+    return (dict(zip(FARMER_FIELDS, values)), [dict(zip(LAND_FIELDS, land)) for land in lands],
+            _bank_dict(bank) if bank else None)
+
+def _render_dict(farmer, lands, bank_detail):
+    """Adds the lands, their total area and the bank detail (with the bank's name) to a farmer dict."""
+    total_kanal = total_marle = total_sarsai = 0
+    for land in lands:
+        total_kanal += land.get('kanal', 0) or 0
+        total_marle += land.get('marle', 0) or 0
+        total_sarsai += land.get('sarsai', 0) or 0
+    farmer['lands'] = lands
+    farmer['total_area_acres'] = convert_to_acres(total_kanal, total_marle, total_sarsai)
+    if bank_detail is not None:
+        bank_detail['bank_name'] = bank_name(bank_detail.get('bank_id'))
+    farmer['bank_detail'] = bank_detail
+    return farmer
+
 def get_farmer_for_render(farmer_id):
     """
     Returns a farmer dict prepared for rendering (similar to profile route).
     """
     try:
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            record = snapshot.get(farmer_id)
+            return _render_dict(*_record_dicts(record)) if record else None
         with engine.connect() as conn:
-            farmer_row = conn.execute(text("SELECT * FROM farmers WHERE id = :id"), {'id': farmer_id}).fetchone()
+            farmer_row = conn.execute(text(f"SELECT {FARMER_SELECT} FROM farmers WHERE id = :id"), {'id': farmer_id}).fetchone()
             if not farmer_row:
                 return None
             farmer = dict(farmer_row._mapping)
-
-            lands_result = conn.execute(text("SELECT * FROM land_records WHERE farmer_id = :farmer_id"), {'farmer_id': farmer['farmer_id']}).fetchall()
-            lands = []
-            total_kanal = total_marle = total_sarsai = 0
-            for land_row in lands_result:
-                land = dict(land_row._mapping)
-                lands.append(land)
-                total_kanal += land.get('kanal', 0) or 0
-                total_marle += land.get('marle', 0) or 0
-                total_sarsai += land.get('sarsai', 0) or 0
-
-            farmer['lands'] = lands
-            farmer['total_area_acres'] = convert_to_acres(total_kanal, total_marle, total_sarsai)
-
-            bank_detail_row = conn.execute(text("SELECT * FROM farmer_bank_details WHERE farmer_id = :farmer_id"), {'farmer_id': farmer['farmer_id']}).fetchone()
-            if bank_detail_row:
-                bank_detail = dict(bank_detail_row._mapping)
-                if bank_detail.get('account_no_encrypted'):
-                    bank_detail['account_no'] = decrypt_account_no(bank_detail['account_no_encrypted'])
-                else:
-                    bank_detail['account_no'] = 'N/A'
-                bank_detail['bank_name'] = bank_id_to_name_map.get(bank_detail.get('bank_id'), 'Unknown Bank')
-                farmer['bank_detail'] = bank_detail
-            else:
-                farmer['bank_detail'] = None
-
-            return farmer
+            lands_result = conn.execute(text(f"SELECT {LAND_SELECT} FROM land_records WHERE farmer_id = :farmer_id"), {'farmer_id': farmer['farmer_id']}).fetchall()
+            bank_detail_row = conn.execute(text(f"SELECT {BANK_SELECT} FROM farmer_bank_details WHERE farmer_id = :farmer_id"), {'farmer_id': farmer['farmer_id']}).fetchone()
+            return _render_dict(farmer, [dict(land_row._mapping) for land_row in lands_result],
+                                _bank_dict(bank_detail_row) if bank_detail_row else None)
     except Exception:
         raise
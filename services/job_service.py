@@ -0,0 +1,198 @@
+"""
+Ingestion jobs started from the web app.
+
+A job runs fetch_farmer_data.run_ingest in its own worker process
+(ingest_job.py), so a web worker only inserts a row and spawns the process.
+The worker records its heartbeat, progress and outcome in data/jobs.db,
+which the API reads back; job state survives app restarts and the worker is
+not tied to the web worker that started it.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import text, exc
+
+from models.job_model import JobBase, jobs_engine, JOBS_DB_PATH
+
+JOB_KINDS = ('full', 'incremental')
+# A queued or running job whose worker has not written a heartbeat for this long is marked failed
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "60"))
+JOB_LOG_DIR = JOBS_DB_PATH.parent / "jobs"
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+JOB_COLUMNS = ("id, kind, status, workers, pid, cancel_requested, created_at, started_at, finished_at, "
+               "heartbeat_at, progress, result, error")
+
+class JobConflictError(Exception):
+    """Raised when a job is started while another one is queued or running."""
+
+_schema_ready = False
+
+def ensure_jobs_schema():
+    global _schema_ready
+    if not _schema_ready:
+        JobBase.metadata.create_all(jobs_engine)
+        _schema_ready = True
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+def job_dict(row):
+    job = dict(row._mapping)
+    for key in ('created_at', 'started_at', 'finished_at', 'heartbeat_at'):
+        job[key] = _iso(job[key])
+    for key in ('progress', 'result'):
+        job[key] = json.loads(job[key]) if job[key] else None
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    return job
+
+def expire_stale_jobs(conn):
+    """Fail active jobs whose worker died (crash, reboot) without recording an outcome."""
+    now = time.time()
+    conn.execute(text("""
+        UPDATE ingest_jobs
+        SET status = 'failed', active = NULL, finished_at = :now,
+            error = 'Worker stopped responding'
+        WHERE active = 1 AND COALESCE(heartbeat_at, created_at) < :cutoff
+    """), {'now': now, 'cutoff': now - JOB_STALE_AFTER})
+
+def _spawn_worker(job_id, log_path):
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    kwargs = {}
+    if os.name == 'posix':
+        # Own session: the job keeps running when the web worker that started it is recycled
+        kwargs['start_new_session'] = True
+    else:
+        kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+    with open(log_path, 'ab') as log:
+        process = subprocess.Popen([sys.executable, str(REPO_ROOT / 'ingest_job.py'), str(job_id)],
+                                   cwd=REPO_ROOT, env=dict(os.environ, PYTHONUNBUFFERED='1'),
+                                   stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, **kwargs)
+    # Reap the child when it exits so it does not linger as a zombie
+    threading.Thread(target=process.wait, daemon=True).start()
+    return process.pid
+
+def start_job(kind, workers=None):
+    """Queue a job and start its worker process. Raises JobConflictError if one is already active."""
+    try:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}; expected one of: {', '.join(JOB_KINDS)}")
+        ensure_jobs_schema()
+        now = time.time()
+        with jobs_engine.begin() as conn:
+            expire_stale_jobs(conn)
+            try:
+                job_id = conn.execute(text("""
+                    INSERT INTO ingest_jobs (kind, status, active, workers, cancel_requested, created_at, heartbeat_at)
+                    VALUES (:kind, 'queued', 1, :workers, 0, :now, :now)
+                """), {'kind': kind, 'workers': workers, 'now': now}).lastrowid
+            except exc.IntegrityError:
+                raise JobConflictError("An ingestion job is already queued or running") from None
+
+        log_path = JOB_LOG_DIR / f"job_{job_id}.log"
+        try:
+            pid = _spawn_worker(job_id, log_path)
+        except OSError as e:
+            finish_job(job_id, 'failed', error=f"Could not start worker: {e}")
+            raise
+        with jobs_engine.begin() as conn:
+            conn.execute(text("UPDATE ingest_jobs SET pid = COALESCE(pid, :pid), log_path = :log WHERE id = :id"),
+                         {'pid': pid, 'log': str(log_path), 'id': job_id})
+        return get_job(job_id)
+    except Exception:
+        raise
+
+def get_job(job_id):
+    try:
+        ensure_jobs_schema()
+        with jobs_engine.begin() as conn:
+            expire_stale_jobs(conn)
+            row = conn.execute(text(f"SELECT {JOB_COLUMNS} FROM ingest_jobs WHERE id = :id"), {'id': job_id}).first()
+        return job_dict(row) if row else None
+    except Exception:
+        raise
+
+def list_jobs(limit=20):
+    try:
+        ensure_jobs_schema()
+        with jobs_engine.begin() as conn:
+            expire_stale_jobs(conn)
+            rows = conn.execute(text(f"SELECT {JOB_COLUMNS} FROM ingest_jobs ORDER BY id DESC LIMIT :limit"),
+                                {'limit': limit})
+            return [job_dict(row) for row in rows]
+    except Exception:
+        raise
+
+def latest_job():
+    """The most recent job, or None. Only writes when that job looks stale, so it is cheap to call often."""
+    try:
+        ensure_jobs_schema()
+        with jobs_engine.connect() as conn:
+            row = conn.execute(text(f"SELECT {JOB_COLUMNS} FROM ingest_jobs ORDER BY id DESC LIMIT 1")).first()
+        if row is None:
+            return None
+        cutoff = time.time() - JOB_STALE_AFTER
+        if row.status in ('queued', 'running') and (row.heartbeat_at or row.created_at) < cutoff:
+            return get_job(row.id)
+        return job_dict(row)
+    except Exception:
+        raise
+
+def cancel_job(job_id):
+    """Ask the worker of an active job to stop. Returns the job, or None if it does not exist."""
+    try:
+        ensure_jobs_schema()
+        with jobs_engine.begin() as conn:
+            conn.execute(text("UPDATE ingest_jobs SET cancel_requested = 1 WHERE id = :id AND active = 1"),
+                         {'id': job_id})
+        return get_job(job_id)
+    except Exception:
+        raise
+
+# Worker side (ingest_job.py)
+
+def claim_job(job_id, pid):
+    """Mark a queued job as running in this process; returns the job, or None if it is not queued."""
+    ensure_jobs_schema()
+    now = time.time()
+    with jobs_engine.begin() as conn:
+        claimed = conn.execute(text("""
+            UPDATE ingest_jobs SET status = 'running', pid = :pid, started_at = :now, heartbeat_at = :now
+            WHERE id = :id AND status = 'queued'
+        """), {'pid': pid, 'now': now, 'id': job_id}).rowcount
+    return get_job(job_id) if claimed else None
+
+def heartbeat(job_id, progress=None):
+    """Record that the worker is alive (and its progress); returns True if cancellation was requested."""
+    with jobs_engine.begin() as conn:
+        params = {'now': time.time(), 'id': job_id}
+        if progress is not None:
+            params['progress'] = json.dumps(progress)
+            conn.execute(text("UPDATE ingest_jobs SET heartbeat_at = :now, progress = :progress WHERE id = :id"),
+                         params)
+        else:
+            conn.execute(text("UPDATE ingest_jobs SET heartbeat_at = :now WHERE id = :id"), params)
+        return bool(conn.execute(text("SELECT cancel_requested FROM ingest_jobs WHERE id = :id"),
+                                 {'id': job_id}).scalar())
+
+def finish_job(job_id, status, result=None, error=None, progress=None):
+    with jobs_engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE ingest_jobs
+            SET status = :status, active = NULL, finished_at = :now, heartbeat_at = :now,
+                result = :result, error = :error, progress = COALESCE(:progress, progress)
+            WHERE id = :id
+        """), {
+            'status': status,
+            'now': time.time(),
+            'result': json.dumps(result) if result is not None else None,
+            'error': error,
+            'progress': json.dumps(progress) if progress is not None else None,
+            'id': job_id,
+        })
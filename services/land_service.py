@@ -1,6 +1,8 @@
+import math
 from models.database import engine
 from sqlalchemy import text
-from datetime import datetime
+from datetime import datetime, timedelta
+from services.serialization import sql_timestamp, sql_float, sql_place_name, rows_as_dicts
 
 def format_datetime(dt_value):
     """Helper function to format datetime values"""
@@ -17,92 +19,91 @@ def format_datetime(dt_value):
     else:
         return str(dt_value)
 
-def get_lands_api(page=1, per_page=10, search=''):
+# Output fields of get_lands_api and the SQL selecting each, already coerced and formatted by SQLite
+LAND_LIST_FIELDS = {
+    'id': "lr.id",
+    'farmer_id': "lr.farmer_id",
+    'sr_no': "lr.sr_no",
+    'owner_name': "lr.owner_name",
+    'district_name': sql_place_name("lr.district_id"),
+    'city_name': sql_place_name("lr.city_id"),
+    'village_name': sql_place_name("lr.village_id"),
+    'khewat_no': "lr.khewat_no",
+    'kanal': sql_float("lr.kanal"),
+    'marle': sql_float("lr.marle"),
+    'sarsai': sql_float("lr.sarsai"),
+    'land_owner_area_k': sql_float("lr.land_owner_area_k"),
+    'land_owner_area_m': sql_float("lr.land_owner_area_m"),
+    'land_owner_area_sarsai': sql_float("lr.land_owner_area_sarsai"),
+    'type': "lr.type",
+    'min_land': "lr.min_land",
+    'status': "lr.verify_status AS status",
+    'version': "lr.version",
+    'created_at': sql_timestamp("lr.created_at"),
+    'updated_at': sql_timestamp("lr.updated_at"),
+}
+# Optional sections (?include=): 'farmer' adds the owning farmer's name and phone
+LAND_LIST_SECTIONS = ('farmer',)
+LAND_FARMER_COLUMNS = "COALESCE(NULLIF(f.farmer_name, ''), 'Unknown Farmer') AS farmer_name, f.mobile_number AS farmer_phone"
+LAND_LIST_COLUMNS = ", ".join(list(LAND_LIST_FIELDS.values()) + [LAND_FARMER_COLUMNS])
+# A farmer listed by several sources has several rows; join only the first so lands are not repeated
+LAND_FARMER_JOIN = "LEFT JOIN farmers f ON f.id = (SELECT MIN(id) FROM farmers WHERE farmer_id = lr.farmer_id)"
+LAND_SEARCH_COLUMNS = ['owner_name', 'sr_no']
+# Place names are matched once in the places table, then by id
+LAND_SEARCH_PLACES = ['village_id', 'district_id', 'city_id']
+
+def get_lands_api(page=1, per_page=10, search='', fields=None, include=None):
     """
     Returns (lands_list, total_lands, page, per_page)
+    fields limits the keys of LAND_LIST_FIELDS returned ('id' is always kept) and include the
+    sections of LAND_LIST_SECTIONS; None means all. The farmers join is skipped when not needed.
     """
     try:
         offset = (page - 1) * per_page
         search = (search or '').lower()
+        keys = tuple(LAND_LIST_FIELDS) if fields is None else tuple(
+            key for key in LAND_LIST_FIELDS if key in fields or key == 'id')
+        with_farmer = include is None or 'farmer' in include
+        # Search also matches the farmer's name, so it needs the join even when the section is omitted
+        join = LAND_FARMER_JOIN if (with_farmer or search) else ""
 
-        with engine.connect() as conn:
-            count_query = """
-                SELECT COUNT(*) as total 
-                FROM land_records lr
-                LEFT JOIN farmers f ON lr.farmer_id = f.farmer_id
-            """
-            if search:
-                search_condition = " OR ".join([
-                    f"LOWER(lr.{col}) LIKE :search" 
-                    for col in ['owner_name', 'village_name', 'sr_no', 'district_name', 'city_name']
-                ] + [
-                    "LOWER(f.farmer_name) LIKE :search"
-                ])
-                if search_condition:
-                    count_query += f" WHERE {search_condition}"
+        where = ""
+        params = {}
+        if search:
+            search_condition = " OR ".join([
+                f"LOWER(lr.{col}) LIKE :search" 
+                for col in LAND_SEARCH_COLUMNS
+            ] + [
+                f"lr.{col} IN (SELECT id FROM places WHERE LOWER(name) LIKE :search)"
+                for col in LAND_SEARCH_PLACES
+            ] + [
+                "LOWER(f.farmer_name) LIKE :search"
+            ])
+            where = f" WHERE {search_condition}"
+            params['search'] = f"%{search}%"
 
+        with engine.connect() as conn:
+            # The farmer join never adds or removes rows, so the count only needs it to search
+            count_join = LAND_FARMER_JOIN if search else ""
             count_result = conn.execute(
-                text(count_query),
-                {"search": f"%{search}%" if search else "%%"}
+                text(f"SELECT COUNT(*) as total FROM land_records lr {count_join}{where}"),
+                params
             ).fetchone()
             total_lands = count_result[0] if count_result else 0
 
-            query = """
-                SELECT lr.id, lr.farmer_id, lr.sr_no, lr.district_name, lr.city_name, lr.village_name, 
-                       lr.owner_name, lr.khewat_no, lr.kanal, lr.marle, lr.sarsai, lr.type, lr.min_land,
-                       lr.land_owner_area_k, lr.land_owner_area_m, lr.land_owner_area_sarsai, 
-                       lr.verify_status as status, lr.created_at, lr.updated_at,
-                       f.farmer_name, f.mobile_number as farmer_phone
+            columns = [LAND_LIST_FIELDS[key] for key in keys]
+            if with_farmer:
+                columns.append(LAND_FARMER_COLUMNS)
+            query = f"""
+                SELECT {", ".join(columns)}
                 FROM land_records lr
-                LEFT JOIN farmers f ON lr.farmer_id = f.farmer_id
+                {join}
             """
-
-            if search:
-                search_condition_lands = " OR ".join([
-                    f"LOWER(lr.{col}) LIKE :search" 
-                    for col in ['owner_name', 'village_name', 'sr_no', 'district_name', 'city_name']
-                ] + [
-                    "LOWER(f.farmer_name) LIKE :search"
-                ])
-                if search_condition_lands:
-                    query += f" WHERE {search_condition_lands}"
-
+            query += where
             query += f" ORDER BY lr.id LIMIT {per_page} OFFSET {offset}"
 
-            result = conn.execute(
-                text(query),
-                {"search": f"%{search}%" if search else "%%"}
-            )
-
-            lands = []
-            for row in result:
-                try:
-                    land = {
-                        'id': getattr(row, 'id', None),
-                        'farmer_id': getattr(row, 'farmer_id', None),
-                        'farmer_name': getattr(row, 'farmer_name', None) or 'Unknown Farmer',
-                        'farmer_phone': getattr(row, 'farmer_phone', None),
-                        'sr_no': getattr(row, 'sr_no', None),
-                        'owner_name': getattr(row, 'owner_name', None),
-                        'district_name': getattr(row, 'district_name', None),
-                        'city_name': getattr(row, 'city_name', None),
-                        'village_name': getattr(row, 'village_name', None),
-                        'khewat_no': getattr(row, 'khewat_no', None),
-                        'kanal': float(getattr(row, 'kanal', 0) or 0),
-                        'marle': float(getattr(row, 'marle', 0) or 0),
-                        'sarsai': float(getattr(row, 'sarsai', 0) or 0),
-                        'land_owner_area_k': float(getattr(row, 'land_owner_area_k', 0) or 0),
-                        'land_owner_area_m': float(getattr(row, 'land_owner_area_m', 0) or 0),
-                        'land_owner_area_sarsai': float(getattr(row, 'land_owner_area_sarsai', 0) or 0),
-                        'type': getattr(row, 'type', None),
-                        'min_land': getattr(row, 'min_land', None),
-                        'status': getattr(row, 'status', None),
-                        'created_at': format_datetime(getattr(row, 'created_at', None)),
-                        'updated_at': format_datetime(getattr(row, 'updated_at', None))
-                    }
-                    lands.append(land)
-                except Exception:
-                    continue
+            result = conn.execute(text(query), params)
+            lands = rows_as_dicts(result)
 
         return lands, total_lands, page, per_page
     except Exception:
@@ -114,13 +115,15 @@ def get_land_by_id(land_id):
     """
     try:
         with engine.connect() as conn:
-            land_row = conn.execute(text("""
-                SELECT lr.id, lr.sr_no, lr.district_name, lr.city_name, lr.village_name, lr.owner_name, 
+            land_row = conn.execute(text(f"""
+                SELECT lr.id, lr.sr_no, {sql_place_name("lr.district_id")}, {sql_place_name("lr.city_id")},
+                       {sql_place_name("lr.village_id")}, lr.owner_name,
                        lr.kanal, lr.marle, lr.sarsai, lr.type, lr.min_land,
-                       lr.land_owner_area_k, lr.land_owner_area_m, lr.land_owner_area_sarsai, lr.verify_status as status, lr.created_at, lr.updated_at,
+                       lr.land_owner_area_k, lr.land_owner_area_m, lr.land_owner_area_sarsai, lr.verify_status as status, lr.version,
+                       {sql_timestamp("lr.created_at")}, {sql_timestamp("lr.updated_at")},
                        f.id as farmer_id, f.mobile_number
                 FROM land_records lr
-                LEFT JOIN farmers f ON lr.owner_name = f.farmer_name
+                {LAND_FARMER_JOIN}
                 WHERE lr.id = :land_id
             """), {'land_id': land_id}).fetchone()
 
@@ -143,42 +146,224 @@ def get_land_by_id(land_id):
                 'land_owner_area_m': land_row.land_owner_area_m or 0,
                 'land_owner_area_sarsai': land_row.land_owner_area_sarsai or 0,
                 'status': land_row.status or 'Unknown',
-                'created_at': land_row.created_at.strftime('%Y-%m-%d %H:%M:%S') if land_row.created_at else None,
-                'updated_at': land_row.updated_at.strftime('%Y-%m-%d %H:%M:%S') if land_row.updated_at else None,
-                'farmer_id': land_row.farmer_id if hasattr(land_row, 'farmer_id') else None,
-                'farmer_phone': land_row.mobile_number if hasattr(land_row, 'mobile_number') else None
+                'version': land_row.version,
+                'created_at': land_row.created_at,
+                'updated_at': land_row.updated_at,
+                'farmer_id': land_row.farmer_id,
+                'farmer_phone': land_row.mobile_number
             }
 
             return land_data
     except Exception:
         raise
 
-def update_land(land_id, data):
+# Result cap of lookup_lands; a khewat or khasra number within one village matches a handful of records
+LAND_LOOKUP_LIMIT = 200
+LAND_LOOKUP_COLUMNS = ", ".join(list(LAND_LIST_FIELDS.values()) + ["lr.khasra_no", LAND_FARMER_COLUMNS])
+# Whole entries of a comma-separated list column, with spaces removed ("47, 303" or "511//15/3[5 ਕਨਾਲ ...]")
+KHEWAT_ENTRY = "instr(',' || replace(lr.khewat_no, ' ', '') || ',', ',' || :khewat || ',') > 0"
+KHASRA_ENTRY = "(instr(',' || replace(lr.khasra_no, ' ', '') || ',', ',' || :khasra || ',') > 0 " \
+               "OR instr(',' || replace(lr.khasra_no, ' ', ''), ',' || :khasra || '[') > 0)"
+
+def lookup_lands(district_name, village_name, khewat_no=None, khasra_no=None):
     """
-    Updates a land record with provided data dict.
-    Returns True on success.
+    Revenue-record lookup: the land records of a village (district and village names as stored) with
+    khewat number khewat_no and/or khasra number khasra_no, in the /api/lands shape plus khasra_no.
+    A khewat matches single holdings with one seek on ix_land_records_khewat and joint holdings
+    ("47,303") through the small partial index ix_land_records_joint_khewat; a khasra matches an entry
+    of the record's khasra list. Returns (records, truncated). Raises ValueError if a key is missing.
     """
     try:
+        district_name, village_name = (district_name or '').strip(), (village_name or '').strip()
+        khewat_no = (khewat_no or '').replace(' ', '')
+        khasra_no = (khasra_no or '').replace(' ', '')
+        if not district_name or not village_name or not (khewat_no or khasra_no):
+            raise ValueError("'district' and 'village' are required, with 'khewat' and/or 'khasra'")
+        params = {'district': district_name, 'village': village_name, 'khewat': khewat_no,
+                  'khasra': khasra_no, 'limit': LAND_LOOKUP_LIMIT + 1}
+        location = ("lr.district_id = (SELECT id FROM places WHERE name = :district) "
+                    "AND lr.village_id = (SELECT id FROM places WHERE name = :village)")
+        if khewat_no:
+            # Two index seeks. SQLite would rather scan the village in the full index, so the joint holdings
+            # are read from the partial index explicitly (its WHERE clause has to be repeated to allow that)
+            ids = f"""
+                SELECT lr.id FROM land_records lr WHERE {location} AND lr.khewat_no = :khewat
+                UNION
+                SELECT lr.id FROM land_records lr INDEXED BY ix_land_records_joint_khewat
+                WHERE {location} AND lr.khewat_no LIKE '%,%' AND {KHEWAT_ENTRY}
+            """
+            where = f"lr.id IN ({ids})" + (f" AND {KHASRA_ENTRY}" if khasra_no else "")
+        else:
+            # Only the village prefix of ix_land_records_khewat applies
+            where = f"{location} AND {KHASRA_ENTRY}"
         with engine.connect() as conn:
-            conn.execute(text("""
-                UPDATE land_records
-                SET type = :type,
-                    land_owner_area_k = :land_owner_area_k,
-                    land_owner_area_m = :land_owner_area_m,
-                    land_owner_area_sarsai = :land_owner_area_sarsai,
-                    khewat_no = :khewat_no,
-                    updated_at = :updated_at
-                WHERE id = :land_id
-            """), {
-                'type': data.get('type'),
-                'land_owner_area_k': data.get('land_owner_area_k'),
-                'land_owner_area_m': data.get('land_owner_area_m'),
-                'land_owner_area_sarsai': data.get('land_owner_area_sarsai'),
-                'khewat_no': data.get('khewat_no'),
-                'updated_at': datetime.utcnow(),
-                'land_id': land_id
-            })
+            result = conn.execute(text(f"""
+                SELECT {LAND_LOOKUP_COLUMNS}
+                FROM land_records lr
+                {LAND_FARMER_JOIN}
+                WHERE {where}
+                ORDER BY lr.id
+                LIMIT :limit
+            """), params)
+            records = rows_as_dicts(result)
+        return records[:LAND_LOOKUP_LIMIT], len(records) > LAND_LOOKUP_LIMIT
+    except Exception:
+        raise
+
+# Fields a land edit may change, with the type of their column
+EDITABLE_FIELDS = {
+    'type': int,
+    'land_owner_area_k': float,
+    'land_owner_area_m': float,
+    'land_owner_area_sarsai': float,
+    'khewat_no': str,
+}
+MAX_BATCH_UPDATES = 1000
+# Stay under SQLite's default limit of 999 bound parameters
+ID_CHUNK_SIZE = 500
+
+def _is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _field_value(key, value):
+    """
+    Converts an edited value to the type of its column; raises ValueError if it does not fit.
+    None clears the field. Numbers may be sent as strings (form inputs), and an empty one clears it.
+    """
+    column_type = EDITABLE_FIELDS[key]
+    if value is None:
+        return None
+    if column_type is str:
+        if not isinstance(value, str):
+            raise ValueError(key)
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+    elif isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(key)
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(key) from None
+    if not math.isfinite(number) or (column_type is int and not number.is_integer()):
+        raise ValueError(key)
+    return int(number) if column_type is int else number
+
+def update_lands_batch(updates, atomic=False):
+    """
+    Apply many land edits in one transaction.
+    Each update is a dict with 'id', optional 'version' (the version the client last read) and any of
+    EDITABLE_FIELDS. An edit whose version no longer matches is reported as a conflict and skipped.
+    With atomic=True nothing is written unless every edit succeeds.
+    Returns (results, committed) where results has one {'id', 'status', ...} dict per input, in order.
+    Status is 'updated', 'conflict', 'not_found', 'invalid', or 'rolled_back' for atomic batches that failed.
+    """
+    try:
+        results = []
+        pending = []
+        for update in updates:
+            land_id = update.get('id') if isinstance(update, dict) else None
+            if not _is_integer(land_id):
+                results.append({'id': land_id, 'status': 'invalid', 'error': "'id' must be an integer"})
+                continue
+            unknown = sorted(set(update) - set(EDITABLE_FIELDS) - {'id', 'version'})
+            fields, invalid = {}, []
+            for key in EDITABLE_FIELDS:
+                if key in update:
+                    try:
+                        fields[key] = _field_value(key, update[key])
+                    except ValueError:
+                        invalid.append(key)
+            if unknown:
+                results.append({'id': land_id, 'status': 'invalid', 'error': f"Unknown fields: {', '.join(unknown)}"})
+            elif invalid:
+                results.append({'id': land_id, 'status': 'invalid', 'error': f"Invalid values for: {', '.join(invalid)}"})
+            elif not fields:
+                results.append({'id': land_id, 'status': 'invalid', 'error': 'No fields to update'})
+            elif update.get('version') is not None and not _is_integer(update['version']):
+                results.append({'id': land_id, 'status': 'invalid', 'error': "'version' must be an integer"})
+            else:
+                results.append({'id': land_id, 'status': None})
+                pending.append((len(results) - 1, land_id, update.get('version'), fields))
+
+        now = datetime.utcnow()
+        with engine.connect() as conn:
+            for index, land_id, version, fields in pending:
+                params = dict(fields, land_id=land_id, updated_at=now)
+                assignments = ", ".join(f"{key} = :{key}" for key in fields)
+                # A local edit no longer matches the upstream payload; the next ingestion records the record as updated
+                query = (f"UPDATE land_records SET {assignments}, version = version + 1, updated_at = :updated_at, "
+                         "content_hash = NULL WHERE id = :land_id")
+                if version is not None:
+                    query += " AND version = :expected_version"
+                    params['expected_version'] = version
+                updated = conn.execute(text(query), params).rowcount
+                # The UPDATE holds SQLite's write lock, so this read sees exactly what was written
+                row = conn.execute(text("SELECT version FROM land_records WHERE id = :land_id"),
+                                   {'land_id': land_id}).fetchone()
+                if row is None:
+                    results[index] = {'id': land_id, 'status': 'not_found'}
+                elif not updated:
+                    results[index] = {'id': land_id, 'status': 'conflict', 'current_version': row.version}
+                else:
+                    results[index] = {'id': land_id, 'status': 'updated', 'version': row.version}
+
+            failed = any(result['status'] != 'updated' for result in results)
+            if atomic and failed:
+                conn.rollback()
+                for result in results:
+                    if result['status'] == 'updated':
+                        result['status'] = 'rolled_back'
+                        result.pop('version', None)
+                return results, False
+
             conn.commit()
-        return True
+        return results, True
+    except Exception:
+        raise
+
+def update_land(land_id, data):
+    """
+    Updates a land record with provided data dict.
+    Returns True on success, False if the record is missing or data['version'] is stale.
+    Raises ValueError if a value does not fit its field.
+    """
+    try:
+        update = {key: data.get(key) for key in EDITABLE_FIELDS}
+        update['id'] = land_id
+        if data.get('version') is not None:
+            update['version'] = data.get('version')
+        results, _ = update_lands_batch([update])
+        if results[0]['status'] == 'invalid':
+            raise ValueError(results[0]['error'])
+        return results[0]['status'] == 'updated'
     except Exception:
         raise
+
+# Concurrent land edits can commit out of updated_at order; edits this much older than the newest
+# one seen are still picked up (each (id, version) is reported once)
+LAND_EDIT_WINDOW = timedelta(seconds=30)
+
+class LandEdits:
+    """Finds land records edited since the previous check, from their updated_at and version."""
+
+    def __init__(self, conn):
+        # Edits are stamped with the UTC time. The first check only records what is already there
+        # (a freshly ingested file has many recent rows).
+        self.since = datetime.utcnow()
+        self.seen = {}  # id -> version, for the rows inside LAND_EDIT_WINDOW
+        self.check(conn)
+
+    def check(self, conn):
+        """[{'id', 'farmer_id', 'version'}] of the edits not reported by an earlier check."""
+        rows = conn.execute(text("SELECT id, farmer_id, version, updated_at FROM land_records "
+                                 "WHERE updated_at > :since ORDER BY updated_at"),
+                            {'since': self.since - LAND_EDIT_WINDOW}).fetchall()
+        edited = [{'id': row.id, 'farmer_id': row.farmer_id, 'version': row.version}
+                  for row in rows if self.seen.get(row.id) != row.version]
+        if rows:
+            self.since = max(self.since, datetime.fromisoformat(rows[-1].updated_at))
+        self.seen = {row.id: row.version for row in rows}
+        return edited
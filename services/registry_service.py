@@ -0,0 +1,191 @@
+"""
+Optional in-memory snapshot of the farmer registry (REGISTRY_SNAPSHOT=1).
+
+Farmers only change when ingestion publishes a new database or a land record
+is edited, yet every /api/farmer/<id> and profile page read the farmer, its
+lands and its bank detail from SQLite. With the snapshot enabled, the app
+loads all of them once, formatted exactly as those queries return them (the
+same SELECT expressions), and the lookups become a bisect and a decode.
+
+Each farmers row becomes one record (farmer values, the value tuples of its
+lands, bank detail values), marshal-encoded and zlib-compressed, and the
+records are concatenated into a single buffer located through arrays of the
+sorted row ids and record offsets. There is no Python object per farmer, so
+reading a record writes to no shared page (no reference counts, nothing for
+the garbage collector to visit): loaded in the gunicorn master before the
+workers fork, the snapshot stays shared copy-on-write by all of them. Account
+numbers stay encrypted in it and are decrypted only when a bank detail is
+returned.
+
+Lookups compare the database file signature (one stat call) with the
+snapshot's. A land edit (same file, new signature) re-reads the farmers whose
+lands changed into a small per-process overlay. A new database from ingestion
+is loaded into a new snapshot in the background and swapped in when complete;
+lookups use SQLite meanwhile. Under gunicorn the master loads it instead (in
+on_reload, before forking the new workers), and the old workers use SQLite
+until they are replaced.
+"""
+import bisect
+import itertools
+import marshal
+import os
+import threading
+import time
+import zlib
+from array import array
+
+from sqlalchemy import text
+
+from models.database import engine, db_signature
+from services.land_service import LandEdits, ID_CHUNK_SIZE
+
+REGISTRY_SNAPSHOT = os.getenv("REGISTRY_SNAPSHOT", "").lower() in ('1', 'true', 'yes')
+
+def read_records(conn, farmer_ids=None):
+    """
+    Yields (farmers.id, (farmer values, land value tuples, bank values or None)) for the farmers rows of the
+    given upstream farmer IDs (all rows when None), in FARMER_FIELDS / LAND_FIELDS / BANK_FIELDS order.
+    Lands are streamed one farmer at a time, so only the farmer and bank rows are held in memory.
+    """
+    from services.farmer_service import FARMER_SELECT, FARMER_FIELDS, LAND_SELECT, BANK_SELECT, BANK_FIELDS
+    if farmer_ids is None:
+        clauses = [("", {})]
+    else:
+        farmer_ids = sorted(farmer_ids)
+        clauses = []
+        for i in range(0, len(farmer_ids), ID_CHUNK_SIZE):
+            params = {f"f{n}": fid for n, fid in enumerate(farmer_ids[i:i + ID_CHUNK_SIZE])}
+            clauses.append((f"WHERE farmer_id IN ({', '.join(':' + name for name in params)})", params))
+
+    farmer_id_at = list(FARMER_FIELDS).index('farmer_id')
+    bank_farmer_id_at = list(BANK_FIELDS).index('farmer_id')
+    for where, params in clauses:
+        banks, farmers = {}, {}
+        for row in conn.execute(text(f"SELECT {BANK_SELECT} FROM farmer_bank_details {where} ORDER BY id"), params):
+            banks.setdefault(row[bank_farmer_id_at], tuple(row))
+        for row in conn.execute(text(f"SELECT {FARMER_SELECT} FROM farmers {where}"), params):
+            farmers.setdefault(row[farmer_id_at], []).append(tuple(row))
+        # Lands in the order the per-farmer queries return them (the farmer_id index, then id)
+        lands = conn.execute(text(f"SELECT farmer_id, {LAND_SELECT} FROM land_records {where} "
+                                  "ORDER BY farmer_id, id"), params)
+        for farmer_id, rows in itertools.groupby(lands, key=lambda row: row[0]):
+            land_values = tuple(tuple(row[1:]) for row in rows)
+            for values in farmers.pop(farmer_id, ()):
+                yield values[0], (values, land_values, banks.get(farmer_id))
+        for farmer_id, rows in farmers.items():
+            for values in rows:
+                yield values[0], (values, (), banks.get(farmer_id))
+
+def _pack(record):
+    return zlib.compress(marshal.dumps(record), 1)
+
+def _unpack(data):
+    return marshal.loads(zlib.decompress(data))
+
+class RegistrySnapshot:
+    """The farmers of one version of the database file, packed as described in the module docstring."""
+
+    def __init__(self, signature, records, land_edits):
+        self.signature = signature
+        self.land_edits = land_edits
+        ids, starts, data = array('q'), array('q'), bytearray()
+        for farmer_row_id, record in records:
+            ids.append(farmer_row_id)
+            starts.append(len(data))
+            data += _pack(record)
+        starts.append(len(data))
+        # Sorted by id for bisect; record i is data[starts[i]:ends[i]]
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        self.ids = array('q', (ids[i] for i in order))
+        self.starts = array('q', (starts[i] for i in order))
+        self.ends = array('q', (starts[i + 1] for i in order))
+        self.data = bytes(data)
+        # Records re-read after land edits in this process, by farmers.id
+        self.overlay = {}
+        self.reloading = False
+
+    @classmethod
+    def load(cls):
+        signature = db_signature()
+        with engine.connect() as conn:
+            # Taken first, so edits committed while the rows are read are picked up by the next lookup
+            land_edits = LandEdits(conn)
+            return cls(signature, read_records(conn), land_edits)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, farmer_row_id):
+        """(farmer values, land value tuples, bank values or None) of a farmers row, or None."""
+        record = self.overlay.get(farmer_row_id)
+        if record is not None:
+            return record
+        i = bisect.bisect_left(self.ids, farmer_row_id)
+        if i == len(self.ids) or self.ids[i] != farmer_row_id:
+            return None
+        return _unpack(memoryview(self.data)[self.starts[i]:self.ends[i]])
+
+    def __iter__(self):
+        for farmer_row_id in self.ids:
+            yield self.get(farmer_row_id)
+
+    def apply_land_edits(self, signature):
+        with engine.connect() as conn:
+            farmer_ids = {land['farmer_id'] for land in self.land_edits.check(conn)}
+            if farmer_ids:
+                self.overlay.update(read_records(conn, farmer_ids))
+        self.signature = signature
+
+_snapshot = None
+_lock = threading.Lock()
+_reload_on_swap = True
+
+def load_snapshot():
+    """Read the database into a new snapshot and make it the current one."""
+    global _snapshot
+    start = time.perf_counter()
+    snapshot = RegistrySnapshot.load()
+    _snapshot = snapshot
+    print(f"Loaded registry snapshot of {len(snapshot)} farmers ({len(snapshot.data) / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - start:.1f}s")
+    return snapshot
+
+def refresh_snapshot():
+    """Reload the snapshot if one is loaded (the gunicorn master does this when the database was replaced)."""
+    if _snapshot is not None:
+        load_snapshot()
+
+def leave_reloads_to_master():
+    """Called in gunicorn workers: a replaced database is loaded by the master, not by every worker."""
+    global _reload_on_swap
+    _reload_on_swap = False
+
+def _reload():
+    try:
+        load_snapshot()
+    except Exception as e:
+        print(f"Registry snapshot reload failed: {e}")
+
+def get_snapshot():
+    """The snapshot if it matches the database file, else None (the caller then reads SQLite)."""
+    snapshot = _snapshot
+    if snapshot is None:
+        return None
+    signature = db_signature()
+    if signature == snapshot.signature:
+        return snapshot
+    # One thread brings the snapshot up to date; the others read SQLite meanwhile
+    if signature is None or not _lock.acquire(blocking=False):
+        return None
+    try:
+        if snapshot is not _snapshot:
+            return None
+        if signature[:2] == snapshot.signature[:2]:
+            snapshot.apply_land_edits(signature)
+            return snapshot
+        if _reload_on_swap and not snapshot.reloading:
+            snapshot.reloading = True
+            threading.Thread(target=_reload, name="registry-reload", daemon=True).start()
+        return None
+    finally:
+        _lock.release()
@@ -0,0 +1,102 @@
+"""
+Response encoding for the JSON API.
+
+List services select their output columns already named, coerced and formatted
+in SQL (see sql_timestamp / sql_float / sql_area_kms / sql_place_name), so a row
+maps to its output dict with a single zip over the precomputed keys. Payloads are then encoded straight to
+bytes with orjson when it is installed, falling back to the standard json module.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Response
+
+from services.area import SARSAI_PER_KANAL, SARSAI_PER_MARLA
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def sql_timestamp(column, alias=None):
+    """Select expression formatting a stored timestamp as 'YYYY-MM-DD HH:MM:SS' (NULL stays NULL)."""
+    return f"strftime('{TIMESTAMP_FORMAT}', {column}) AS {alias or column.split('.')[-1]}"
+
+def sql_float(column, alias=None):
+    """Select expression returning a column as a float, with NULL as 0.0."""
+    return f"CAST(COALESCE({column}, 0) AS REAL) AS {alias or column.split('.')[-1]}"
+
+def sql_area_kms(column, alias=None):
+    """Select expression formatting an area stored in sarsai as the upstream 'kanal/marle/sarsai' string (NULL stays NULL)."""
+    kms = (f"printf('%d/%d/%.2f', {column} / {SARSAI_PER_KANAL}, "
+           f"CAST({column} AS INTEGER) % {SARSAI_PER_KANAL} / {SARSAI_PER_MARLA}, "
+           f"{column} - {SARSAI_PER_MARLA} * CAST({column} / {SARSAI_PER_MARLA} AS INTEGER))")
+    return f"CASE WHEN {column} IS NOT NULL THEN {kms} END AS {alias or column.split('.')[-1]}"
+
+def sql_place_name(column, alias=None, default=None):
+    """Select expression for the name of a place id column ('lr.village_id' AS village_name), NULL as default."""
+    name = f"(SELECT name FROM places WHERE id = {column})"
+    if default is not None:
+        name = f"COALESCE({name}, '{default}')"
+    return f"{name} AS {alias or column.split('.')[-1].replace('_id', '_name')}"
+
+def rows_as_dicts(result):
+    """Map every row of a result to a dict keyed by its column labels."""
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.strftime(TIMESTAMP_FORMAT)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(payload):
+        """Encode payload as UTF-8 JSON bytes."""
+        return orjson.dumps(payload, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(payload):
+        """Encode payload as UTF-8 JSON bytes."""
+        return json.dumps(payload, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def json_response(payload, status=200):
+    """Flask response with a pre-encoded JSON body."""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+def _split_param(value):
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+def parse_field_selection(args, fields, sections=(), param='fields'):
+    """
+    Read a sparse field selection from request args.
+
+    ?fields= lists the fields (and optionally sections) to return, ?include= adds sections.
+    Without ?fields= every field is returned, and every section unless ?include= narrows them.
+    Returns (selected fields in canonical order, set of included sections).
+    Raises ValueError naming anything unknown.
+    """
+    requested = _split_param(args.get(param))
+    included = _split_param(args.get('include')) if sections else None
+    unknown = set(included or ()) - set(sections)
+    if requested is None:
+        selected = list(fields)
+        section_set = set(sections) if included is None else set(included)
+    else:
+        unknown |= set(requested) - set(fields) - set(sections)
+        selected = [field for field in fields if field in requested]
+        section_set = {name for name in requested if name in sections} | set(included or ())
+    if unknown:
+        allowed = ", ".join(list(fields) + list(sections))
+        raise ValueError(f"Unknown field(s) {', '.join(sorted(unknown))}; allowed: {allowed}")
+    return selected, section_set
@@ -0,0 +1,41 @@
+"""
+Dashboard statistics.
+
+The numbers only change when the database does, so they are computed once per
+version of the database file (see db_signature) and shared by every /api/stats
+request and live event stream of the worker.
+"""
+import threading
+
+from sqlalchemy import text
+
+from models.database import engine, db_signature
+from services.area import SARSAI_PER_ACRE
+
+_stats = None  # (signature, stats)
+_lock = threading.Lock()
+
+def compute_stats(conn):
+    return {
+        'total_farmers': conn.execute(text("SELECT COUNT(*) FROM farmers")).scalar() or 0,
+        'total_lands': conn.execute(text("SELECT COUNT(*) FROM land_records")).scalar() or 0,
+        'total_area': float(conn.execute(
+            text(f"SELECT COALESCE(SUM(owner_area), 0) / {SARSAI_PER_ACRE} FROM land_records")).scalar() or 0),
+        'verified_farmers': conn.execute(text("SELECT COUNT(*) FROM farmers WHERE verify_status = 1")).scalar() or 0,
+    }
+
+def get_stats():
+    """Farmer, land record and verified farmer counts and the total area in acres."""
+    global _stats
+    try:
+        signature = db_signature()
+        cached = _stats
+        if cached is not None and cached[0] == signature:
+            return dict(cached[1])
+        with _lock:
+            if _stats is None or _stats[0] != signature:
+                with engine.connect() as conn:
+                    _stats = (signature, compute_stats(conn))
+            return dict(_stats[1])
+    except Exception:
+        raise
@@ -0,0 +1,198 @@
+"""
+Typeahead suggestions from an in-memory prefix index.
+
+The search boxes used to send every keystroke to /api/farmers?search= and
+/api/lands?search=, each a full LIKE '%...%' scan. /api/suggest answers from
+per-kind sorted arrays of normalized keys instead: a prefix lookup is one
+bisect plus a scan of the matching range, and the best matches of very short
+(and so very common) prefixes are precomputed when the index is built.
+
+Each web worker builds the index on its first suggestion request and rebuilds
+it when the database file changes (a published ingestion run or a local edit
+changes its inode or mtime), at most once every SUGGEST_MIN_REBUILD_INTERVAL
+seconds. While a rebuild runs, other requests keep using the previous index.
+"""
+import bisect
+import heapq
+import os
+import threading
+import time
+
+from sqlalchemy import text
+
+from models.database import engine, db_signature
+
+SUGGEST_KINDS = ('farmer', 'village', 'city', 'district', 'khewat')
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 20
+SUGGEST_MIN_REBUILD_INTERVAL = float(os.getenv("SUGGEST_MIN_REBUILD_INTERVAL", "5"))
+# Prefixes matching more keys than this have their top suggestions precomputed (up to PRECOMPUTED_PREFIX_LENGTH
+# characters); longer prefixes scan at most this many keys
+SUGGEST_SCAN_LIMIT = 1000
+PRECOMPUTED_PREFIX_LENGTH = 3
+
+# Place names of farmers and land records, counted by id
+PLACE_COUNT_QUERY = """SELECT p.name, x.count FROM (
+                           SELECT place_id, COUNT(*) AS count FROM (
+                               SELECT {column} AS place_id FROM farmers UNION ALL SELECT {column} FROM land_records
+                           ) GROUP BY place_id
+                       ) x JOIN places p ON p.id = x.place_id"""
+# Values per kind with how often they occur, which ranks the suggestions
+SUGGEST_QUERIES = {
+    'farmer': "SELECT farmer_name, COUNT(*) FROM farmers GROUP BY farmer_name",
+    'village': PLACE_COUNT_QUERY.format(column='village_id'),
+    'city': PLACE_COUNT_QUERY.format(column='city_id'),
+    'district': PLACE_COUNT_QUERY.format(column='district_id'),
+    'khewat': "SELECT khewat_no, COUNT(*) FROM land_records GROUP BY khewat_no",
+}
+# Later words of a farmer name are indexed too ("Singh" finds nobody useful, so it is skipped)
+SKIP_WORDS = {'singh', 'kaur', 's/o', 'd/o', 'w/o', 'ਸਿੰਘ', 'ਕੌਰ', 'ਪੁੱਤਰ', 'ਪੁੱਤਰੀ', 'ਪਤਨੀ'}
+
+def normalize(value):
+    return ' '.join(str(value).casefold().split())
+
+def _rank(entry):
+    # Most frequent first, then shorter, then alphabetical
+    value, count = entry
+    return (-count, len(value), value)
+
+class PrefixIndex:
+    """Sorted normalized keys of one kind, each pointing at a (value, count) entry."""
+
+    def __init__(self, entries, word_starts=False):
+        pairs = []
+        for number, (value, count) in enumerate(entries):
+            key = normalize(value)
+            pairs.append((key, number))
+            if word_starts:
+                words = key.split(' ')
+                for position in range(1, len(words)):
+                    if words[position] not in SKIP_WORDS and len(words[position]) > 1:
+                        pairs.append((' '.join(words[position:]), number))
+        pairs.sort()
+        self.entries = entries
+        self.keys = [key for key, _ in pairs]
+        self.targets = [number for _, number in pairs]
+        self.top = self._precompute_top()
+
+    def _range(self, prefix, lo=0, hi=None):
+        hi = len(self.keys) if hi is None else hi
+        start = bisect.bisect_left(self.keys, prefix, lo, hi)
+        end = bisect.bisect_left(self.keys, prefix + '\U0010ffff', start, hi)
+        return start, end
+
+    def _best(self, start, end, limit):
+        numbers = dict.fromkeys(self.targets[start:end])
+        return heapq.nsmallest(limit, (self.entries[number] for number in numbers), key=_rank)
+
+    def _precompute_top(self):
+        """Best SUGGEST_MAX_LIMIT entries of every short prefix that matches more than SUGGEST_SCAN_LIMIT keys."""
+        top = {}
+        pending = [('', 0, len(self.keys))]
+        while pending:
+            prefix, start, end = pending.pop()
+            if end - start <= SUGGEST_SCAN_LIMIT:
+                continue
+            if prefix:
+                top[prefix] = self._best(start, end, SUGGEST_MAX_LIMIT)
+            if len(prefix) >= PRECOMPUTED_PREFIX_LENGTH:
+                continue
+            position = start
+            while position < end:
+                key = self.keys[position]
+                if len(key) <= len(prefix):
+                    position += 1
+                    continue
+                child = key[:len(prefix) + 1]
+                child_start, child_end = self._range(child, position, end)
+                pending.append((child, child_start, child_end))
+                position = child_end
+        return top
+
+    def search(self, prefix, limit):
+        if prefix in self.top:
+            return self.top[prefix][:limit]
+        start, end = self._range(prefix)
+        return self._best(start, min(end, start + SUGGEST_SCAN_LIMIT), limit)
+
+class SuggestIndex:
+    """The prefix indexes of all kinds for one version of the database file."""
+
+    def __init__(self, indexes, signature, built_in):
+        self.indexes = indexes
+        self.signature = signature
+        self.built_in = built_in
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, signature):
+        start = time.perf_counter()
+        indexes = {}
+        with engine.connect() as conn:
+            for kind, query in SUGGEST_QUERIES.items():
+                # Spellings differing only in case or spacing ("Amarjit KAUR") are one suggestion,
+                # shown as the most common spelling
+                merged = {}
+                for value, count in conn.execute(text(query)):
+                    value = ' '.join(str(value or '').split())
+                    if not value:
+                        continue
+                    key = normalize(value)
+                    total, best, best_count = merged.get(key, (0, value, 0))
+                    if count > best_count:
+                        best, best_count = value, count
+                    merged[key] = (total + count, best, best_count)
+                entries = [(value, total) for total, value, _ in merged.values()]
+                indexes[kind] = PrefixIndex(entries, word_starts=kind == 'farmer')
+        return cls(indexes, signature, time.perf_counter() - start)
+
+    def suggest(self, query, kinds, limit):
+        matches = []
+        for kind in kinds:
+            for value, count in self.indexes[kind].search(query, limit):
+                matches.append({'value': value, 'kind': kind, 'count': count})
+        # An exact match first, then the same ranking as within a kind
+        matches.sort(key=lambda match: (normalize(match['value']) != query, -match['count'],
+                                        len(match['value']), match['value']))
+        return matches[:limit]
+
+_index = None
+_build_lock = threading.Lock()
+
+def get_index():
+    """The current index, rebuilding it when the database file changed since it was built."""
+    global _index
+    index = _index
+    signature = db_signature()
+    if index is not None and (index.signature == signature
+                              or time.time() - index.built_at < SUGGEST_MIN_REBUILD_INTERVAL):
+        return index
+    # Only one thread rebuilds; the others keep answering from the old index
+    if not _build_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _index is None or _index.signature != signature:
+            _index = SuggestIndex.build(signature)
+            print(f"Built suggestion index in {_index.built_in * 1000:.0f} ms")
+        return _index
+    finally:
+        _build_lock.release()
+
+def get_suggestions(query, kinds=None, limit=SUGGEST_DEFAULT_LIMIT):
+    """
+    Returns up to `limit` {'value', 'kind', 'count'} suggestions whose value (or, for farmer names,
+    a later word of it) starts with query, best first. kinds limits the SUGGEST_KINDS searched.
+    Raises ValueError for unknown kinds.
+    """
+    try:
+        kinds = list(SUGGEST_KINDS) if not kinds else kinds
+        unknown = sorted(set(kinds) - set(SUGGEST_KINDS))
+        if unknown:
+            raise ValueError(f"Unknown kind(s) {', '.join(unknown)}; allowed: {', '.join(SUGGEST_KINDS)}")
+        query = normalize(query or '')
+        if not query:
+            return []
+        limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+        return get_index().suggest(query, kinds, limit)
+    except Exception:
+        raise
@@ -7,6 +7,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Add event listeners for search with debounce
     let farmerSearchTimer;
     document.getElementById('searchFarmer').addEventListener('input', (e) => {
+        loadSuggestions(e.target, 'farmerSuggestions', 'farmer,village,district');
         clearTimeout(farmerSearchTimer);
         farmerSearchTimer = setTimeout(() => {
             currentFarmerPage = 1;
@@ -16,6 +17,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     let landSearchTimer;
     document.getElementById('searchLand').addEventListener('input', (e) => {
+        loadSuggestions(e.target, 'landSuggestions', 'khewat,village,city,district,farmer');
         clearTimeout(landSearchTimer);
         landSearchTimer = setTimeout(() => {
             currentLandPage = 1;
@@ -34,4 +36,32 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     });
-});
\ No newline at end of file
+});
+
+// Typeahead suggestions for a search box, from the in-memory index behind /api/suggest
+const suggestionTimers = {};
+function loadSuggestions(input, datalistId, kinds) {
+    clearTimeout(suggestionTimers[datalistId]);
+    const query = input.value.trim();
+    const datalist = document.getElementById(datalistId);
+    if (!query) {
+        datalist.innerHTML = '';
+        return;
+    }
+    suggestionTimers[datalistId] = setTimeout(() => {
+        fetch(`/api/suggest?q=${encodeURIComponent(query)}&kinds=${kinds}&limit=8`)
+            .then(response => response.json())
+            .then(data => {
+                // Ignore answers for text the user has typed past
+                if (input.value.trim() !== query || !data.suggestions) return;
+                datalist.innerHTML = '';
+                data.suggestions.forEach(suggestion => {
+                    const option = document.createElement('option');
+                    option.value = suggestion.value;
+                    option.label = `${suggestion.kind} (${suggestion.count})`;
+                    datalist.appendChild(option);
+                });
+            })
+            .catch(error => console.error('Error fetching suggestions:', error));
+    }, 150);
+}
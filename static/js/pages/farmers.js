@@ -6,6 +6,9 @@ import {
   formatLandArea,
   showErrorToast,
 } from '../utils/index.js';
+import { onLiveEvent, startLiveStats } from '../utils/events.js';
+
+let currentFarmerPage = 1;
 
 // Function to populate the Source API filter dropdown
 function populateSourceApiFilter(farmers) {
@@ -103,6 +106,12 @@ function loadFarmers(search = '', sourceApi = '', totalArea = '') {
     });
 }
 
+// Stats cards follow the server's live events; the list is re-read when new data is published
+window.fetchStats = startLiveStats;
+window.loadFarmers = loadFarmers;
+startLiveStats();
+onLiveEvent('reload', () => loadFarmers(document.getElementById('searchFarmer')?.value || ''));
+
 // Placeholder for printFarmer function
 function printFarmer(farmerId) {
   window.open(`/farmers/${farmerId}/profile`, '_blank');
@@ -5,8 +5,11 @@ import {
   renderPagination,
   showErrorToast
 } from '../utils/index.js';
+import { onLiveEvent } from '../utils/events.js';
 
 let currentLandPage = 1;
+// Ids of the land records in the table, to tell whether a live edit concerns this page
+let shownLandIds = new Set();
 
 function loadLands(search = '') {
   const url = `/api/lands?page=${currentLandPage}&search=${encodeURIComponent(search)}`;
@@ -41,6 +44,7 @@ function renderLandsTable(lands) {
   const tbody = document.getElementById('landsTableBody');
   if (!tbody) return;
   tbody.innerHTML = '';
+  shownLandIds = new Set((lands || []).map((land) => land.id));
 
   if (!lands || lands.length === 0) {
     tbody.innerHTML =
@@ -246,5 +250,10 @@ window.saveLandRecord = saveLandRecord;
 document.addEventListener('DOMContentLoaded', () => {
   if (document.getElementById('landsTableBody')) {
     loadLands();
+    // Re-read the page when one of its records is edited elsewhere or new data is published
+    onLiveEvent('lands', (data) => {
+      if (data.lands.some((land) => shownLandIds.has(land.id))) changeLandPage(currentLandPage);
+    });
+    onLiveEvent('reload', () => changeLandPage(currentLandPage));
   }
 });
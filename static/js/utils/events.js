@@ -0,0 +1,83 @@
+// Live updates pushed by the server over /api/events, shared by every script on the page
+// through one EventSource. Event types: stats (changed fields only), lands, job and reload.
+
+const listeners = { stats: [], lands: [], job: [], reload: [] };
+const stats = {};
+let source = null;
+
+function dispatch(type, data) {
+    if (type === 'stats') {
+        Object.assign(stats, data);
+        data = { ...stats };
+    }
+    listeners[type].forEach((listener) => listener(data));
+}
+
+function connect() {
+    if (source) return;
+    if (typeof EventSource === 'undefined') {
+        fetchStatsOnce();
+        return;
+    }
+    source = new EventSource('/api/events');
+    Object.keys(listeners).forEach((type) => {
+        source.addEventListener(type, (event) => dispatch(type, JSON.parse(event.data)));
+    });
+    source.addEventListener('error', () => {
+        // The browser reconnects dropped streams by itself; a refused one (503 when the server
+        // is at capacity) is closed, so show the current numbers and try again later
+        if (source.readyState === EventSource.CLOSED) {
+            source = null;
+            fetchStatsOnce();
+            setTimeout(connect, 30000);
+        }
+    });
+}
+
+function fetchStatsOnce() {
+    fetch('/api/stats')
+        .then((response) => response.json())
+        .then((data) => dispatch('stats', data))
+        .catch((error) => console.error('Error fetching stats:', error));
+}
+
+export function onLiveEvent(type, listener) {
+    listeners[type].push(listener);
+    connect();
+}
+
+export function renderStats(data) {
+    const setText = (id, value) => {
+        const element = document.getElementById(id);
+        if (element && value !== undefined) element.textContent = value;
+    };
+    setText('totalFarmers', data.total_farmers?.toLocaleString());
+    setText('totalLands', data.total_lands?.toLocaleString());
+    setText('totalArea', data.total_area?.toLocaleString(undefined, { maximumFractionDigits: 2 }));
+    setText('verifiedRecords', data.verified_farmers?.toLocaleString());
+    setText('farmersCount', data.total_farmers);
+    setText('landsCount', data.total_lands);
+    document.querySelectorAll('.loading-row').forEach((row) => (row.style.display = 'none'));
+}
+
+export function renderJob(job) {
+    const element = document.getElementById('ingestionStatus');
+    if (!element) return;
+    if (job.status !== 'queued' && job.status !== 'running') {
+        element.classList.add('d-none');
+        return;
+    }
+    const phase = job.progress?.phases?.[job.progress.phase];
+    const counts = phase ? `: ${job.progress.phase.replace(/_/g, ' ')} ${phase.done.toLocaleString()} / ${phase.total.toLocaleString()}` : '';
+    element.textContent = `Data refresh (${job.kind}) ${job.status}${counts}`;
+    element.classList.remove('d-none');
+}
+
+// Keeps the stats cards and the ingestion status line current
+let liveStatsStarted = false;
+export function startLiveStats() {
+    if (liveStatsStarted) return;
+    liveStatsStarted = true;
+    onLiveEvent('stats', renderStats);
+    onLiveEvent('job', renderJob);
+}
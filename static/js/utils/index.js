@@ -3,9 +3,19 @@
  * Keep these small and focused; modules can import what they need.
  */
 
-export async function getBankIdToNameMap() {
+let bankIdToNameMapPromise = null;
+
+export function getBankIdToNameMap() {
+    // Fetched once per page load; the fingerprinted URL lets the browser cache it across loads
+    if (!bankIdToNameMapPromise) {
+        bankIdToNameMapPromise = loadBankIdToNameMap();
+    }
+    return bankIdToNameMapPromise;
+}
+
+async function loadBankIdToNameMap() {
     try {
-        const response = await fetch('/static/js/bankId.json');
+        const response = await fetch(window.BANK_ID_URL || '/static/js/bankId.json');
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
@@ -18,6 +28,7 @@ export async function getBankIdToNameMap() {
     } catch (error) {
         console.error('Error fetching bank ID map:', error);
         showErrorToast('Failed to load bank information.');
+        bankIdToNameMapPromise = null;
         return {};
     }
 }
@@ -0,0 +1,339 @@
+"""
+Shared HTTP client for the upstream Punjab APIs.
+
+Every fetch in fetch_farmer_data.py goes through get_json(), which applies two
+per-host controls:
+
+* AdaptiveLimiter - AIMD concurrency control. The number of in-flight requests
+  grows by ~1 per round trip while latency stays under target, is cut in half
+  on 429 / 5xx / connection errors, and every request to the host pauses for
+  the Retry-After period when upstream asks us to back off.
+* CircuitBreaker - after repeated consecutive failures the host is considered
+  down; requests wait for the open period instead of hammering it, then a
+  single probe request decides whether to close the circuit again.
+
+When a response cache is configured (HTTP_CACHE_DIR or configure_cache()),
+fresh cached payloads are returned without a request and stale ones are
+revalidated with ETag / Last-Modified; see http_cache.py.
+"""
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from http_cache import HttpCache
+
+# Tunables (override in .env)
+INITIAL_CONCURRENCY = float(os.getenv("UPSTREAM_INITIAL_CONCURRENCY", "2"))
+MAX_CONCURRENCY = float(os.getenv("UPSTREAM_MAX_CONCURRENCY", "16"))
+LATENCY_TARGET = float(os.getenv("UPSTREAM_LATENCY_TARGET", "2.0"))  # seconds
+FAILURE_THRESHOLD = int(os.getenv("UPSTREAM_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("UPSTREAM_BREAKER_RESET", "15"))  # seconds
+BREAKER_MAX_RESET_TIMEOUT = 300.0
+MAX_RETRY_AFTER = 300.0
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "")
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", str(24 * 3600)))  # seconds
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "2048"))
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host's circuit stays open longer than the caller is willing to wait."""
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter for a single upstream host."""
+
+    def __init__(self, initial=INITIAL_CONCURRENCY, min_limit=1.0, max_limit=MAX_CONCURRENCY,
+                 latency_target=LATENCY_TARGET):
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.pause_until = 0.0
+        self.avg_latency = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                pause = self.pause_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                else:
+                    self._cond.wait(1.0)
+
+    def release(self, latency, outcome, retry_after=None):
+        """Record a finished request. outcome is 'ok', 'throttled' or 'error'."""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if latency is not None:
+                self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+
+            if outcome == 'ok':
+                if latency is not None and latency > self.latency_target:
+                    self._decrease(now, 0.9)
+                else:
+                    # Additive increase: about +1 per full window of successful requests
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            else:
+                self._decrease(now, 0.5)
+
+            if retry_after:
+                self.pause_until = max(self.pause_until, now + min(retry_after, MAX_RETRY_AFTER))
+            self._cond.notify_all()
+
+    def _decrease(self, now, factor):
+        # Decrease at most once per round trip so a burst of failures from the
+        # same window doesn't collapse the limit to the floor
+        window = self.avg_latency or 1.0
+        if now - self._last_decrease >= window:
+            self.limit = max(self.min_limit, self.limit * factor)
+            self._last_decrease = now
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def wait_time(self):
+        """Return 0 if a request may proceed now, otherwise seconds to wait before asking again."""
+        with self._lock:
+            if self.state == 'closed':
+                return 0.0
+            now = time.monotonic()
+            if self.state == 'open':
+                if now < self.opened_until:
+                    return self.opened_until - now
+                self.state = 'half_open'
+            if self._probe_in_flight:
+                return 1.0
+            self._probe_in_flight = True
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                print("✅ Upstream recovered, closing circuit")
+            self.state = 'closed'
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open':
+                # Probe failed: stay open for longer next time
+                self.reset_timeout = min(self.reset_timeout * 2, BREAKER_MAX_RESET_TIMEOUT)
+                self._open()
+            elif self.state == 'closed' and self.failures >= self.failure_threshold:
+                self._open()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """The probe got an answer that is neither success nor failure (429): let the next request probe."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self):
+        self.state = 'open'
+        self.opened_until = time.monotonic() + self.reset_timeout
+        print(f"⛔ Circuit opened after {self.failures} consecutive failures, pausing {self.reset_timeout:.0f}s")
+
+
+class HostState:
+    def __init__(self):
+        self.limiter = AdaptiveLimiter()
+        self.breaker = CircuitBreaker()
+        self.stats = {'requests': 0, 'ok': 0, 'throttled': 0, 'errors': 0, 'failed': 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+
+_hosts = {}
+_hosts_lock = threading.Lock()
+_local = threading.local()
+_cache = None
+
+
+def configure_cache(directory, ttl=HTTP_CACHE_TTL, max_mb=HTTP_CACHE_MAX_MB):
+    """Enable the on-disk response cache at directory (None disables it). ttl=None never expires."""
+    global _cache
+    _cache = HttpCache(directory, ttl=ttl, max_bytes=int(max_mb * 1024 * 1024)) if directory else None
+    return _cache
+
+
+if HTTP_CACHE_DIR:
+    configure_cache(HTTP_CACHE_DIR)
+
+
+def _cached_json(entry):
+    try:
+        return json.loads(entry.body())
+    except (OSError, ValueError, zlib.error):
+        return None
+
+
+def host_state(url):
+    host = urlsplit(url).netloc
+    with _hosts_lock:
+        if host not in _hosts:
+            _hosts[host] = HostState()
+        return _hosts[host]
+
+
+def _session():
+    # One keep-alive session per thread
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_json(url, headers=None, timeout=120, max_attempts=5, base_delay=1.0, max_circuit_wait=600.0):
+    """
+    GET url and return the decoded JSON body, or None if it could not be fetched.
+    Retries connection errors, 429 and 5xx responses under the host's limiter and breaker.
+    Raises CircuitOpenError if the host stays down for longer than max_circuit_wait seconds.
+    """
+    entry = _cache.lookup(url) if _cache else None
+    if entry and entry.fresh:
+        data = _cached_json(entry)
+        if data is not None:
+            return data
+        entry = None
+    request_headers = dict(headers or {})
+    if entry:
+        request_headers.update(entry.validators())
+
+    state = host_state(url)
+    attempt = 0
+    circuit_waited = 0.0
+    last_error = None
+
+    while attempt < max_attempts:
+        wait = state.breaker.wait_time()
+        if wait > 0:
+            if circuit_waited + wait > max_circuit_wait:
+                raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}")
+            time.sleep(wait)
+            circuit_waited += wait
+            continue
+
+        attempt += 1
+        state.limiter.acquire()
+        state.count('requests')
+        start = time.monotonic()
+        retry_after = None
+        try:
+            response = _session().get(url, headers=request_headers, timeout=timeout, verify=True, allow_redirects=True)
+            latency = time.monotonic() - start
+        except requests.exceptions.RequestException as e:
+            state.limiter.release(time.monotonic() - start, 'error')
+            state.breaker.record_failure()
+            state.count('errors')
+            last_error = str(e)
+        else:
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                state.limiter.release(latency, 'throttled', retry_after)
+                # Throttling says nothing about the host's health, but must not leave a half-open probe pending
+                state.breaker.release_probe()
+                state.count('throttled')
+                last_error = "HTTP 429 Too Many Requests"
+            elif response.status_code >= 500:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                state.limiter.release(latency, 'error', retry_after)
+                state.breaker.record_failure()
+                state.count('errors')
+                last_error = f"HTTP {response.status_code}"
+            else:
+                state.limiter.release(latency, 'ok')
+                state.breaker.record_success()
+                if response.status_code == 304 and entry:
+                    data = _cached_json(entry)
+                    if data is not None:
+                        _cache.refresh(entry)
+                        state.count('ok')
+                        return data
+                if response.status_code >= 400:
+                    # Client errors won't succeed on retry
+                    state.count('failed')
+                    print(f"❌ {url} returned HTTP {response.status_code}")
+                    return None
+                try:
+                    data = json.loads(response.content)
+                except ValueError as e:
+                    state.count('failed')
+                    print(f"❌ Invalid JSON from {url}: {e}")
+                    return None
+                # Only successful envelopes: a {"success": false} error must not be replayed until the TTL expires
+                if _cache and response.status_code == 200 and isinstance(data, dict) and data.get('success'):
+                    try:
+                        _cache.store(url, response.content, response.headers)
+                    except OSError as e:
+                        print(f"⚠️ Could not cache {url}: {e}")
+                state.count('ok')
+                return data
+
+        if attempt < max_attempts:
+            # Exponential backoff with jitter, or what upstream asked for
+            delay = retry_after if retry_after is not None else base_delay * (2 ** (attempt - 1)) + random.uniform(0, 1)
+            time.sleep(min(delay, MAX_RETRY_AFTER))
+
+    state.count('failed')
+    print(f"❌ Failed after {max_attempts} attempts for {url}")
+    print(f"   Error: {last_error}")
+    return None
+
+
+def client_stats():
+    """Per-host request counters and current concurrency limits."""
+    with _hosts_lock:
+        hosts = dict(_hosts)
+    summary = {}
+    for host, state in hosts.items():
+        with state.stats_lock:
+            summary[host] = dict(state.stats)
+        summary[host]['concurrency_limit'] = round(state.limiter.limit, 2)
+        summary[host]['circuit'] = state.breaker.state
+    if _cache:
+        summary['http_cache'] = dict(_cache.stats)
+    return summary
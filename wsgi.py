@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+`python app.py` still starts the single-threaded development server.
+"""
+from app import create_app
+
+application = app = create_app()